@@ -0,0 +1,253 @@
+"""Concurrent-session load test for indian_app.py against a local Streamlit server.
+
+Each simulated session connects over the same websocket protocol as a browser
+tab. It then repeatedly sets the sidebar widgets to a property configuration
+and presses Calculate. Each rerun is timed from the request to the server's
+script_finished message. For every --sessions level this prints rerun
+latency percentiles, throughput, and the server's RSS growth per connected
+session. The highest throughput across the levels is the process's ceiling.
+
+--configs sets how many distinct configurations the sessions share, as with
+kiosk traffic on a few popular listings. --configs 0 gives every rerun its
+own configuration, the worst case for the report caches. In-process AppTest
+is not used: it compiles the script on every run, which is not thread-safe
+on CPython 3.11, so it cannot model concurrent sessions.
+
+Usage:
+    python benchmarks/app_loadtest.py --start-server --sessions 1 4 16 32
+    python benchmarks/app_loadtest.py --port 8501 --server-pid 1234 --configs 0 --think-ms 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.asyncio.client import connect
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit_app")
+sys.path.insert(0, APP_DIR)
+
+from pricing import AMENITIES, INPUT_COLUMNS  # noqa: E402
+from sample_listings import generate_listings  # noqa: E402
+
+# Sidebar widget labels in indian_app.py and the input each one sets; the
+# amenity checkboxes follow in AMENITIES order
+SIDEBAR_LABELS = {
+    "Select City": "city", "Property Type": "property_type", "BHK": "bhk", "Area": "area",
+    "Location": "location_type", "Age": "age", "Floor": "floor", "Furnishing": "furnishing", "Parking": "parking",
+}
+CALCULATE_LABEL = "🎯 Calculate Property Price"
+SIDEBAR = 1  # root container index of st.sidebar in delta paths
+
+
+def sidebar_configs(n_configs, seed=0):
+    """Sidebar input dicts drawn from the sample listings."""
+    configs = []
+    for row in generate_listings(n_configs, seed=seed).to_dict("records"):
+        config = {name: row[name] for name in INPUT_COLUMNS}
+        config["area"] = int(config["area"])
+        config["amenities"] = {name: bool(row[name]) for name in AMENITIES}
+        configs.append(config)
+    return configs
+
+
+class Session:
+    """One browser tab: a websocket session plus the widgets its last rerun drew."""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.widgets = {}
+        self.checkboxes = []
+
+    async def rerun(self, states=()):
+        """Request a rerun with the given widget states; returns (seconds, bytes received, exception count)."""
+        message = BackMsg()
+        message.rerun_script.widget_states.widgets.extend(states)
+        start = time.perf_counter()
+        await self.websocket.send(message.SerializeToString())
+        received, errors = 0, 0
+        widgets, checkboxes = {}, []
+        while True:
+            data = await self.websocket.recv()
+            received += len(data)
+            forward = ForwardMsg()
+            forward.ParseFromString(data)
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type == "exception":
+                    errors += 1
+                elif element_type in ("selectbox", "slider", "checkbox", "button"):
+                    widget = getattr(element, element_type)
+                    if forward.metadata.delta_path[0] == SIDEBAR:
+                        widgets[widget.label] = widget.id
+                        if element_type == "checkbox":
+                            checkboxes.append(widget.id)
+                    elif widget.label == CALCULATE_LABEL:
+                        widgets[widget.label] = widget.id
+            elif kind == "script_finished" and forward.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        self.widgets, self.checkboxes = widgets, checkboxes
+        return time.perf_counter() - start, received, errors
+
+    def calculate_states(self, config):
+        """Widget states that set every sidebar input to config and press Calculate."""
+        states = []
+        for label, name in SIDEBAR_LABELS.items():
+            state = WidgetState(id=self.widgets[label])
+            if name == "area":
+                state.double_array_value.data.append(config["area"])
+            else:
+                state.string_value = config[name]
+            states.append(state)
+        for widget_id, name in zip(self.checkboxes, AMENITIES):
+            states.append(WidgetState(id=widget_id, bool_value=config["amenities"][name]))
+        states.append(WidgetState(id=self.widgets[CALCULATE_LABEL], trigger_value=True))
+        return states
+
+
+async def open_session(url):
+    session = Session(await connect(url, subprotocols=["streamlit"], max_size=None))
+    await session.rerun()
+    return session
+
+
+def rss_mb(pid):
+    """Resident set size of process pid in MiB (Linux only; NaN elsewhere)."""
+    try:
+        with open(f"/proc/{pid}/status") as handle:
+            for line in handle:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+
+def start_server(port):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "indian_app.py", "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise SystemExit(f"Streamlit server did not start on port {port}")
+
+
+async def run_level(url, pid, n_sessions, configs, interactions, think_seconds):
+    """Open n_sessions sessions, press Calculate once in each, then run the timed interactions."""
+    rss_before = rss_mb(pid)
+    sessions = await asyncio.gather(*[open_session(url) for _ in range(n_sessions)])
+    await asyncio.gather(*[
+        session.rerun(session.calculate_states(configs[i % len(configs)])) for i, session in enumerate(sessions)
+    ])
+    rss_after = rss_mb(pid)
+
+    latencies, received, errors = [], [], 0
+
+    async def drive(index, session):
+        nonlocal errors
+        for step in range(interactions):
+            config = configs[(index * interactions + step) % len(configs)]
+            seconds, size, exceptions = await session.rerun(session.calculate_states(config))
+            latencies.append(seconds)
+            received.append(size)
+            errors += exceptions
+            if think_seconds:
+                await asyncio.sleep(think_seconds)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[drive(index, session) for index, session in enumerate(sessions)])
+    elapsed = time.perf_counter() - start
+    await asyncio.gather(*[session.websocket.close() for session in sessions])
+
+    latencies_ms = 1000 * np.array(latencies)
+    return {
+        "sessions": n_sessions,
+        "reruns": len(latencies),
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p90_ms": float(np.percentile(latencies_ms, 90)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "max_ms": float(latencies_ms.max()),
+        "rerun_kb": float(np.mean(received)) / 1024,
+        "rss_mb": rss_after,
+        "rss_per_session_mb": (rss_after - rss_before) / n_sessions,
+        "errors": errors,
+    }
+
+
+async def run(args, pid):
+    url = f"ws://{args.host}:{args.port}/_stcore/stream"
+    # One session first loads the pricing and plotting modules, so level 1 is not a cold start
+    warmup = await open_session(url)
+    cold, _, _ = await warmup.rerun(warmup.calculate_states(sidebar_configs(1, seed=99)[0]))
+    await warmup.websocket.close()
+    print(f"first Calculate on the server: {1000 * cold:.0f} ms   server RSS {rss_mb(pid):.0f} MiB")
+    print(f"{'sessions':>8} {'reruns/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+          f"{'KiB/rerun':>9} {'RSS MiB':>8} {'MiB/session':>11} {'errors':>6}")
+
+    results = []
+    for level, n_sessions in enumerate(args.sessions):
+        if args.configs:
+            configs = sidebar_configs(args.configs, seed=args.seed)
+        else:
+            # A fresh configuration for every rerun, different at each level
+            configs = sidebar_configs(n_sessions * (args.interactions + 1), seed=args.seed + 1000 * (level + 1))
+        result = await run_level(url, pid, n_sessions, configs, args.interactions, args.think_ms / 1000)
+        results.append(result)
+        print(f"{n_sessions:>8} {result['throughput']:>9.1f} {result['p50_ms']:>8.0f} {result['p90_ms']:>8.0f} "
+              f"{result['p99_ms']:>8.0f} {result['max_ms']:>8.0f} {result['rerun_kb']:>9.1f} "
+              f"{result['rss_mb']:>8.0f} {result['rss_per_session_mb']:>11.2f} {result['errors']:>6}")
+
+    best = max(results, key=lambda result: result["throughput"])
+    print(f"throughput ceiling: {best['throughput']:.1f} reruns/s at {best['sessions']} sessions")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8599)
+    parser.add_argument("--start-server", action="store_true", help="run `streamlit run indian_app.py` for the test")
+    parser.add_argument("--server-pid", type=int, help="pid of an already running server, for RSS")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16, 32], help="concurrency levels")
+    parser.add_argument("--interactions", type=int, default=20, help="Calculate presses per session per level")
+    parser.add_argument("--configs", type=int, default=20, help="distinct configurations shared (0: all distinct)")
+    parser.add_argument("--think-ms", type=float, default=0, help="pause between a session's reruns")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the per-level results as JSON")
+    args = parser.parse_args()
+
+    server = start_server(args.port) if args.start_server else None
+    pid = server.pid if server else args.server_pid
+    try:
+        results = asyncio.run(run(args, pid))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump({"configs": args.configs, "think_ms": args.think_ms, "levels": results}, handle, indent=2)
+    sys.exit(1 if any(result["errors"] for result in results) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Throughput of the vectorized price attribution, checked against the per-property path.
+
+Usage: python benchmarks/bench_attribution.py [--rows 1000000] [--baseline-rows 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit_app"))
+
+from attribution import ATTRIBUTION_COLUMNS, attribute_dataframe, attribute_property  # noqa: E402
+from pricing import AMENITIES, INPUT_COLUMNS, price_dataframe  # noqa: E402
+from sample_listings import generate_listings  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--baseline-rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    df = generate_listings(args.rows, seed=21)
+    start = time.perf_counter()
+    prices = price_dataframe(df)
+    price_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    parts = attribute_dataframe(df)
+    attribution_seconds = time.perf_counter() - start
+    print(f"{args.rows:,} rows: price only {price_seconds:.2f}s   price + attribution {attribution_seconds:.2f}s "
+          f"({args.rows / attribution_seconds:,.0f} rows/s)")
+
+    total = sum(parts[name] for name in ATTRIBUTION_COLUMNS)
+    sum_error = float(np.abs(total - prices).max())
+    price_mismatches = int((parts["predicted_price"] != prices).sum())
+    print(f"price mismatches: {price_mismatches}   worst |sum of parts - price|: ₹{sum_error:.1e}")
+
+    rows = df.head(args.baseline_rows).to_dict("records")
+    start = time.perf_counter()
+    expected = [
+        attribute_property({**{name: row[name] for name in INPUT_COLUMNS},
+                            "amenities": {name: bool(row[name]) for name in AMENITIES}})
+        for row in rows
+    ]
+    baseline_seconds = time.perf_counter() - start
+    difference = max(
+        abs(row[name] - parts[name][i]) for i, row in enumerate(expected) for name in ATTRIBUTION_COLUMNS
+    )
+    print(f"per-property: {len(rows) / baseline_seconds:,.0f} rows/s "
+          f"(would take {args.rows / len(rows) * baseline_seconds:,.0f}s for all rows); "
+          f"max difference ₹{difference:.1e}")
+    sys.exit(1 if price_mismatches or sum_error > 1e-3 or difference > 1e-3 else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Compare scalar and batch pricing throughput.
+
+Usage: python benchmarks/bench_batch.py [--rows 1000000] [--scalar-rows 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit_app"))
+
+from pricing import AMENITIES, INPUT_COLUMNS, calculate_indian_property_price, price_dataframe  # noqa: E402
+from sample_listings import generate_listings  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--scalar-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    df = generate_listings(args.rows)
+
+    start = time.perf_counter()
+    batch_prices = price_dataframe(df)
+    batch_seconds = time.perf_counter() - start
+
+    head = df.head(args.scalar_rows)
+    rows = head[INPUT_COLUMNS].itertuples(index=False)
+    flags = head[AMENITIES].to_dict("records")
+    start = time.perf_counter()
+    scalar_prices = [calculate_indian_property_price(*row, amenities) for row, amenities in zip(rows, flags)]
+    scalar_seconds = time.perf_counter() - start
+
+    mismatches = int((batch_prices[:len(scalar_prices)] != scalar_prices).sum())
+    scalar_rate = len(scalar_prices) / scalar_seconds
+    batch_rate = args.rows / batch_seconds
+    print(f"scalar: {len(scalar_prices):>10,} rows in {scalar_seconds:8.3f}s  {scalar_rate:>14,.0f} rows/s")
+    print(f"batch:  {args.rows:>10,} rows in {batch_seconds:8.3f}s  {batch_rate:>14,.0f} rows/s")
+    print(f"speedup: {batch_rate / scalar_rate:.1f}x, mismatches: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Throughput of the vectorized cash-flow projection and IRR solver, against a per-row root finder.
+
+Usage: python benchmarks/bench_cashflow.py [--properties 100000] [--years 10] [--baseline-rows 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit_app"))
+
+from cashflow import city_assumptions, irr, npv, project  # noqa: E402
+from pricing import price_dataframe  # noqa: E402
+from sample_listings import generate_listings  # noqa: E402
+
+# Loan-rate x down-payment scenarios applied to every property
+LOAN_RATES = np.array([8.0, 9.0, 10.0, 11.0])
+DOWN_PAYMENTS = np.array([10.0, 20.0, 30.0])
+
+
+def scalar_irr(flows, tol=1e-10):
+    """Per-row bisection on the NPV sign, the usual loop a root finder runs for one property."""
+    def value(rate):
+        return sum(flow / (1 + rate) ** year for year, flow in enumerate(flows))
+
+    low, high = -0.99, 1.0
+    while value(high) > 0 and high < 1e4:
+        high = high * 4 + 1
+    if value(low) * value(high) > 0:
+        return float("nan")
+    while high - low > tol * (1 + abs(low)):
+        middle = (low + high) / 2
+        if value(middle) * value(low) > 0:
+            low = middle
+        else:
+            high = middle
+    return 100 * (low + high) / 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--properties", type=int, default=100_000)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--baseline-rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    df = generate_listings(args.properties, seed=5)
+    prices = price_dataframe(df).astype(np.float64)
+    rent_yield, appreciation = city_assumptions(df["city"].to_numpy())
+
+    # Shape (rates, down payments, properties): every scenario for every property in one call
+    start = time.perf_counter()
+    net = project(
+        prices, rent_yield, appreciation, args.years,
+        loan_rate=LOAN_RATES[:, None, None], down_payment=DOWN_PAYMENTS[None, :, None]
+    )["net"]
+    project_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    rates = irr(net)
+    irr_seconds = time.perf_counter() - start
+    n_rows = rates.size
+    print(f"{args.properties:,} properties x {len(LOAN_RATES) * len(DOWN_PAYMENTS)} scenarios = {n_rows:,} rows, "
+          f"{args.years} years")
+    print(f"project: {project_seconds:.2f}s   irr: {irr_seconds:.2f}s   "
+          f"({n_rows / (project_seconds + irr_seconds):,.0f} rows/s)")
+
+    residual = np.abs(npv(net, rates)) / prices
+    print(f"unsolved rows: {int(np.isnan(rates).sum())}   worst |NPV at IRR| / price: {np.nanmax(residual):.1e}")
+
+    sample = net.reshape(-1, net.shape[-1])[:args.baseline_rows]
+    start = time.perf_counter()
+    expected = np.array([scalar_irr(row) for row in sample])
+    baseline_seconds = time.perf_counter() - start
+    difference = np.nanmax(np.abs(expected - rates.reshape(-1)[:args.baseline_rows]))
+    print(f"per-row bisection: {len(sample) / baseline_seconds:,.0f} rows/s "
+          f"(would take {n_rows / len(sample) * baseline_seconds:,.0f}s for all rows); "
+          f"max IRR difference {difference:.1e} points")
+    sys.exit(1 if difference > 1e-6 else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Build time and query latency of the comparables index, checked against brute force.
+
+Usage: python benchmarks/bench_comparables.py [--rows 1000000] [--queries 500] [--k 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit_app"))
+
+from comparables import EXACT_FACTORS, ComparablesIndex, _frame_columns, encode_features  # noqa: E402
+from pricing import AMENITIES  # noqa: E402
+from sample_listings import generate_listings  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--leaf-size", type=int, default=32)
+    args = parser.parse_args()
+
+    df = generate_listings(args.rows, seed=0, price_noise=0.1)
+    index = ComparablesIndex(df, leaf_size=args.leaf_size)
+    print(f"built index over {len(index):,} rows in {len(index.trees)} groups in {index.build_seconds:.2f}s")
+
+    queries = generate_listings(args.queries, seed=99)
+    query_inputs = [
+        {**row, "amenities": {name: bool(row[name]) for name in AMENITIES}}
+        for row in queries.to_dict("records")
+    ]
+    latencies = []
+    for inputs in query_inputs:
+        start = time.perf_counter()
+        index.query(inputs, args.k)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+    print(f"query k={args.k}: p50 {np.percentile(latencies, 50):.3f} ms  p99 {np.percentile(latencies, 99):.3f} ms")
+
+    # Exactness: the tree must return the same distances as a scan of the group
+    cube = index.cube
+    features = encode_features(_frame_columns(df), cube)
+    scan = []
+    mismatches = 0
+    for inputs in query_inputs[:100]:
+        result = index.query(inputs, args.k)
+        start = time.perf_counter()
+        mask = np.ones(len(df), dtype=bool)
+        for factor in EXACT_FACTORS:
+            mask &= df[factor].to_numpy() == inputs[factor]
+        point = encode_features(
+            {**{name: [inputs[name]] for name in ("area", "parking", "location_type", "age", "floor", "furnishing", "bhk")},
+             "amenities": np.array([[inputs["amenities"][name] for name in AMENITIES]])}, cube
+        )[0]
+        distances = np.sqrt(((features[mask] - point) ** 2).sum(axis=1))
+        expected = np.sort(distances)[:args.k]
+        scan.append(time.perf_counter() - start)
+        mismatches += not np.allclose(result["distance"], expected)
+    print(f"full-scan baseline: p50 {np.percentile(np.array(scan) * 1000, 50):.1f} ms per query")
+    print(f"mismatches against brute force: {mismatches} of {min(100, len(query_inputs))}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Report the price cube's memory footprint and lookup latency.
+
+Usage: python benchmarks/bench_cube.py [--rows 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit_app"))
+
+from pricing import AMENITIES, PRICE_CUBE, PriceCube, calculate_indian_property_price, price_dataframe  # noqa: E402
+from sample_listings import generate_listings  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    cube = PRICE_CUBE
+    build_seconds = min(timeit.repeat(PriceCube, number=1, repeat=5))
+    print(f"cube shape {cube.rates.shape}, {cube.rates.size:,} cells, {cube.rates.dtype}")
+    print(f"memory: {cube.nbytes / 2**20:.2f} MiB, build: {build_seconds * 1e3:.2f} ms")
+
+    index = cube.index(
+        city="Mumbai", property_type="Apartment/Flat", location_type="Suburb",
+        age="1-5 Years", floor="4th-7th Floor", furnishing="Semi-Furnished", bhk="3 BHK"
+    )
+    n = 200_000
+    lookup = min(timeit.repeat(lambda: cube.rates[index], number=n, repeat=5)) / n
+    amenities = dict.fromkeys(AMENITIES, True)
+    single = min(timeit.repeat(
+        lambda: calculate_indian_property_price(
+            "Mumbai", "Apartment/Flat", "3 BHK", 1200, "Suburb", "1-5 Years",
+            "4th-7th Floor", "Semi-Furnished", "1 Car", amenities
+        ),
+        number=n, repeat=5
+    )) / n
+    print(f"cube lookup: {lookup * 1e9:.0f} ns, single prediction: {single * 1e6:.2f} us")
+
+    df = generate_listings(args.rows)
+    coded = df.copy()
+    for factor in [*cube.factors, "parking"]:
+        coded[factor] = cube.encode(factor, df[factor].to_numpy())
+    for label, frame in (("names", df), ("codes", coded)):
+        start = time.perf_counter()
+        price_dataframe(frame)
+        seconds = time.perf_counter() - start
+        print(f"batch ({label}): {args.rows / seconds:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Append and query cost of the price history store, checked against a full re-aggregation.
+
+Usage: python benchmarks/bench_history.py [--months 120] [--rows-per-month 20000] [--queries 1000]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit_app"))
+
+from price_history import ALL_LOCATIONS, ROLLING_WINDOWS, PriceHistory, month_label, month_number  # noqa: E402
+from sample_listings import generate_sales  # noqa: E402
+
+
+def full_rollup(sales, history):
+    """Every cell's mean and rolling means recomputed from all sales with pandas."""
+    import pandas as pd
+
+    sales = sales.assign(
+        offset=sales["month"].map(month_number) - history.start,
+        ppsf=sales["price"] / sales["area"],
+    )
+    both = pd.concat([sales, sales.assign(location_type=ALL_LOCATIONS)])
+    grouped = both.groupby(["city", "location_type", "offset"])["ppsf"].agg(["sum", "count"])
+    expected = {}
+    for (city, location), cell in grouped.groupby(level=[0, 1]):
+        cell = cell.droplevel([0, 1]).reindex(range(history.months), fill_value=0)
+        series = {"mean": (cell["sum"] / cell["count"].replace(0, np.nan)).to_numpy()}
+        for window in ROLLING_WINDOWS:
+            rolled = cell.rolling(window, min_periods=1).sum()
+            series[f"rolling_{window}"] = (rolled["sum"] / rolled["count"].replace(0, np.nan)).to_numpy()
+        expected[city, location] = series
+    return expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--months", type=int, default=120)
+    parser.add_argument("--rows-per-month", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="price_history_")
+    try:
+        store = os.path.join(directory, "store")
+        history = PriceHistory.create(store, "2016-01")
+        batches = [
+            generate_sales(args.rows_per_month, month_label(history.start + i), (args.months - 1 - i) / 12, seed=i)
+            for i in range(args.months)
+        ]
+        append_seconds = []
+        for batch in batches:
+            start = time.perf_counter()
+            history.append_dataframe(batch)
+            append_seconds.append(time.perf_counter() - start)
+        append_ms = np.array(append_seconds) * 1000
+        print(f"append one month of {args.rows_per_month:,} sales: first {append_ms[0]:.1f} ms, "
+              f"last {append_ms[-1]:.1f} ms, median {np.median(append_ms):.1f} ms")
+
+        # A late correction to a month two years back recomputes rolling means only from there on
+        late = generate_sales(2_000, month_label(history.start + args.months - 24), 2.0, seed=10_000)
+        start = time.perf_counter()
+        recomputed = history.append_dataframe(late)
+        print(f"late sales for {late['month'][0]}: {1000 * (time.perf_counter() - start):.1f} ms, "
+              f"{recomputed} months recomputed")
+        batches.append(late)
+
+        start = time.perf_counter()
+        reader = PriceHistory(store)
+        print(f"open store ({history.months} months, "
+              f"{sum(os.path.getsize(os.path.join(store, name)) for name in os.listdir(store)) / 1024:.0f} KiB): "
+              f"{1000 * (time.perf_counter() - start):.2f} ms")
+
+        rng = np.random.default_rng(0)
+        locations = reader.location_types
+        latencies = []
+        for _ in range(args.queries):
+            city = reader.cities[rng.integers(len(reader.cities))]
+            location = locations[rng.integers(len(locations))]
+            start = time.perf_counter()
+            reader.refresh()
+            reader.trend(city, location)
+            latencies.append(time.perf_counter() - start)
+        latencies = np.array(latencies) * 1000
+        print(f"trend query ({reader.months} months): p50 {np.percentile(latencies, 50):.3f} ms  "
+              f"p99 {np.percentile(latencies, 99):.3f} ms")
+
+        import pandas as pd
+
+        sales = pd.concat(batches, ignore_index=True)
+        start = time.perf_counter()
+        expected = full_rollup(sales, reader)
+        print(f"full re-aggregation of {len(sales):,} sales with pandas: {time.perf_counter() - start:.2f} s")
+        mismatches = 0
+        for (city, location), series in expected.items():
+            stored = reader.trend(city, location)
+            for name, values in series.items():
+                mismatches += not np.allclose(stored[name], values, rtol=1e-9, equal_nan=True)
+        print(f"mismatches against full re-aggregation: {mismatches} of {len(expected) * (1 + len(ROLLING_WINDOWS))}")
+        sys.exit(1 if mismatches else 0)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
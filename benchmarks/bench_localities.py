@@ -0,0 +1,107 @@
+"""Typeahead search over the locality prefix index, against scanning the list on every keystroke.
+
+Usage: python benchmarks/bench_localities.py [--per-city 2500] [--queries 2000]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit_app"))
+
+from localities import DEFAULT_MATCHES, LocalityIndex, generate_localities, write_localities  # noqa: E402
+from pricing import AMENITIES, calculate_indian_property_price, calculate_indian_property_price_batch  # noqa: E402
+from sample_listings import generate_listings  # noqa: E402
+
+
+def scan_search(names, prefix, limit=DEFAULT_MATCHES):
+    """What the sidebar would do without an index: filter the city's sorted list on every rerun."""
+    key = prefix.casefold()
+    return [name for name in names if name.casefold().startswith(key)][:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--per-city", type=int, default=2500)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    cities, names, factors = generate_localities(args.per_city, seed=3)
+    path = os.path.join(tempfile.mkdtemp(), "localities.bin")
+    start = time.perf_counter()
+    write_localities(path, cities, names, factors)
+    write_ms = 1000 * (time.perf_counter() - start)
+    start = time.perf_counter()
+    index = LocalityIndex(path)
+    open_ms = 1000 * (time.perf_counter() - start)
+    print(f"{len(index):,} localities: file {os.path.getsize(path) / 2**20:.1f} MiB, "
+          f"write {write_ms:.0f} ms, open {open_ms:.2f} ms")
+
+    by_city = {}
+    for city, name in zip(cities, names):
+        by_city.setdefault(city, []).append(name)
+    for city_names in by_city.values():
+        city_names.sort(key=str.casefold)
+
+    # Every keystroke of typing a locality name: "S", "Sh", "Sha", ...
+    rng = np.random.default_rng(0)
+    queries = []
+    while len(queries) < args.queries:
+        row = int(rng.integers(len(names)))
+        queries += [(cities[row], names[row][:length]) for length in range(1, len(names[row]) + 1)]
+    queries = queries[:args.queries]
+
+    start = time.perf_counter()
+    indexed = [index.search(city, prefix) for city, prefix in queries]
+    index_us = 1e6 * (time.perf_counter() - start) / len(queries)
+    start = time.perf_counter()
+    scanned = [scan_search(by_city[city], prefix) for city, prefix in queries]
+    scan_us = 1e6 * (time.perf_counter() - start) / len(queries)
+    start = time.perf_counter()
+    everywhere = [scan_search(names, prefix) for _, prefix in queries[:200]]
+    scan_all_us = 1e6 * (time.perf_counter() - start) / len(everywhere)
+    mismatches = sum(a != b for a, b in zip(indexed, scanned))
+    print(f"search per keystroke: index {index_us:.1f} us   scan one city {scan_us:.0f} us   "
+          f"scan all localities {scan_all_us:.0f} us   mismatches {mismatches}")
+
+    start = time.perf_counter()
+    looked_up = [index.factor(cities[i], names[i]) for i in range(0, len(names), 7)]
+    lookup_us = 1e6 * (time.perf_counter() - start) / len(looked_up)
+    lookup_errors = int(np.sum(np.abs(np.array(looked_up) - np.float32(factors[::7])) > 0))
+    print(f"factor lookup by name: {lookup_us:.1f} us   wrong factors {lookup_errors}")
+
+    # The options a selectbox sends to the browser on every rerun
+    city_options = max(len(city_names) for city_names in by_city.values())
+    payload_all = len(json.dumps(names).encode()) / 1024
+    payload_city = len(json.dumps(by_city[cities[0]]).encode()) / 1024
+    payload_matches = max(len(json.dumps(matches).encode()) for matches in indexed) / 1024
+    print(f"selectbox options payload: all localities {payload_all:,.0f} KiB   one city ({city_options:,}) "
+          f"{payload_city:,.0f} KiB   typeahead matches <= {payload_matches:.1f} KiB")
+
+    # Locality factors must price the same through the scalar and batch paths
+    df = generate_listings(2000, seed=4)
+    locality_factor = np.array(factors[:len(df)], dtype=np.float32).astype(np.float64)
+    batch = calculate_indian_property_price_batch(
+        *[df[name].to_numpy() for name in ("city", "property_type", "bhk", "area", "location_type", "age", "floor",
+                                           "furnishing", "parking")],
+        locality_factor=locality_factor
+    )
+    no_amenities = dict.fromkeys(AMENITIES, False)
+    scalar = [
+        calculate_indian_property_price(
+            row["city"], row["property_type"], row["bhk"], row["area"], row["location_type"], row["age"],
+            row["floor"], row["furnishing"], row["parking"], no_amenities, None, factor
+        )
+        for row, factor in zip(df.to_dict("records"), locality_factor)
+    ]
+    price_mismatches = int((batch != np.array(scalar)).sum())
+    print(f"scalar vs batch prices with locality factors: {price_mismatches} mismatches in {len(df):,}")
+    sys.exit(1 if mismatches or lookup_errors or price_mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Scaling benchmark for sharded process-pool scoring.
+
+Scores the same frame with 1, 2, 4 and N workers and reports the speedup over
+the in-process path, so the point where IPC overhead stops paying off is visible.
+
+Usage: python benchmarks/bench_parallel.py [--rows 2000000] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit_app"))
+
+from parallel_scoring import score_frame_parallel  # noqa: E402
+from sample_listings import generate_listings  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    df = generate_listings(args.rows)
+    print(f"{args.rows:,} rows, {os.cpu_count()} CPUs")
+
+    baseline = None
+    reference = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        columns = score_frame_parallel(df, workers)
+        seconds = time.perf_counter() - start
+        if reference is None:
+            reference = columns["predicted_price"]
+        same = np.array_equal(columns["predicted_price"], reference)
+        baseline = baseline or seconds
+        print(f"workers {workers:>3}: {seconds:7.2f}s  {args.rows / seconds:>12,.0f} rows/s  "
+              f"speedup {baseline / seconds:5.2f}x  identical={same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Cost of editing one holding in a portfolio, incremental versus revaluing every holding.
+
+Usage: python benchmarks/bench_portfolio.py [--holdings 100 500 2000] [--edits 500]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit_app"))
+
+from portfolio import TOTAL_FIELDS, Portfolio, value_holding  # noqa: E402
+from pricing import AMENITIES, current_cube  # noqa: E402
+from sample_listings import generate_listings  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--holdings", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--edits", type=int, default=500)
+    args = parser.parse_args()
+
+    cube = current_cube()
+    edits = [
+        {**row, "amenities": {name: bool(row[name]) for name in AMENITIES}}
+        for row in generate_listings(args.edits, seed=11).to_dict("records")
+    ]
+    worst_drift = 0.0
+    for n_holdings in args.holdings:
+        portfolio = Portfolio()
+        start = time.perf_counter()
+        ids = portfolio.add_dataframe(generate_listings(n_holdings, seed=n_holdings), cube)
+        import_ms = 1000 * (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for i, inputs in enumerate(edits):
+            portfolio.update(ids[i % n_holdings], inputs, cube)
+            portfolio.summary()
+        incremental_us = 1e6 * (time.perf_counter() - start) / len(edits)
+
+        # What the page did per widget change without running totals: revalue everything, then sum
+        start = time.perf_counter()
+        for _ in range(5):
+            holdings = [value_holding(holding["inputs"], cube) for holding in portfolio.holdings.values()]
+            {field: sum(holding[field] for holding in holdings) for field in TOTAL_FIELDS}
+        full_us = 1e6 * (time.perf_counter() - start) / 5
+
+        running = dict(portfolio.totals)
+        portfolio.resync()
+        # cash_flows is a yearly array; every other total is a number
+        drift = max(float(np.max(np.abs(running[field] - portfolio.totals[field])
+                                 / np.maximum(np.abs(portfolio.totals[field]), 1)))
+                    for field in TOTAL_FIELDS)
+        worst_drift = max(worst_drift, drift)
+        print(f"{n_holdings:>6,} holdings: import {import_ms:7.1f} ms   edit {incremental_us:7.1f} us   "
+              f"full revaluation {full_us / 1000:8.2f} ms   relative drift after {len(edits)} edits {drift:.1e}")
+    sys.exit(1 if worst_drift > 1e-9 else 0)
+
+
+if __name__ == "__main__":
+    main()
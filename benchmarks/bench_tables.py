@@ -0,0 +1,101 @@
+"""Measure pricing-table load time per format and check hot reloads under load.
+
+The reload check prices the same properties from several threads while the
+table file is rewritten with alternating rates. Every batch must match one of
+the two table versions exactly, and carry that version's tag.
+
+Usage: python benchmarks/bench_tables.py [--swaps 50] [--threads 4]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit_app"))
+
+import pricing  # noqa: E402
+from pricing import (  # noqa: E402
+    FACTOR_TABLES, PriceCube, TableWatcher, calculate_indian_property_price_batch, load_pricing_tables,
+    save_pricing_tables
+)
+from sample_listings import generate_listings  # noqa: E402
+
+
+def load_times(directory):
+    cube = pricing.current_cube()
+    build = min(timeit.repeat(PriceCube, number=1, repeat=5))
+    print(f"rebuild from tables: {build * 1e6:9.1f} us")
+    for name in ("tables.json", "tables.bin"):
+        path = os.path.join(directory, name)
+        save_pricing_tables(path, cube)
+        seconds = min(timeit.repeat(lambda: load_pricing_tables(path), number=20, repeat=5)) / 20
+        print(f"load {name:<12}      {seconds * 1e6:9.1f} us  ({os.path.getsize(path) / 1024:,.0f} KiB)")
+
+    watcher = TableWatcher(os.path.join(directory, "tables.bin"), interval=1.0)
+    n = 1_000_000
+    poll = min(timeit.repeat(watcher.poll, number=n, repeat=3)) / n
+    print(f"watcher poll (no change due): {poll * 1e9:.0f} ns")
+
+
+def reload_check(directory, swaps, n_threads, rows):
+    versions = []
+    for scale in (1.0, 1.1):
+        tables = dict(FACTOR_TABLES, city={name: rate * scale for name, rate in FACTOR_TABLES["city"].items()})
+        versions.append(PriceCube(tables))
+    path = os.path.join(directory, "hot.bin")
+    save_pricing_tables(path, versions[0])
+    pricing.install_cube(load_pricing_tables(path))
+    pricing.TABLE_WATCHER = TableWatcher(path, interval=0.0)
+
+    df = generate_listings(rows, seed=1)
+    columns = pricing.frame_columns(df)
+    expected = {cube.version: calculate_indian_property_price_batch(*columns, cube=cube) for cube in versions}
+    seen = {cube.version: 0 for cube in versions}
+    failures = []
+    stop = threading.Event()
+
+    def price_loop():
+        while not stop.is_set():
+            cube = pricing.current_cube()
+            prices = calculate_indian_property_price_batch(*columns, cube=cube)
+            if cube.version not in expected or not (prices == expected[cube.version]).all():
+                failures.append(cube.version)
+            seen[cube.version] = seen.get(cube.version, 0) + 1
+
+    threads = [threading.Thread(target=price_loop) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    start = time.perf_counter()
+    for swap in range(swaps):
+        time.sleep(0.01)
+        save_pricing_tables(path, versions[(swap + 1) % 2])
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    watcher = pricing.TABLE_WATCHER
+    print(f"{swaps} swaps in {elapsed:.2f}s with {n_threads} pricing threads: "
+          f"{watcher.reloads} reloads, {watcher.errors} load errors, batches per version {seen}")
+    print("mismatched batches:", len(failures))
+    return not failures and not watcher.errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--swaps", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        load_times(directory)
+        ok = reload_check(directory, args.swaps, args.threads, args.rows)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Import-time budget check for the app's cold-start path.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter for
+each module below, prints the slowest imports, and exits non-zero when a
+module exceeds its budget or pulls in a dependency it must not load at
+import time (Streamlit in the pricing core, plotly/pandas anywhere here).
+
+Usage: python benchmarks/import_budget.py [--repeat 3] [--scale 1.0]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit_app")
+
+# module: (budget in ms, modules it must not import)
+BUDGETS = {
+    "pricing": (250, ["streamlit", "pandas", "plotly"]),
+    "analytics": (300, ["streamlit", "pandas", "plotly"]),
+    "prediction_cache": (50, ["numpy", "pandas", "plotly"]),
+    "result_store": (300, ["streamlit", "pandas", "plotly"]),
+    "tracing": (50, ["numpy", "pandas", "plotly", "http.server"]),
+    "price_history": (250, ["streamlit", "pandas", "plotly"]),
+    "charts": (250, ["streamlit", "pandas", "plotly"]),
+    "attribution": (250, ["streamlit", "pandas", "plotly"]),
+    "localities": (250, ["streamlit", "pandas", "plotly", "pricing"]),
+}
+
+
+def importtime(code):
+    """Parsed (cumulative ms, module) lines and stdout of one fresh interpreter running code."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=APP_DIR, capture_output=True, text=True, check=True
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings.append((int(cumulative) / 1000, name.strip()))
+    return timings, result.stdout
+
+
+def measure(module, startup):
+    """(total import ms, slowest (ms, name) pairs, loaded top-level packages) for one fresh import."""
+    code = f"import sys, {module}; print(','.join(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    timings, stdout = importtime(code)
+    total = next(ms for ms, name in timings if name == module)
+    # Interpreter start-up imports (site, .pth hooks) are not the module's cost
+    own = [(ms, name) for ms, name in timings if name not in startup]
+    return total, sorted(own, reverse=True)[:5], set(stdout.strip().split(","))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="take the fastest of N runs")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget (slow CI machines)")
+    args = parser.parse_args()
+
+    startup = {name for _, name in importtime("pass")[0]}
+    failures = []
+    for module, (budget, forbidden) in BUDGETS.items():
+        runs = [measure(module, startup) for _ in range(args.repeat)]
+        total, slowest, loaded = min(runs, key=lambda run: run[0])
+        limit = budget * args.scale
+        status = "ok" if total <= limit else "OVER BUDGET"
+        print(f"{module:<18} {total:8.1f} ms  (budget {limit:.0f} ms)  {status}")
+        for ms, name in slowest[1:]:
+            print(f"    {ms:8.1f} ms  {name}")
+        if total > limit:
+            failures.append(f"{module} took {total:.1f} ms")
+        leaked = sorted(loaded & set(forbidden))
+        if leaked:
+            failures.append(f"{module} imports {', '.join(leaked)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Load generator for pricing_service.py.
+
+Opens --connections keep-alive connections and sends --requests POST /predict
+calls on each, with --rows properties per request, then prints client-side
+latency percentiles and throughput alongside the server's /stats.
+
+Usage:
+    python benchmarks/service_loadgen.py --start-server
+    python benchmarks/service_loadgen.py --port 8600 --connections 64 --rows 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit_app"))
+
+from pricing import AMENITIES, INPUT_COLUMNS  # noqa: E402
+from sample_listings import generate_listings  # noqa: E402
+
+
+def build_payloads(n_payloads, rows, seed=0):
+    df = generate_listings(n_payloads * rows, seed=seed)
+    records = []
+    for row in df.to_dict("records"):
+        item = {column: row[column] for column in INPUT_COLUMNS}
+        item["area"] = int(item["area"])
+        item["amenities"] = {name: bool(row[name]) for name in AMENITIES}
+        records.append(item)
+    if rows == 1:
+        return [json.dumps(item).encode() for item in records]
+    return [json.dumps(records[i:i + rows]).encode() for i in range(0, len(records), rows)]
+
+
+async def request(reader, writer, host, method, path, body=b""):
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def client(host, port, payloads, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    for body in payloads:
+        start = time.perf_counter()
+        status, _ = await request(reader, writer, host, "POST", "/predict", body)
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run(args):
+    server = None
+    if args.start_server:
+        from pricing_service import PricingService
+
+        service = PricingService(window_ms=args.window_ms, max_batch=args.max_batch)
+        server = await service.start(args.host, args.port)
+
+    payloads = build_payloads(args.connections * args.requests, args.rows)
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        client(args.host, args.port, payloads[i * args.requests:(i + 1) * args.requests], latencies, statuses)
+        for i in range(args.connections)
+    ])
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    _, stats = await request(reader, writer, args.host, "GET", "/stats")
+    writer.close()
+    await writer.wait_closed()
+    if server is not None:
+        # Let the server-side handlers see the closed connections before shutting down
+        await asyncio.sleep(0.05)
+        server.close()
+        await server.wait_closed()
+
+    latencies_ms = np.array(latencies) * 1000
+    print(f"{len(latencies):,} requests x {args.rows} rows over {args.connections} connections in {elapsed:.2f}s")
+    print(f"throughput: {len(latencies) / elapsed:,.0f} req/s, {len(latencies) * args.rows / elapsed:,.0f} rows/s")
+    print(f"client latency ms: p50 {np.percentile(latencies_ms, 50):.2f}  p99 {np.percentile(latencies_ms, 99):.2f}")
+    print(f"status codes: {statuses}")
+    print(f"server stats: {stats.decode()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for the pricing service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=200, help="requests per connection")
+    parser.add_argument("--rows", type=int, default=1, help="properties per request")
+    parser.add_argument("--start-server", action="store_true", help="run the service in this process")
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=4096)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
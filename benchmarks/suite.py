@@ -0,0 +1,321 @@
+"""Benchmark suite for the pricing hot path, batch scoring and page render.
+
+Runs every benchmark and writes the results as JSON; --compare checks a
+result file against a baseline and exits 1 when any metric regressed by
+more than --threshold, so it can gate changes in CI. A baseline metric the
+new results lack also fails the gate, unless its benchmark was left out with
+--only or --max-rows.
+
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --only scalar batch --max-rows 100000
+    python benchmarks/suite.py --compare baseline.json results.json --threshold 0.10
+    python benchmarks/suite.py --output results.json --baseline baseline.json   # run, then compare
+
+Timings are the best of --repeat runs for microbenchmarks and the median for
+whole-page renders. App timings are for reruns in a warm process; import
+cost at cold start is covered by import_budget.py.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit_app")
+sys.path.insert(0, APP_DIR)
+
+BATCH_SIZES = (1_000, 100_000, 10_000_000)
+
+SAMPLE_INPUTS = {
+    "city": "Mumbai", "property_type": "Apartment/Flat", "bhk": "2 BHK", "area": 1000,
+    "location_type": "Prime Location", "age": "Ready to Move", "floor": "4th-7th Floor",
+    "furnishing": "Semi-Furnished", "parking": "1 Car",
+    "amenities": {"lift": True, "power_backup": True, "security": True, "gym": False,
+                  "swimming_pool": False, "garden": False, "temple": False, "vastu": False},
+}
+
+
+def metric(value, unit, higher_is_better):
+    return {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+
+
+def best_of(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def bench_scalar(repeat, calls=100_000):
+    from pricing import AMENITIES, INPUT_COLUMNS, calculate_indian_property_price
+    from sample_listings import generate_listings
+
+    sample = generate_listings(1000, seed=2)
+    rows = list(sample[INPUT_COLUMNS].itertuples(index=False))
+    flags = sample[AMENITIES].to_dict("records")
+    argument_rows = [(*row, flag) for row, flag in zip(rows, flags)] * (calls // len(rows))
+
+    def run():
+        for arguments in argument_rows:
+            calculate_indian_property_price(*arguments)
+
+    seconds = best_of(run, repeat)
+    return {"scalar.calls_per_s": metric(round(len(argument_rows) / seconds), "calls/s", True)}
+
+
+def random_codes(cube, n_rows, seed=0):
+    """Batch-function arguments as compact integer codes, so 1e7 rows fit comfortably in memory."""
+    rng = np.random.default_rng(seed)
+    columns = {name: rng.integers(0, len(names), n_rows, dtype=np.int16) for name, names in cube.categories.items()}
+    columns["parking"] = rng.integers(0, len(cube.parking_categories), n_rows, dtype=np.int16)
+    columns["area"] = rng.integers(200, 5001, n_rows).astype(np.float64)
+    amenities = rng.random((n_rows, len(cube.amenities))) < 0.5
+    return (
+        columns["city"], columns["property_type"], columns["bhk"], columns["area"], columns["location_type"],
+        columns["age"], columns["floor"], columns["furnishing"], columns["parking"], amenities
+    )
+
+
+def _size(n_rows):
+    # 100000 -> "1e5"
+    return f"{n_rows:.0e}".replace("e+0", "e").replace("e+", "e")
+
+
+def bench_batch(repeat, max_rows):
+    from pricing import calculate_indian_property_price_batch, current_cube, price_dataframe
+    from sample_listings import generate_listings
+
+    results = {}
+    cube = current_cube()
+    for n_rows in BATCH_SIZES:
+        if n_rows > max_rows:
+            continue
+        arguments = random_codes(cube, n_rows)
+        seconds = best_of(lambda: calculate_indian_property_price_batch(*arguments), repeat if n_rows < 10**7 else 2)
+        results[f"batch.codes_{_size(n_rows)}.rows_per_s"] = metric(round(n_rows / seconds), "rows/s", True)
+        del arguments
+
+    # Category names as they come from a file, including the encoding step
+    n_rows = int(min(100_000, max_rows))
+    df = generate_listings(n_rows, seed=3)
+    seconds = best_of(lambda: price_dataframe(df), repeat)
+    results[f"batch.names_{_size(n_rows)}.rows_per_s"] = metric(round(n_rows / seconds), "rows/s", True)
+    return results
+
+
+def skipped_metrics(args):
+    """Metrics the selected benchmarks leave out on purpose (batch sizes cut by --max-rows)."""
+    if "batch" not in args.only:
+        return []
+    skipped = [f"batch.codes_{_size(n_rows)}.rows_per_s" for n_rows in BATCH_SIZES if n_rows > args.max_rows]
+    if args.max_rows < 100_000:
+        skipped.append(f"batch.names_{_size(100_000)}.rows_per_s")
+    return skipped
+
+
+def _quiet_streamlit():
+    import logging
+
+    # AppTest runs outside `streamlit run` and warns about the missing runtime on every call
+    for name in ("streamlit", "streamlit.runtime.scriptrunner_utils.script_run_context",
+                 "streamlit.runtime.caching.cache_data_api"):
+        logging.getLogger(name).setLevel(logging.ERROR)
+
+
+def bench_app(repeat):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    _quiet_streamlit()
+    path = os.path.join(APP_DIR, "indian_app.py")
+
+    def render(press, clear=False):
+        at = AppTest.from_file(path, default_timeout=120)
+        at.run()
+        if clear:
+            st.cache_resource.clear()
+        start = time.perf_counter()
+        if press:
+            at.button[0].click().run()
+        else:
+            at.run()
+        seconds = time.perf_counter() - start
+        if at.exception:
+            raise RuntimeError(f"app raised: {at.exception[0].value}")
+        return seconds
+
+    render(press=True)  # warm imports so every sample measures a rerun
+    idle = [render(press=False) for _ in range(repeat)]
+    cold = [render(press=True, clear=True) for _ in range(repeat)]
+    warm = [render(press=True) for _ in range(repeat)]
+    return {
+        "app.idle_run_ms": metric(round(1000 * statistics.median(idle), 2), "ms", False),
+        "app.calculate_uncached_ms": metric(round(1000 * statistics.median(cold), 2), "ms", False),
+        "app.calculate_cached_ms": metric(round(1000 * statistics.median(warm), 2), "ms", False),
+    }
+
+
+def bench_figures(repeat):
+    import plotly.graph_objects as go
+    import plotly.io as pio
+    # Importing st.plotly_chart registers the Streamlit template the app's figures carry
+    import streamlit.elements.plotly_chart  # noqa: F401
+
+    from analytics import (
+        amortization_figure, build_figures, emi_heatmap_figure, price_breakdown, price_trend, sensitivity_figure
+    )
+    from charts import prepare
+    from emi import amortization_schedule, loan_amount, scenario_grid
+    from pricing import calculate_indian_property_price
+    from sensitivity import SWEEP_LABELS, sweep
+    from uncertainty import property_price_bands
+
+    inputs = SAMPLE_INPUTS
+    price = calculate_indian_property_price(*[inputs[name] for name in (
+        "city", "property_type", "bhk", "area", "location_type", "age", "floor", "furnishing", "parking", "amenities"
+    )])
+    bands = property_price_bands(inputs)
+    rates = np.arange(6.0, 13.01, 0.25)
+    tenures = np.array([5, 10, 15, 20, 25, 30])
+    grid = scenario_grid(price, rates, tenures, np.arange(0, 51, 5))
+    schedule = amortization_schedule(float(loan_amount(price)), 9.0, 20)
+    swept = sweep(inputs, "area", "city")
+    # Ten years of daily prices, standing in for a long history
+    days = np.arange(3650)
+    daily = price * np.exp(np.cumsum(np.random.default_rng(0).normal(0.0002, 0.01, len(days))))
+
+    # The breakdown and trend figures come from one build_figures call, so their build times overlap
+    builders = {
+        "breakdown": lambda: build_figures(price_breakdown(inputs), price_trend(price), bands)["breakdown"],
+        "trend": lambda: build_figures(price_breakdown(inputs), price_trend(price), bands)["trend"],
+        "emi_heatmap": lambda: emi_heatmap_figure(grid["emi"][:, :, 4], rates, tenures, 20),
+        "amortization": lambda: amortization_figure(schedule),
+        "what_if": lambda: sensitivity_figure(swept, SWEEP_LABELS["area"], SWEEP_LABELS["city"]),
+        "daily_series": lambda: go.Figure(go.Scatter(x=days, y=daily, mode='lines')),
+    }
+
+    def serialize(figure):
+        # st.plotly_chart validates dicts into a Figure before serializing, so do the same
+        return go.Figure(figure).to_json() if isinstance(figure, dict) else pio.to_json(figure.to_dict(), validate=False)
+
+    results = {}
+    for name, build in builders.items():
+        figure = build()
+        prepared = prepare(figure)[0]
+        build_seconds = best_of(build, repeat)
+        prepare_seconds = best_of(lambda: prepare(figure), repeat)
+        serialize_seconds = best_of(lambda: serialize(prepared), repeat)
+        results[f"figures.{name}.build_ms"] = metric(round(1000 * build_seconds, 3), "ms", False)
+        results[f"figures.{name}.prepare_ms"] = metric(round(1000 * prepare_seconds, 3), "ms", False)
+        results[f"figures.{name}.serialize_ms"] = metric(round(1000 * serialize_seconds, 3), "ms", False)
+        results[f"figures.{name}.payload_kb"] = metric(round(len(serialize(prepared)) / 1024, 1), "KiB", False)
+        results[f"figures.{name}.unprepared_payload_kb"] = metric(round(len(serialize(figure)) / 1024, 1), "KiB", False)
+    return results
+
+
+BENCHMARKS = {
+    "scalar": lambda args: bench_scalar(args.repeat),
+    "batch": lambda args: bench_batch(args.repeat, args.max_rows),
+    "app": lambda args: bench_app(args.repeat),
+    "figures": lambda args: bench_figures(args.repeat),
+}
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(baseline, current, threshold):
+    """Print a comparison table; returns the names of metrics that regressed beyond threshold.
+
+    A baseline metric absent from current also counts, unless current records
+    that its benchmark was not selected or that it was skipped on purpose, so
+    a benchmark that is dropped or stops reporting fails the gate.
+    """
+    regressions = []
+    print(f"{'metric':<42}{'baseline':>14}{'current':>14}{'change':>10}")
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None or not old["value"]:
+            print(f"{name:<42}{'-':>14}{new['value']:>14,}{'new':>10}")
+            continue
+        change = new["value"] / old["value"] - 1
+        worse = -change if new["higher_is_better"] else change
+        flag = "  REGRESSION" if worse > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<42}{old['value']:>14,}{new['value']:>14,}{change:>+10.1%}{flag}")
+    selected = current.get("benchmarks", list(BENCHMARKS))
+    skipped = set(current.get("skipped", []))
+    for name in sorted(baseline["results"].keys() - current["results"].keys()):
+        if name in skipped or name.split(".")[0] not in selected:
+            status = "skipped"
+        else:
+            status = "MISSING"
+            regressions.append(name)
+        print(f"{name:<42}{baseline['results'][name]['value']:>14,}{'-':>14}{status:>10}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-rows", type=float, default=max(BATCH_SIZES), help="skip batch sizes above this")
+    parser.add_argument("--baseline", help="after running, compare against this result file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="compare two result files and exit")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative slowdown (default 10%%)")
+    args = parser.parse_args()
+
+    if args.compare:
+        baseline, current = (json.load(open(path)) for path in args.compare)
+        regressions = compare(baseline, current, args.threshold)
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1 if regressions else 0)
+
+    results = {}
+    for name in args.only:
+        start = time.perf_counter()
+        results.update(BENCHMARKS[name](args))
+        print(f"{name}: done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    report = {
+        "environment": environment(), "benchmarks": args.only, "skipped": skipped_metrics(args), "results": results,
+    }
+
+    for metric_name, entry in results.items():
+        print(f"{metric_name:<42}{entry['value']:>14,} {entry['unit']}")
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+    if args.baseline:
+        print()
+        with open(args.baseline) as handle:
+            regressions = compare(json.load(handle), report, args.threshold)
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""Derived analytics and chart specs for one priced property.
+
+build_report() gathers everything the result section of the app shows, so
+the app can cache it as one value keyed by the full input tuple.
+"""
+from cashflow import DISCOUNT_RATE, irr, project
+from pricing import AMENITIES, calculate_indian_property_price, current_cube, derived_metrics
+from uncertainty import property_price_bands
+
+# Bumped whenever build_report() output changes shape, so persisted reports are recomputed
+REPORT_FORMAT = 4
+
+# Projected IRR above DISCOUNT_RATE grades "Good" (the NPV is positive); this much above it, "Excellent"
+EXCELLENT_MARGIN = 4.0
+
+# Labels for attribution.ATTRIBUTION_COLUMNS, in the same order
+BREAKDOWN_LABELS = {
+    "base": "City Base Rate", "locality": "Locality", "property_type": "Property Type", "location_type": "Location", "age": "Age",
+    "floor": "Floor", "furnishing": "Furnishing", "bhk": "BHK", "parking": "Parking", "amenities": "Amenities",
+}
+
+
+def report_key(inputs):
+    """Hashable key over every input to calculate_indian_property_price, amenities and locality included."""
+    amenities = inputs["amenities"]
+    return (
+        inputs["city"], inputs["property_type"], inputs["bhk"], inputs["area"], inputs["location_type"],
+        inputs["age"], inputs["floor"], inputs["furnishing"], inputs["parking"],
+        tuple(bool(amenities.get(name, False)) for name in AMENITIES),
+        inputs.get("locality"), inputs.get("locality_factor", 1.0),
+    )
+
+
+def price_breakdown(inputs, cube=None):
+    """The property's price split exactly across its inputs (see attribution.py)."""
+    from attribution import attribute_property
+
+    parts = attribute_property(inputs, cube)
+    return {
+        'Key': list(parts),
+        'Component': [BREAKDOWN_LABELS[name] for name in parts],
+        'Value': list(parts.values())
+    }
+
+
+def price_trend(predicted_price):
+    # Sample market trend data
+    months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun']
+    prices = [predicted_price * (0.95 + i * 0.02) for i in range(6)]
+    return {"months": months, "prices": prices}
+
+
+def market_insights(inputs):
+    city, location_type, bhk = inputs["city"], inputs["location_type"], inputs["bhk"]
+    return [
+        f"Property prices in {city} have shown {'strong growth' if city in ['Mumbai', 'Delhi NCR', 'Bangalore'] else 'steady appreciation'}",
+        f"{location_type} areas are {'highly sought after' if location_type in ['Prime Location', 'IT Hub'] else 'showing good potential'}",
+        f"{bhk} properties are {'in high demand' if bhk in ['2 BHK', '3 BHK'] else 'niche market segment'}",
+        f"Properties with amenities command {'premium pricing' if sum(inputs['amenities'].values()) >= 4 else 'standard rates'}",
+    ]
+
+
+def city_returns(city):
+    """Expected rental yield and yearly appreciation for a city, in %."""
+    rental_yield = 2.4 if city in ["Mumbai", "Delhi NCR"] else 3.0
+    appreciation = 8 if city in ["Mumbai", "Delhi NCR", "Bangalore"] else 6
+    return rental_yield, appreciation
+
+
+def investment_summary(predicted_price, city):
+    """Rent and returns for one property, graded on the IRR of buying it with the default loan.
+
+    The IRR comes from cashflow.project() over its default holding period and
+    loan terms, so leverage, costs, tax savings and the sale all count, not
+    just yield + appreciation (kept as "total_return").
+    """
+    rental_yield, appreciation = city_returns(city)
+    annual_rent = predicted_price * rental_yield / 100
+    projected_irr = float(irr(project(predicted_price, rental_yield, appreciation)["net"]))
+    return {
+        "annual_rent": annual_rent,
+        "monthly_rent": annual_rent / 12,
+        "rental_yield": rental_yield,
+        "appreciation": appreciation,
+        "total_return": rental_yield + appreciation,
+        "irr": projected_irr,
+        "grade": investment_grade(projected_irr),
+    }
+
+
+def investment_grade(projected_irr):
+    """Grade for a projected IRR in % per annum (NaN, when the flows never break even, is "Average")."""
+    if projected_irr > DISCOUNT_RATE + EXCELLENT_MARGIN:
+        return "Excellent"
+    return "Good" if projected_irr > DISCOUNT_RATE else "Average"
+
+
+def build_figures(breakdown, trend, bands=None):
+    """Plotly figure dicts for the breakdown waterfall and the trend line.
+
+    plotly is imported here rather than at module level so a session that
+    never presses the button never loads it. graph_objects is used instead
+    of plotly.express, which pulls in pandas and costs ~10x more to import.
+    """
+    import plotly.graph_objects as go
+
+    # Each input's share stacked from the city base rate up to the predicted price
+    waterfall = go.Figure(go.Waterfall(
+        x=breakdown['Component'] + ['Predicted Price'],
+        y=breakdown['Value'] + [0],
+        measure=['relative'] * len(breakdown['Value']) + ['total'],
+        increasing=dict(marker=dict(color='#667eea')),
+        decreasing=dict(marker=dict(color='#f59e0b')),
+        totals=dict(marker=dict(color='#764ba2')),
+        connector=dict(line=dict(color='#cbd5e1')),
+        hovertemplate="%{x}<br>₹%{y:,.0f}<extra></extra>"
+    ))
+    waterfall.update_layout(title="What Makes Up the Price", yaxis_title="Price (₹)", showlegend=False, height=450)
+
+    line = go.Figure()
+    if bands is not None:
+        # P5-P95 band around the trend, scaled from the simulated price band
+        price = trend["prices"][-1] / (0.95 + 5 * 0.02)
+        line.add_trace(go.Scatter(
+            x=trend["months"], y=[p * bands["p95"] / price for p in trend["prices"]],
+            mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'
+        ))
+        line.add_trace(go.Scatter(
+            x=trend["months"], y=[p * bands["p5"] / price for p in trend["prices"]],
+            mode='lines', line=dict(width=0), fill='tonexty',
+            fillcolor='rgba(102, 126, 234, 0.2)', name='P5-P95 Range'
+        ))
+    line.add_trace(go.Scatter(
+        x=trend["months"], y=trend["prices"],
+        mode='lines+markers',
+        name='Price Trend',
+        line=dict(color='#667eea', width=3),
+        marker=dict(size=8, color='#764ba2')
+    ))
+    line.update_layout(
+        title="6-Month Price Trend",
+        xaxis_title="Month",
+        yaxis_title="Price (₹)",
+        height=400
+    )
+    return {"breakdown": waterfall.to_dict(), "trend": line.to_dict()}
+
+
+def history_figure(series, city_series, price_per_sqft, title):
+    """Line chart of monthly ₹/sq ft with its rolling means against this property's rate.
+
+    series is PriceHistory.trend() for the city and location type;
+    city_series is the city-wide trend, drawn for comparison.
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=series["months"], y=series["mean"], mode='lines', name='Monthly average',
+        line=dict(color='#cbd5e1', width=1),
+        customdata=series["count"], hovertemplate="%{x}<br>₹%{y:,.0f}/sq ft<br>%{customdata:,} sales<extra></extra>"
+    ))
+    fig.add_trace(go.Scatter(
+        x=series["months"], y=series["rolling_3"], mode='lines', name='3-month average',
+        line=dict(color='#4facfe', width=2)
+    ))
+    fig.add_trace(go.Scatter(
+        x=series["months"], y=series["rolling_12"], mode='lines', name='12-month average',
+        line=dict(color='#667eea', width=3)
+    ))
+    fig.add_trace(go.Scatter(
+        x=city_series["months"], y=city_series["rolling_12"], mode='lines', name='City-wide 12-month',
+        line=dict(color='#764ba2', width=2, dash='dot')
+    ))
+    fig.add_hline(
+        y=price_per_sqft, line=dict(color='#f59e0b', dash='dash'),
+        annotation_text=f"This property ₹{price_per_sqft:,.0f}/sq ft"
+    )
+    fig.update_layout(
+        title=title,
+        xaxis_title="Month",
+        yaxis_title="Price per sq ft (₹)",
+        height=400
+    )
+    return fig
+
+
+CASHFLOW_COMPONENTS = {
+    "rent": ("Rent", '#4facfe'),
+    "tax_benefit": ("Tax Saved", '#00f2fe'),
+    "sale": ("Sale (net of loan)", '#667eea'),
+    "purchase": ("Purchase", '#f59e0b'),
+    "loan_payments": ("Loan Payments", '#764ba2'),
+    "maintenance": ("Maintenance", '#cbd5e1'),
+}
+
+
+def cashflow_figure(flows):
+    """Yearly cash-flow components as relative bars with the net flow line, for one cashflow.project() row."""
+    import plotly.graph_objects as go
+
+    years = list(range(len(flows["net"])))
+    fig = go.Figure()
+    for name, (label, color) in CASHFLOW_COMPONENTS.items():
+        fig.add_trace(go.Bar(x=years, y=flows[name], name=label, marker_color=color))
+    fig.add_trace(go.Scatter(
+        x=years, y=flows["net"], name="Net Cash Flow", mode='lines+markers',
+        line=dict(color='#1e293b', width=2), marker=dict(size=6)
+    ))
+    fig.update_layout(
+        title="Projected Cash Flows",
+        barmode="relative",
+        xaxis_title="Year",
+        yaxis_title="Cash Flow (₹)",
+        height=450
+    )
+    return fig
+
+
+def emi_heatmap_figure(emi_grid, rates, tenures, down_payment):
+    """Heatmap of monthly EMI over interest rate (rows) x tenure (columns)."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Heatmap(
+        z=emi_grid, x=[f"{tenure} yrs" for tenure in tenures], y=rates,
+        colorscale=[[0, '#e0f2fe'], [0.5, '#667eea'], [1, '#764ba2']],
+        colorbar=dict(title="EMI (₹)"),
+        hovertemplate="Rate %{y:.2f}%<br>Tenure %{x}<br>EMI ₹%{z:,.0f}<extra></extra>"
+    ))
+    fig.update_layout(
+        title=f"Monthly EMI by Rate and Tenure ({down_payment}% down)",
+        xaxis_title="Tenure",
+        yaxis_title="Interest Rate (%)",
+        height=450
+    )
+    return fig
+
+
+def amortization_figure(schedule):
+    """Yearly principal vs interest bars with the outstanding balance line."""
+    import numpy as np
+    import plotly.graph_objects as go
+
+    years = (schedule["month"] - 1) // 12 + 1
+    n_years = int(years[-1])
+    interest = np.bincount(years, weights=schedule["interest"], minlength=n_years + 1)[1:]
+    principal = np.bincount(years, weights=schedule["principal"], minlength=n_years + 1)[1:]
+    balance = schedule["balance"][11::12]
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=list(range(1, n_years + 1)), y=principal, name="Principal", marker_color='#667eea'))
+    fig.add_trace(go.Bar(x=list(range(1, n_years + 1)), y=interest, name="Interest", marker_color='#4facfe'))
+    fig.add_trace(go.Scatter(
+        x=list(range(1, len(balance) + 1)), y=balance, name="Outstanding Balance",
+        yaxis="y2", line=dict(color='#764ba2', width=3)
+    ))
+    fig.update_layout(
+        title="Amortization Schedule",
+        barmode="stack",
+        xaxis_title="Year",
+        yaxis=dict(title="Paid per Year (₹)"),
+        yaxis2=dict(title="Balance (₹)", overlaying="y", side="right", showgrid=False),
+        height=400
+    )
+    return fig
+
+
+def sensitivity_figure(result, x_label, y_label=None, chart="Heatmap"):
+    """Heatmap or line family for a sensitivity.sweep() result."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    if result["y"] is None:
+        fig.add_trace(go.Scatter(
+            x=result["x"], y=result["prices"], mode='lines+markers',
+            line=dict(color='#667eea', width=3), marker=dict(size=6, color='#764ba2')
+        ))
+        fig.update_layout(title=f"Price vs {x_label}", xaxis_title=x_label, yaxis_title="Price (₹)", height=450)
+    elif chart == "Heatmap":
+        fig.add_trace(go.Heatmap(
+            z=result["prices"], x=result["x"], y=result["y"],
+            colorscale=[[0, '#e0f2fe'], [0.5, '#667eea'], [1, '#764ba2']],
+            colorbar=dict(title="Price (₹)"),
+            hovertemplate=f"{x_label}: %{{x}}<br>{y_label}: %{{y}}<br>Price ₹%{{z:,.0f}}<extra></extra>"
+        ))
+        fig.update_layout(title=f"Price by {x_label} and {y_label}", xaxis_title=x_label, yaxis_title=y_label, height=550)
+    else:
+        for y_value, row in zip(result["y"], result["prices"]):
+            fig.add_trace(go.Scatter(x=result["x"], y=row, mode='lines', name=str(y_value)))
+        fig.update_layout(
+            title=f"Price vs {x_label} by {y_label}", xaxis_title=x_label, yaxis_title="Price (₹)",
+            legend_title=y_label, height=550
+        )
+    return fig
+
+
+def build_report(inputs, cube=None):
+    """Price the property described by the sidebar inputs and derive everything the result tabs show.
+
+    Every figure comes from one set of pricing tables (the active ones unless
+    cube is given), whose version is recorded in the report.
+    """
+    cube = cube or current_cube()
+    predicted_price = calculate_indian_property_price(
+        inputs["city"], inputs["property_type"], inputs["bhk"], inputs["area"], inputs["location_type"],
+        inputs["age"], inputs["floor"], inputs["furnishing"], inputs["parking"], inputs["amenities"], cube,
+        inputs.get("locality_factor", 1.0)
+    )
+    breakdown = price_breakdown(inputs, cube)
+    trend = price_trend(predicted_price)
+    bands = property_price_bands(inputs, cube)
+    return {
+        "price": predicted_price,
+        "table_version": cube.version,
+        "bands": bands,
+        "metrics": derived_metrics(predicted_price, inputs["area"]),
+        "breakdown": breakdown,
+        "trend": trend,
+        "insights": market_insights(inputs),
+        "investment": investment_summary(predicted_price, inputs["city"]),
+        "figures": build_figures(breakdown, trend, bands),
+    }
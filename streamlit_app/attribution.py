@@ -0,0 +1,89 @@
+"""Exact attribution of a predicted price to the inputs that produced it.
+
+A price is area x city rate x the locality factor and six multipliers, plus
+the parking and amenity bonuses. The bonuses are additive already. The
+multiplicative part is split with the logarithmic mean: with B = area x city
+rate and M = B x the seven multipliers, factor f gets L(M, B) x log(m_f), where
+L(M, B) = (M - B) / log(M / B). The log terms sum to log(M / B), so the
+shares add up to M - B whatever order the factors are applied in. A factor
+at its neutral level (multiplier 1.0) gets nothing and a discount comes out
+negative.
+
+"base" is area x city rate. It also absorbs the float32 rounding of the
+price cube and the truncation to whole rupees, so the parts of every row sum
+to its predicted price.
+
+score_listings.py --attribution appends these columns to bulk scoring output.
+"""
+import numpy as np
+
+from pricing import AMENITIES, current_cube, frame_columns, price_components
+
+# Attribution columns in the order the breakdown chart stacks them
+ATTRIBUTION_COLUMNS = [
+    "base", "locality", "property_type", "location_type", "age", "floor", "furnishing", "bhk", "parking", "amenities",
+]
+
+
+def attribute_batch(city, property_type, bhk, area, location_type, age, floor, furnishing, parking, amenities=None,
+                    cube=None, locality_factor=None):
+    """Predicted price and its ATTRIBUTION_COLUMNS for equal-length input arrays.
+
+    Takes the same arguments as calculate_indian_property_price_batch and
+    returns a dict of float64 arrays plus the int64 "predicted_price".
+    """
+    cube = cube or current_cube()
+    columns = {
+        "city": city, "property_type": property_type, "location_type": location_type,
+        "age": age, "floor": floor, "furnishing": furnishing, "bhk": bhk,
+    }
+    # Encode once; price_components takes the integer codes as they are
+    codes = {factor: cube.encode(factor, columns[factor]) for factor in cube.factors}
+    rate, area, parking_bonus, amenity_bonus = price_components(
+        codes["city"], codes["property_type"], codes["bhk"], area, codes["location_type"], codes["age"],
+        codes["floor"], codes["furnishing"], cube.encode("parking", parking), amenities, cube, locality_factor
+    )
+    area = area.astype(np.float64)
+
+    # Same operation order as calculate_indian_property_price_batch
+    price = rate * area
+    price += parking_bonus
+    price += amenity_bonus
+    price = np.trunc(price)
+
+    city_rates = np.array(list(cube.factor_tables["city"].values()), dtype=np.float64)
+    base = city_rates[codes["city"]] * area
+    logs = {
+        factor: np.log(np.array(list(cube.factor_tables[factor].values()), dtype=np.float64))[codes[factor]]
+        for factor in cube.factors if factor != "city"
+    }
+    logs["locality"] = np.log(np.broadcast_to(1.0 if locality_factor is None else locality_factor, area.shape))
+    total_log = sum(logs.values())
+    # L(M, B) = B x expm1(S) / S with S = log(M / B), which tends to B as S -> 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_mean = base * np.where(total_log == 0, 1.0, np.expm1(total_log) / total_log)
+
+    result = {name: log_mean * logs[name] for name in ATTRIBUTION_COLUMNS if name in logs}
+    result["parking"] = parking_bonus.astype(np.float64)
+    result["amenities"] = amenity_bonus.astype(np.float64)
+    result["base"] = price - sum(result.values())
+    result = {name: result[name] for name in ATTRIBUTION_COLUMNS}
+    result["predicted_price"] = price.astype(np.int64)
+    return result
+
+
+def attribute_dataframe(df, cube=None):
+    """attribute_batch() over a listings DataFrame (see pricing.frame_columns for the schema)."""
+    return attribute_batch(*frame_columns(df), cube=cube)
+
+
+def attribute_property(inputs, cube=None):
+    """ATTRIBUTION_COLUMNS as plain floats for one property described like the sidebar inputs."""
+    result = attribute_batch(
+        [inputs["city"]], [inputs["property_type"]], [inputs["bhk"]], [inputs["area"]], [inputs["location_type"]],
+        [inputs["age"]], [inputs["floor"]], [inputs["furnishing"]], [inputs["parking"]],
+        {name: [bool(inputs["amenities"].get(name, False))] for name in AMENITIES}, cube,
+        inputs.get("locality_factor", 1.0)
+    )
+    return {name: float(result[name][0]) for name in ATTRIBUTION_COLUMNS}
+
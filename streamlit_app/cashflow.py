@@ -0,0 +1,201 @@
+"""Year-by-year cash flows of buying a property with a home loan, with NPV and IRR.
+
+The projection is from the buyer's side. Year 0 pays the down payment,
+stamp duty and registration. Each later year collects rent and pays
+maintenance and the loan instalments, and gets back tax saved under
+Sections 24 and 80C. The last year also sells at the appreciated value,
+less selling costs and the loan still outstanding.
+
+Everything broadcasts over array arguments, like emi.py, with the years
+on a trailing axis. irr() solves every row at once with safeguarded
+Newton iterations. A Newton step is taken only when it stays inside the row's
+sign-change bracket and is at most half the step before last. Otherwise the
+bracket is bisected, so a wild first step cannot leave a row creeping
+towards the root. Thousands of properties x scenarios solve in a few
+vectorized passes.
+
+Usage: python cashflow.py listings.parquet screened.parquet [--years 10] [--loan-rate 9]
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from emi import DEFAULT_DOWN_PAYMENT, DEFAULT_RATE, DEFAULT_TENURE, loan_amount, monthly_emi, outstanding_balance
+from pricing import REGISTRATION_RATE, STAMP_DUTY_RATE
+
+HORIZON_YEARS = 10
+DISCOUNT_RATE = 8.0  # % per annum, for NPV
+RENT_GROWTH = 5.0  # % per annum
+MAINTENANCE_RATE = 0.5  # % of property value per year
+SELLING_COST = 1.0  # % of the sale price (brokerage)
+TAX_RATE = 30.0  # % slab the deductions save at
+INTEREST_DEDUCTION = 200_000  # Section 24 limit per year
+PRINCIPAL_DEDUCTION = 150_000  # Section 80C limit per year
+
+
+def project(price, rent_yield, appreciation, years=HORIZON_YEARS, down_payment=DEFAULT_DOWN_PAYMENT,
+            loan_rate=DEFAULT_RATE, loan_tenure=DEFAULT_TENURE, rent_growth=RENT_GROWTH,
+            maintenance=MAINTENANCE_RATE, selling_cost=SELLING_COST, tax_rate=TAX_RATE):
+    """Cash-flow components for holding each property `years` years (rates in % per annum).
+
+    Returns a dict of arrays shaped like the broadcast arguments plus a
+    trailing axis of years + 1 (year 0 is the purchase): "purchase", "rent",
+    "maintenance", "loan_payments", "tax_benefit", "sale" and their sum "net".
+    """
+    def column(value):
+        return np.asarray(value, dtype=np.float64)[..., None]
+
+    price = column(price)
+    t = np.arange(years + 1, dtype=np.float64)
+    held = t >= 1
+
+    principal = loan_amount(price, column(down_payment))
+    rate, tenure = column(loan_rate), column(loan_tenure)
+    balance = outstanding_balance(principal, rate, tenure, np.minimum(12 * t, 12 * tenure))
+    months_paid = np.clip(12 * tenure - 12 * (t - 1), 0, 12) * held
+    payments = monthly_emi(principal, rate, tenure) * months_paid
+    principal_paid = np.concatenate([np.zeros_like(balance[..., :1]), balance[..., :-1] - balance[..., 1:]], axis=-1)
+    interest_paid = payments - principal_paid
+
+    value = price * (1 + column(appreciation) / 100) ** t
+    rent = price * column(rent_yield) / 100 * (1 + column(rent_growth) / 100) ** np.maximum(t - 1, 0) * held
+    upkeep = np.concatenate([np.zeros_like(value[..., :1]), value[..., :-1]], axis=-1) * column(maintenance) / 100
+    tax_benefit = column(tax_rate) / 100 * (
+        np.minimum(interest_paid, INTEREST_DEDUCTION) + np.minimum(principal_paid, PRINCIPAL_DEDUCTION)
+    )
+    sale = np.where(t == years, value * (1 - column(selling_cost) / 100) - balance, 0.0)
+    purchase = np.where(t == 0, -(price - principal) - price * (STAMP_DUTY_RATE + REGISTRATION_RATE), 0.0)
+
+    flows = {
+        "purchase": purchase,
+        "rent": rent,
+        "maintenance": -upkeep,
+        "loan_payments": -payments,
+        "tax_benefit": tax_benefit,
+        "sale": sale,
+    }
+    flows["net"] = sum(flows.values())
+    return flows
+
+
+def npv(flows, rate=DISCOUNT_RATE):
+    """Net present value of yearly flows (trailing axis, year 0 first) at rate % per annum."""
+    flows = np.asarray(flows, dtype=np.float64)
+    discount = (1 + np.asarray(rate, dtype=np.float64)[..., None] / 100) ** -np.arange(flows.shape[-1])
+    return (flows * discount).sum(axis=-1)
+
+
+def irr(flows, tol=1e-10, max_iter=200):
+    """Internal rate of return in % per annum for every row of yearly flows (trailing axis).
+
+    Rows without a sign change between -99% and ~10^4% per annum, or that do
+    not converge within max_iter steps, come back NaN.
+    """
+    flows = np.asarray(flows, dtype=np.float64)
+    shape, n_years = flows.shape[:-1], flows.shape[-1]
+    # Years first, so each Horner step below reads one contiguous row
+    cash = np.ascontiguousarray(flows.reshape(-1, n_years).T)
+
+    def value(columns, rate, slope=False):
+        # NPV is a polynomial in x = 1 / (1 + rate); Horner's rule gives it and its derivative
+        # in n_years vectorized steps without forming any powers
+        x = 1 / (1 + rate)
+        f = cash[-1, columns].copy()
+        df = np.zeros_like(f)
+        for year in range(n_years - 2, -1, -1):
+            if slope:
+                df = df * x + f
+            f = f * x + cash[year, columns]
+        return (f, -df * x * x) if slope else f
+
+    rows = np.arange(cash.shape[1])
+    low, high = np.full(len(rows), -0.99), np.full(len(rows), 1.0)
+    f_low, f_high = value(rows, low), value(rows, high)
+    # Widen the upper end for very high returns
+    for _ in range(8):
+        widen = (np.sign(f_low) == np.sign(f_high)) & (f_high != 0)
+        if not widen.any():
+            break
+        high[widen] = high[widen] * 4 + 1
+        f_high[widen] = value(rows[widen], high[widen])
+    bracketed = (np.sign(f_low) != np.sign(f_high)) | (f_high == 0)
+
+    result = np.full(len(rows), np.nan)
+    active = rows[bracketed]
+    low, high, f_low = low[active], high[active], f_low[active]
+    rate = np.clip(np.full(len(active), 0.1), low, high)
+    # Sizes of the last two steps; a Newton step must at least halve the older one (as in rtsafe)
+    step_size = high - low
+    old_step_size = step_size.copy()
+    for _ in range(max_iter):
+        if not len(active):
+            break
+        f, slope = value(active, rate, slope=True)
+        # Keep the root bracketed: replace whichever end has the same sign as f
+        same = np.sign(f) == np.sign(f_low)
+        low, f_low = np.where(same, rate, low), np.where(same, f, f_low)
+        high = np.where(same, high, rate)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = rate - f / slope
+        use_newton = np.isfinite(newton) & (newton > low) & (newton < high) \
+            & (2 * np.abs(newton - rate) <= old_step_size)
+        step = np.where(use_newton, newton, (low + high) / 2)
+        old_step_size, step_size = step_size, np.abs(step - rate)
+        done = (step_size <= tol * (1 + np.abs(rate))) | (f == 0)
+        result[active[done]] = np.where(f[done] == 0, rate[done], step[done])
+        keep = ~done
+        active, rate, low, high, f_low = active[keep], step[keep], low[keep], high[keep], f_low[keep]
+        step_size, old_step_size = step_size[keep], old_step_size[keep]
+    # Rows still active ran out of iterations and stay NaN
+    return (100 * result).reshape(shape)
+
+
+def city_assumptions(cities):
+    """Rent yield and appreciation (% per annum) per city, as the Investment Insights tab uses them."""
+    from analytics import city_returns
+
+    distinct, inverse = np.unique(np.asarray(cities, dtype=str), return_inverse=True)
+    returns = np.array([city_returns(city) for city in distinct], dtype=np.float64)[inverse.reshape(-1)]
+    return returns[:, 0], returns[:, 1]
+
+
+def screen(df, years=HORIZON_YEARS, discount_rate=DISCOUNT_RATE, cube=None, **terms):
+    """Price every listing in df and return its price, NPV and IRR columns as arrays."""
+    from pricing import price_dataframe
+
+    prices = price_dataframe(df, cube).astype(np.float64)
+    rent_yield, appreciation = city_assumptions(df["city"].to_numpy())
+    net = project(prices, rent_yield, appreciation, years, **terms)["net"]
+    return {"predicted_price": prices, "npv": npv(net, discount_rate), "irr": irr(net)}
+
+
+def main():
+    from score_listings import ChunkWriter, DEFAULT_CHUNK_ROWS, iter_chunks
+
+    parser = argparse.ArgumentParser(description="Screen a listings file by projected NPV and IRR")
+    parser.add_argument("input", help="CSV or Parquet listings file")
+    parser.add_argument("output", help="CSV or Parquet output file (by extension)")
+    parser.add_argument("--years", type=int, default=HORIZON_YEARS, help="holding period")
+    parser.add_argument("--discount-rate", type=float, default=DISCOUNT_RATE, help="%% per annum, for NPV")
+    parser.add_argument("--loan-rate", type=float, default=DEFAULT_RATE)
+    parser.add_argument("--loan-tenure", type=float, default=DEFAULT_TENURE)
+    parser.add_argument("--down-payment", type=float, default=DEFAULT_DOWN_PAYMENT)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = 0
+    with ChunkWriter(args.output) as writer:
+        for chunk in iter_chunks(args.input, args.chunk_rows):
+            result = screen(chunk, args.years, args.discount_rate, loan_rate=args.loan_rate,
+                            loan_tenure=args.loan_tenure, down_payment=args.down_payment)
+            writer.write(chunk.assign(**result))
+            rows += len(chunk)
+    seconds = time.perf_counter() - start
+    print(f"Screened {rows:,} listings in {seconds:.1f}s ({rows / seconds:,.0f} rows/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
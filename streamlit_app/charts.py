@@ -0,0 +1,172 @@
+"""Shrinks plotly figures before they are sent to the browser.
+
+prepare() takes a go.Figure or figure dict from analytics.py and returns a
+figure that draws the same chart from a smaller payload:
+
+* the full theme template (about 3.4 KiB per chart under Streamlit, most of
+  every small chart's payload) is swapped for a cached template holding only
+  the colorway; the Streamlit theme still styles the chart in the browser
+* line traces longer than DOWNSAMPLE_POINTS are reduced with
+  Largest-Triangle-Three-Buckets, which keeps peaks and troughs
+* heatmaps larger than HEATMAP_CELLS are strided down to fit
+* long float arrays are sent as float32 rather than float64
+* traces still above WEBGL_POINTS are drawn with WebGL (Scattergl)
+
+The result skips plotly's validation, which costs more than building the
+figure did; payload_bytes() gives the size that goes over the wire.
+"""
+import base64
+import functools
+
+import numpy as np
+
+DOWNSAMPLE_POINTS = 1000
+WEBGL_POINTS = 5000
+HEATMAP_CELLS = 40_000
+# Shorter arrays keep float64, so hover values on small charts match the figures shown elsewhere
+FLOAT32_MIN_LENGTH = 64
+
+
+def lttb(x, y, n_out):
+    """Indices of n_out points of (x, y) chosen by Largest-Triangle-Three-Buckets.
+
+    x must be increasing. The first and last points are always kept; each
+    bucket in between contributes the point forming the largest triangle
+    with the previous pick and the next bucket's average.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.intp) + 1
+    edges[-1] = n - 1
+    # Next-bucket averages for every bucket at once; the last bucket looks at the final point
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    sizes = np.diff(edges)
+    mean_x = np.append(sums_x / sizes, x[-1])
+    mean_y = np.append(sums_y / sizes, y[-1])
+
+    picks = np.empty(n_out, dtype=np.intp)
+    picks[0], picks[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        ax, ay = x[previous], y[previous]
+        area = np.abs((ax - mean_x[bucket + 1]) * (y[start:stop] - ay) - (ax - x[start:stop]) * (mean_y[bucket + 1] - ay))
+        previous = start + int(np.argmax(area))
+        picks[bucket + 1] = previous
+    return picks
+
+
+@functools.lru_cache(maxsize=None)
+def _colorway():
+    import plotly.io as pio
+
+    # The active default template is Streamlit's once streamlit is imported; its colorway
+    # holds placeholder colors the browser swaps for the current theme's palette
+    template = pio.templates[pio.templates.default] if pio.templates.default else None
+    colorway = template.layout.colorway if template is not None else None
+    return tuple(colorway) if colorway else ()
+
+
+def app_template():
+    """The compact template put on every prepared figure (a fresh copy; callers may mutate it)."""
+    colorway = _colorway()
+    return {"layout": {"colorway": list(colorway)}} if colorway else {}
+
+
+def _array(value):
+    # Figure dicts from to_dict() carry numpy arrays as base64 {"dtype", "bdata"} objects
+    if isinstance(value, dict) and "bdata" in value:
+        array = np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"])
+        return array.reshape(value["shape"]) if "shape" in value else array
+    return np.asarray(value)
+
+
+def _ordered_x(x, n):
+    # Numeric x is used as-is when increasing; category labels (months) by position
+    if x is None:
+        return np.arange(n, dtype=np.float64)
+    values = _array(x)
+    if values.dtype.kind not in "iuf":
+        return np.arange(n, dtype=np.float64)
+    if len(values) == n and np.all(np.diff(values) >= 0):
+        return values.astype(np.float64)
+    return None
+
+
+def _downsample_scatter(trace, max_points):
+    if trace.get("y") is None or "lines" not in trace.get("mode", "lines"):
+        return 0
+    y = _array(trace["y"]).astype(np.float64)
+    if len(y) <= max_points:
+        return 0
+    x = _ordered_x(trace.get("x"), len(y))
+    if x is None:
+        return 0
+    finite = np.flatnonzero(np.isfinite(y))
+    keep = finite[lttb(x[finite], y[finite], max_points)]
+    for key in ("x", "customdata", "text", "hovertext"):
+        value = trace.get(key)
+        if value is not None and not isinstance(value, str) and len(_array(value)) == len(y):
+            trace[key] = _array(value)[keep]
+    trace["y"] = y[keep]
+    return len(y) - len(keep)
+
+
+def _downsample_heatmap(trace, max_cells):
+    z = _array(trace["z"])
+    if z.ndim != 2 or z.size <= max_cells:
+        return 0
+    step = int(np.ceil(np.sqrt(z.size / max_cells)))
+    trace["z"] = z[::step, ::step]
+    for key, axis in (("x", 1), ("y", 0)):
+        if trace.get(key) is not None and len(_array(trace[key])) == z.shape[axis]:
+            trace[key] = _array(trace[key])[::step]
+    return z.size - trace["z"].size
+
+
+def _compact(value):
+    array = _array(value) if isinstance(value, dict) else value
+    if isinstance(array, np.ndarray) and array.dtype == np.float64 and array.size >= FLOAT32_MIN_LENGTH:
+        return array.astype(np.float32)
+    return value
+
+
+def prepare(figure, max_points=DOWNSAMPLE_POINTS, webgl_points=WEBGL_POINTS, max_cells=HEATMAP_CELLS):
+    """(figure, stats) ready for st.plotly_chart; stats counts points_dropped and webgl_traces."""
+    import plotly.graph_objects as go
+
+    if isinstance(figure, go.Figure):
+        # Per-trace JSON keeps numpy arrays as arrays rather than base64 objects
+        traces = [trace.to_plotly_json() for trace in figure.data]
+        layout = figure.layout.to_plotly_json()
+    else:
+        traces = [dict(trace) for trace in figure.get("data", [])]
+        layout = dict(figure.get("layout", {}))
+    layout["template"] = app_template()
+    dropped = webgl = 0
+    for trace in traces:
+        kind = trace.get("type", "scatter")
+        if kind == "scatter":
+            dropped += _downsample_scatter(trace, max_points)
+            if trace.get("y") is not None and len(_array(trace["y"])) > webgl_points:
+                trace["type"] = "scattergl"
+                webgl += 1
+        elif kind == "heatmap":
+            dropped += _downsample_heatmap(trace, max_cells)
+        for key in ("x", "y", "z", "customdata"):
+            if key in trace:
+                trace[key] = _compact(trace[key])
+    # Everything here came from validated figures, so skip plotly's (slow) validation
+    prepared = go.Figure({"data": traces, "layout": layout}, _validate=False)
+    return prepared, {"points_dropped": dropped, "webgl_traces": webgl}
+
+
+def payload_bytes(figure):
+    """Size of the JSON st.plotly_chart sends for figure."""
+    import plotly.io as pio
+
+    return len(pio.to_json(figure, validate=False))
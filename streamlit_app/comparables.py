@@ -0,0 +1,231 @@
+"""Comparable ("similar") properties from a listings dataset.
+
+Listings are split exactly on city and property type, and each group gets a
+KD-tree over numeric encodings of the remaining pricing inputs:
+
+* log(area)
+* log of the location, age, floor, furnishing and BHK multipliers, so two
+  categories are close when the model prices them alike
+* parking bonus (in lakh) and the amenity flags
+
+each scaled by FEATURE_WEIGHTS. The index is built once. A query bounds its
+distance to every leaf box of its group's tree in one vectorized step, then
+scans the leaves nearest-first until no unscanned box can hold a closer
+listing, returning the exact k nearest, typically in well under a
+millisecond.
+
+The features are encoded with the pricing tables the index was built with,
+and queries reuse them, so a hot reload never measures a query against
+listings encoded under other multipliers. Listings carry no locality, so the
+locality chosen in the sidebar does not affect which listings are similar.
+
+Set LISTINGS_PATH to a CSV or Parquet file with an observed "price" column to
+enable the app's Similar Properties tab.
+"""
+import os
+import time
+
+import numpy as np
+
+from pricing import AMENITIES, calculate_indian_property_price_batch, current_cube
+
+EXACT_FACTORS = ("city", "property_type")
+NUMERIC_FACTORS = ("location_type", "age", "floor", "furnishing", "bhk")
+
+# Relative importance of each encoded feature in the distance
+FEATURE_WEIGHTS = {
+    "area": 1.0,  # a 25% size difference counts about 0.22
+    "location_type": 2.0,
+    "age": 2.0,
+    "floor": 2.0,
+    "furnishing": 2.0,
+    "bhk": 2.0,  # one BHK step counts about 0.19
+    "parking": 0.05,  # per lakh of parking bonus
+    "amenities": 0.1,  # per amenity that differs
+}
+
+
+class KDTree:
+    """Exact k-nearest-neighbour search over a small dense point set.
+
+    Points are split recursively at the median of their widest dimension
+    down to leaves of at most leaf_size points, stored as contiguous slices
+    with their bounding boxes. A query bounds its distance to every leaf box
+    in one vectorized step, then scans leaves nearest-first in growing
+    batches until the next box is farther than the k-th best point found.
+    """
+
+    def __init__(self, points, leaf_size=32):
+        points = np.asarray(points, dtype=np.float64)
+        order = np.arange(len(points))
+        leaves = []
+        stack = [(0, len(points))]
+        while stack:
+            start, stop = stack.pop()
+            box = points[order[start:stop]]
+            spread = box.max(axis=0) - box.min(axis=0)
+            if stop - start <= leaf_size or not spread.any():
+                leaves.append((start, stop))
+                continue
+            dim = int(np.argmax(spread))
+            middle = (stop - start) // 2
+            order[start:stop] = order[start:stop][np.argpartition(box[:, dim], middle)]
+            stack.append((start + middle, stop))
+            stack.append((start, start + middle))
+
+        self.order = order
+        self.points = points[order]
+        self.leaf_rows = [np.arange(start, stop) for start, stop in leaves]
+        self.lows = np.array([self.points[start:stop].min(axis=0) for start, stop in leaves])
+        self.highs = np.array([self.points[start:stop].max(axis=0) for start, stop in leaves])
+
+    def __len__(self):
+        return len(self.points)
+
+    def query(self, point, k=5):
+        """(squared distances, original row positions) of the k nearest points, nearest first."""
+        point = np.asarray(point, dtype=np.float64)
+        k = min(k, len(self.points))
+        gap = np.maximum(self.lows - point, 0) + np.maximum(point - self.highs, 0)
+        bounds = np.einsum("ij,ij->i", gap, gap)
+        leaf_order = np.argsort(bounds, kind="stable")
+
+        best_distances = np.zeros(0)
+        best_rows = np.zeros(0, dtype=np.intp)
+        taken, batch = 0, 4
+        while taken < len(leaf_order):
+            if len(best_distances) == k and bounds[leaf_order[taken]] > best_distances[-1]:
+                break
+            rows = np.concatenate([self.leaf_rows[leaf] for leaf in leaf_order[taken:taken + batch]])
+            taken += batch
+            batch *= 2
+            offsets = self.points[rows] - point
+            # Merge into the running k best; ties keep the lower position so results are deterministic
+            distances = np.concatenate([best_distances, np.einsum("ij,ij->i", offsets, offsets)])
+            rows = np.concatenate([best_rows, rows])
+            keep = np.lexsort((rows, distances))[:k]
+            best_distances, best_rows = distances[keep], rows[keep]
+        return best_distances, self.order[best_rows]
+
+
+def encode_features(columns, cube):
+    """Weighted feature matrix (rows, features) for a dict of input columns."""
+    log_tables = {
+        factor: np.log(np.array(list(cube.factor_tables[factor].values()), dtype=np.float64))
+        for factor in NUMERIC_FACTORS
+    }
+    features = [FEATURE_WEIGHTS["area"] * np.log(np.asarray(columns["area"], dtype=np.float64))]
+    for factor in NUMERIC_FACTORS:
+        features.append(FEATURE_WEIGHTS[factor] * log_tables[factor][cube.encode(factor, columns[factor])])
+    features.append(FEATURE_WEIGHTS["parking"] * cube.parking_bonus[cube.encode("parking", columns["parking"])] / 1e5)
+    flags = columns["amenities"].astype(np.float64)
+    return np.column_stack(features + [FEATURE_WEIGHTS["amenities"] * flags])
+
+
+def _frame_columns(df):
+    flags = np.zeros((len(df), len(AMENITIES)), dtype=bool)
+    for i, name in enumerate(AMENITIES):
+        if name in df.columns:
+            flags[:, i] = df[name].to_numpy(dtype=bool)
+    columns = {name: df[name].to_numpy() for name in ("area", "parking", *EXACT_FACTORS, *NUMERIC_FACTORS)}
+    columns["amenities"] = flags
+    return columns
+
+
+class ComparablesIndex:
+    """Nearest-neighbour index over a listings DataFrame with an observed price column."""
+
+    def __init__(self, df, price_column="price", leaf_size=32, cube=None):
+        start = time.perf_counter()
+        if price_column not in df.columns:
+            raise ValueError(f"listings need a '{price_column}' column")
+        cube = cube or current_cube()
+        # Queries must be encoded with the same tables as the listings
+        self.cube = cube
+        self.table_version = cube.version
+
+        columns = _frame_columns(df)
+        features = encode_features(columns, cube)
+        # Compact copies of what a result needs, so queries never touch pandas
+        self.categories = {factor: np.array(cube.categories[factor], dtype=object) for factor in cube.factors}
+        self.categories["parking"] = np.array(cube.parking_categories, dtype=object)
+        self.codes = {factor: cube.encode(factor, columns[factor]).astype(np.int16) for factor in self.categories}
+        self.area = np.asarray(columns["area"], dtype=np.float64)
+        self.amenities = columns["amenities"]
+        self.prices = df[price_column].to_numpy(dtype=np.float64)
+        group_codes = np.column_stack([self.codes[factor] for factor in EXACT_FACTORS])
+        self.trees = {}
+        self.rows = {}
+        # Sort once by group so every group's rows are one slice
+        order = np.lexsort(group_codes.T[::-1])
+        keys, starts = np.unique(group_codes[order], axis=0, return_index=True)
+        for key, begin, end in zip(keys, starts, [*starts[1:], len(order)]):
+            rows = order[begin:end]
+            self.rows[tuple(key)] = rows
+            self.trees[tuple(key)] = KDTree(features[rows], leaf_size)
+        self.build_seconds = time.perf_counter() - start
+
+    @classmethod
+    def from_file(cls, path, **options):
+        import pandas as pd
+
+        if str(path).lower().endswith((".parquet", ".pq")):
+            df = pd.read_parquet(path)
+        else:
+            df = pd.read_csv(path)
+        return cls(df, **options)
+
+    def __len__(self):
+        return len(self.prices)
+
+    def _group_key(self, inputs):
+        return tuple(int(self.cube.encode(factor, [inputs[factor]])[0]) for factor in EXACT_FACTORS)
+
+    def group_size(self, inputs):
+        """Number of listings sharing the city and property type of inputs."""
+        rows = self.rows.get(self._group_key(inputs))
+        return 0 if rows is None else len(rows)
+
+    def query(self, inputs, k=5):
+        """The k listings most similar to the sidebar inputs, nearest first.
+
+        Returns a dict of equal-length columns: "row" (position in the
+        listings the index was built from), the pricing inputs, "amenities"
+        (count), the observed "price", the model's "model_price" and the
+        "distance". Columns are empty when no listing shares the city and
+        property type. "model_price" uses the active pricing tables, like the
+        app's own prediction.
+        """
+        cube = self.cube
+        key = self._group_key(inputs)
+        tree = self.trees.get(key)
+        if tree is None:
+            rows, distances = np.zeros(0, dtype=np.intp), np.zeros(0)
+        else:
+            flags = np.array([[bool(inputs["amenities"].get(name, False)) for name in AMENITIES]])
+            query_columns = {name: [inputs[name]] for name in ("area", "parking", *NUMERIC_FACTORS)}
+            point = encode_features({**query_columns, "amenities": flags}, cube)[0]
+            squared, positions = tree.query(point, k)
+            rows, distances = self.rows[key][positions], np.sqrt(squared)
+
+        codes = {factor: values[rows] for factor, values in self.codes.items()}
+        model_prices = calculate_indian_property_price_batch(
+            codes["city"], codes["property_type"], codes["bhk"], self.area[rows], codes["location_type"],
+            codes["age"], codes["floor"], codes["furnishing"], codes["parking"], self.amenities[rows], current_cube()
+        )
+        result = {"row": rows}
+        result.update({factor: self.categories[factor][codes[factor]] for factor in self.categories})
+        result.update({
+            "area": self.area[rows],
+            "amenities": self.amenities[rows].sum(axis=1),
+            "price": self.prices[rows],
+            "model_price": model_prices,
+            "distance": distances,
+        })
+        return result
+
+
+def open_from_env():
+    """ComparablesIndex over $LISTINGS_PATH, or None when unset."""
+    path = os.environ.get("LISTINGS_PATH")
+    return ComparablesIndex.from_file(path) if path else None
@@ -0,0 +1,74 @@
+"""Exact home-loan EMI and amortization, vectorized with NumPy.
+
+All functions take the annual interest rate in percent and the tenure in
+years, and broadcast over array arguments, so a whole grid of rate x tenure
+x down-payment scenarios is evaluated in one pass.
+"""
+import numpy as np
+
+DEFAULT_RATE = 9.0  # % per annum
+DEFAULT_TENURE = 20  # years
+DEFAULT_DOWN_PAYMENT = 20.0  # % of property value
+
+
+def monthly_emi(principal, annual_rate, years):
+    """Equated monthly instalment P·r·(1+r)^n / ((1+r)^n − 1), with r monthly and n months."""
+    principal = np.asarray(principal, dtype=np.float64)
+    r = np.asarray(annual_rate, dtype=np.float64) / 1200
+    n = np.asarray(years, dtype=np.float64) * 12
+    growth = np.power(1 + r, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = np.where(r > 0, principal * r * growth / (growth - 1), principal / n)
+    return payment if payment.ndim else float(payment)
+
+
+def loan_amount(price, down_payment_pct=DEFAULT_DOWN_PAYMENT):
+    return np.asarray(price, dtype=np.float64) * (1 - np.asarray(down_payment_pct, dtype=np.float64) / 100)
+
+
+def total_interest(principal, annual_rate, years):
+    return monthly_emi(principal, annual_rate, years) * np.asarray(years) * 12 - np.asarray(principal)
+
+
+def outstanding_balance(principal, annual_rate, years, months_paid):
+    """Balance left after months_paid instalments (closed form, no month-by-month loop)."""
+    principal = np.asarray(principal, dtype=np.float64)
+    r = np.asarray(annual_rate, dtype=np.float64) / 1200
+    k = np.asarray(months_paid, dtype=np.float64)
+    payment = monthly_emi(principal, annual_rate, years)
+    growth = np.power(1 + r, k)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        balance = np.where(r > 0, principal * growth - payment * (growth - 1) / r, principal - payment * k)
+    return np.maximum(balance, 0.0)
+
+
+def amortization_schedule(principal, annual_rate=DEFAULT_RATE, years=DEFAULT_TENURE):
+    """Month-by-month schedule for one loan as a dict of equal-length arrays."""
+    months = np.arange(1, int(round(years * 12)) + 1)
+    payment = monthly_emi(principal, annual_rate, years)
+    balance = outstanding_balance(principal, annual_rate, years, months)
+    opening = np.concatenate(([float(principal)], balance[:-1]))
+    principal_paid = opening - balance
+    return {
+        "month": months,
+        "payment": np.full(len(months), payment),
+        "interest": payment - principal_paid,
+        "principal": principal_paid,
+        "balance": balance,
+    }
+
+
+def scenario_grid(price, rates, tenures, down_payments):
+    """EMI, loan amount and total interest for every rate x tenure x down-payment combination.
+
+    Each result array has shape (len(rates), len(tenures), len(down_payments)).
+    """
+    rates = np.asarray(rates, dtype=np.float64)[:, None, None]
+    tenures = np.asarray(tenures, dtype=np.float64)[None, :, None]
+    loans = loan_amount(price, np.asarray(down_payments, dtype=np.float64))[None, None, :]
+    payment = monthly_emi(loans, rates, tenures)
+    return {
+        "emi": payment,
+        "loan": np.broadcast_to(loans, payment.shape),
+        "total_interest": payment * tenures * 12 - loans,
+    }
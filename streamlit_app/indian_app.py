@@ -1,8 +1,14 @@
+import os
+
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
+
+from prediction_cache import LRUCache
+from tracing import get_tracer
+
+# Opt-in section timings and counters (APP_TRACE_FILE / APP_METRICS_PORT); a no-op otherwise
+tracer = get_tracer()
+tracer.start_rerun()
+tracer.section("page_setup")
 
 # Set the page configuration
 st.set_page_config(
@@ -112,6 +118,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Title with modern blue-purple gradient
+tracer.section("title")
 st.markdown("""
 <div style="text-align: center; padding: 2rem 0;">
     <h1 style="
@@ -128,7 +135,18 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Locality rates at LOCALITIES_PATH, read once per process; None hides the locality search
+@st.cache_resource
+def get_locality_index():
+    if not os.environ.get("LOCALITIES_PATH"):
+        return None
+    from localities import open_from_env
+    return open_from_env()
+
+ANY_LOCALITY = "Any locality (city base rate)"
+
 # Sidebar with Indian property inputs
+tracer.section("sidebar")
 with st.sidebar:
     st.markdown("""
     <div style="
@@ -153,6 +171,26 @@ with st.sidebar:
         label_visibility="collapsed"
     )
     
+    # Locality typeahead: the prefix index returns a few matches per search, so
+    # the selectbox never carries the city's full locality list
+    locality, locality_factor = None, 1.0
+    locality_index = get_locality_index()
+    if locality_index is not None:
+        st.markdown("**🗺️ Locality**")
+        query = st.text_input(
+            "Search Locality", key="locality_query", placeholder="Type the start of a locality name",
+            label_visibility="collapsed"
+        )
+        with tracer.span("locality.search"):
+            matches = locality_index.search(city, query.strip())
+        choice = st.selectbox("Locality", [ANY_LOCALITY] + matches, label_visibility="collapsed")
+        if choice != ANY_LOCALITY:
+            locality, locality_factor = choice, locality_index.factor(city, choice)
+            st.markdown(f"<small style='color: #64748b;'>{locality_factor:.2f}× the {city} base rate</small>", unsafe_allow_html=True)
+        elif query.strip():
+            start, stop = locality_index.prefix_range(city, query.strip())
+            st.markdown(f"<small style='color: #64748b;'>{stop - start:,} of {locality_index.count(city):,} localities match</small>", unsafe_allow_html=True)
+    
     # Property type
     st.markdown("**🏠 Property Type**")
     property_type = st.selectbox(
@@ -235,88 +273,104 @@ with st.sidebar:
     amenities['temple'] = st.checkbox("🛕 Temple/Prayer Room")
     amenities['vastu'] = st.checkbox("🕉️ Vastu Compliant")
 
-# Enhanced prediction function for Indian market
-def calculate_indian_property_price(city, property_type, bhk, area, location_type, age, floor, furnishing, parking, amenities):
-    # Base prices per sq ft for major Indian cities (in INR)
-    city_prices = {
-        "Mumbai": 25000, "Delhi NCR": 12000, "Bangalore": 8500, "Hyderabad": 6500,
-        "Chennai": 7000, "Pune": 7500, "Kolkata": 5500, "Ahmedabad": 5000,
-        "Surat": 4500, "Jaipur": 4000, "Lucknow": 3500, "Kanpur": 3000,
-        "Nagpur": 3500, "Indore": 3200, "Bhopal": 3000, "Visakhapatnam": 4500,
-        "Patna": 2800, "Vadodara": 4200, "Ghaziabad": 5500, "Ludhiana": 4000
-    }
-    
-    # Property type multipliers
-    property_multipliers = {
-        "Apartment/Flat": 1.0, "Independent House": 1.2, "Villa": 1.5,
-        "Builder Floor": 1.1, "Penthouse": 1.8, "Studio Apartment": 0.85
-    }
-    
-    # Location multipliers
-    location_multipliers = {
-        "Prime Location": 1.4, "Central Area": 1.2, "Suburb": 1.0,
-        "Outskirts": 0.8, "IT Hub": 1.3, "Business District": 1.25
-    }
-    
-    # Age multipliers
-    age_multipliers = {
-        "Under Construction": 0.9, "Ready to Move": 1.0, "0-1 Years": 1.05,
-        "1-5 Years": 1.0, "5-10 Years": 0.95, "10-15 Years": 0.85, "15+ Years": 0.75
-    }
-    
-    # Floor multipliers
-    floor_multipliers = {
-        "Ground Floor": 0.95, "1st-3rd Floor": 1.0, "4th-7th Floor": 1.05,
-        "8th-12th Floor": 1.08, "Above 12th Floor": 1.12
-    }
-    
-    # Furnishing multipliers
-    furnishing_multipliers = {
-        "Unfurnished": 1.0, "Semi-Furnished": 1.08, "Fully Furnished": 1.15
-    }
-    
-    # Calculate base price
-    base_price = city_prices[city] * area
-    
-    # Apply all multipliers
-    base_price *= property_multipliers[property_type]
-    base_price *= location_multipliers[location_type]
-    base_price *= age_multipliers[age]
-    base_price *= floor_multipliers[floor]
-    base_price *= furnishing_multipliers[furnishing]
-    
-    # BHK adjustments
-    bhk_multipliers = {"1 RK": 0.8, "1 BHK": 0.9, "2 BHK": 1.0, "3 BHK": 1.1, "4 BHK": 1.2, "5+ BHK": 1.3}
-    base_price *= bhk_multipliers[bhk]
-    
-    # Parking bonus
-    parking_bonus = {"No Parking": 0, "1 Car": 200000, "2 Cars": 350000, "3+ Cars": 500000}
-    base_price += parking_bonus[parking]
-    
-    # Amenities bonus
-    amenity_bonus = 0
-    if amenities['lift']: amenity_bonus += 100000
-    if amenities['power_backup']: amenity_bonus += 150000
-    if amenities['security']: amenity_bonus += 200000
-    if amenities['gym']: amenity_bonus += 300000
-    if amenities['swimming_pool']: amenity_bonus += 500000
-    if amenities['garden']: amenity_bonus += 100000
-    if amenities['temple']: amenity_bonus += 50000
-    if amenities['vastu']: amenity_bonus += 100000
-    
-    base_price += amenity_bonus
-    
-    return int(base_price)
-
-# Calculate prediction
-predicted_price = calculate_indian_property_price(
-    city, property_type, bhk, area, location_type, age, floor, furnishing, parking, amenities
-)
+# One report cache shared by every session; kiosk traffic repeats a few popular configurations
+@st.cache_resource
+def get_report_cache():
+    return LRUCache(maxsize=256)
 
-# Main prediction section
+# What-if sweeps, cached per base configuration and swept inputs
+@st.cache_resource
+def get_sweep_cache():
+    return LRUCache(maxsize=128)
+
+# Optional on-disk store shared by all app processes (set PRICE_CACHE_DB to enable)
+@st.cache_resource
+def get_result_store():
+    from result_store import open_from_env
+    return open_from_env()
+
+# Nearest-neighbour index over the listings at LISTINGS_PATH, built once per process
+@st.cache_resource
+def get_comparables_index():
+    from comparables import open_from_env
+    return open_from_env()
+
+# Memory-mapped price history at PRICE_HISTORY_PATH, opened once per process
+@st.cache_resource
+def get_price_history():
+    from price_history import open_from_env
+    return open_from_env()
+
+def compute_report(inputs, tables):
+    from analytics import REPORT_FORMAT, build_report
+
+    tracer.count("report_cache_misses")
+    store = get_result_store()
+    with tracer.span("report.compute"):
+        if store is None:
+            return build_report(inputs, tables)
+        return store.get_or_compute(
+            {**inputs, "report_format": REPORT_FORMAT}, lambda: build_report(inputs, tables), tables.version
+        )
+
+# Charts shrunk by charts.prepare(), for figures that come from the cached report
+@st.cache_resource
+def get_chart_cache():
+    return LRUCache(maxsize=512)
+
+def show_chart(figure, name, cache_key=None):
+    """st.plotly_chart for the figure after charts.prepare(), recording its payload size when tracing is on.
+
+    figure may be a function returning the figure. With a cache_key covering
+    everything the figure depends on, it is built and prepared once per
+    process and reused on later reruns.
+    """
+    from charts import payload_bytes, prepare
+
+    build = figure if callable(figure) else lambda: figure
+    if cache_key is None:
+        figure, stats = prepare(build())
+    else:
+        figure, stats = get_chart_cache().get_or_compute((name, cache_key), lambda: prepare(build()))
+    if tracer.enabled:
+        tracer.record_bytes(name, payload_bytes(figure))
+        tracer.count("chart_points_dropped", stats["points_dropped"])
+        tracer.count("chart_webgl_traces", stats["webgl_traces"])
+    st.plotly_chart(figure, use_container_width=True)
+
+inputs = {
+    "city": city, "property_type": property_type, "bhk": bhk, "area": area,
+    "location_type": location_type, "age": age, "floor": floor,
+    "furnishing": furnishing, "parking": parking, "amenities": amenities,
+    "locality": locality, "locality_factor": locality_factor
+}
+
+# Remember the last calculated inputs so widgets inside the result tabs can rerun
+# the script without hiding the results; any sidebar change still hides them
+tracer.section("button")
 if st.button("🎯 Calculate Property Price", type="primary", use_container_width=True):
+    tracer.count("button_presses")
+    st.session_state["calculated_inputs"] = inputs
+
+# Main prediction section
+if st.session_state.get("calculated_inputs") == inputs:
+    tracer.section("pricing")
+    
+    # Pricing and chart modules load on the first press, keeping them off the cold-start path
+    import numpy as np
+    from analytics import report_key
+    from pricing import current_cube
+
+    # One set of pricing tables for this whole rerun; a hot reload changes the version and so the cache keys
+    tables = current_cube()
+
+    # Calculate prediction, or reuse the cached report for identical inputs
+    report_id = (tables.version, report_key(inputs))
+    report = get_report_cache().get_or_compute(report_id, lambda: compute_report(inputs, tables))
+    predicted_price = report["price"]
     
     # Main prediction display
+    tracer.section("result_card")
     st.markdown("""
     <div style="
         background: linear-gradient(135deg, #f0f9ff 0%, #e0f2fe 100%);
@@ -332,16 +386,18 @@ if st.button("🎯 Calculate Property Price", type="primary", use_container_widt
             ₹{:,}
         </h1>
         <p style="color: #64748b; margin: 0; font-size: 1.2rem;">
-            {:.2f} Crores | ±12% accuracy range
+            {:.2f} Crores | 90% range ₹{:.2f} – {:.2f} Cr
         </p>
     </div>
-    """.format(predicted_price, predicted_price/10000000), unsafe_allow_html=True)
+    """.format(predicted_price, predicted_price/10000000, report["bands"]["p5"]/10000000, report["bands"]["p95"]/10000000), unsafe_allow_html=True)
+    st.caption(f"Pricing tables version {tables.version}")
     
     # Key metrics
+    metrics = report["metrics"]
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        price_per_sqft = predicted_price / area
+        price_per_sqft = metrics["price_per_sqft"]
         st.metric(
             "💹 Price per Sq Ft",
             f"₹{price_per_sqft:,.0f}",
@@ -349,15 +405,15 @@ if st.button("🎯 Calculate Property Price", type="primary", use_container_widt
         )
     
     with col2:
-        monthly_emi = predicted_price * 0.0075  # 9% interest rate
+        monthly_emi = metrics["monthly_emi"]
         st.metric(
             "🏦 Monthly EMI",
             f"₹{monthly_emi:,.0f}",
-            delta="@ 9% for 20 years"
+            delta="@ 9% for 20 years, 20% down"
         )
     
     with col3:
-        stamp_duty = predicted_price * 0.05  # 5% stamp duty
+        stamp_duty = metrics["stamp_duty"]
         st.metric(
             "📋 Stamp Duty (Est.)",
             f"₹{stamp_duty:,.0f}",
@@ -365,7 +421,7 @@ if st.button("🎯 Calculate Property Price", type="primary", use_container_widt
         )
     
     with col4:
-        registration = predicted_price * 0.01  # 1% registration
+        registration = metrics["registration_fee"]
         st.metric(
             "📄 Registration Fee",
             f"₹{registration:,.0f}",
@@ -375,42 +431,44 @@ if st.button("🎯 Calculate Property Price", type="primary", use_container_widt
     # Analysis tabs
     st.markdown("### 🔍 Detailed Analysis")
     
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs([
         "📊 Price Breakdown", 
         "🏡 Property Summary", 
         "📈 Market Analysis", 
-        "💼 Investment Insights"
+        "💼 Investment Insights",
+        "🏦 Loan Planner",
+        "🔬 What-If",
+        "🏘️ Similar Properties",
+        "📁 Portfolio"
     ])
     
     with tab1:
+        tracer.section("tab.breakdown")
         # Price breakdown
         st.markdown("#### 💰 Price Breakdown")
         
-        breakdown = {
-            'Component': ['Base Property', 'Location Premium', 'Amenities', 'Market Factors'],
-            'Value': [predicted_price * 0.6, predicted_price * 0.25, predicted_price * 0.1, predicted_price * 0.05]
-        }
+        breakdown = report["breakdown"]
+        show_chart(report["figures"]["breakdown"], "breakdown", report_id)
         
-        fig = px.pie(
-            values=breakdown['Value'], 
-            names=breakdown['Component'],
-            title="Property Value Components",
-            color_discrete_sequence=['#667eea', '#764ba2', '#4facfe', '#00f2fe']
-        )
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Component metrics
+        # Component metrics: the six multipliers are summed into one figure
+        parts = dict(zip(breakdown['Key'], breakdown['Value']))
+        adjustments = sum(value for key, value in parts.items() if key not in ("base", "parking", "amenities"))
         col_a, col_b, col_c, col_d = st.columns(4)
         with col_a:
-            st.metric("🏠 Base Property", f"₹{breakdown['Value'][0]:,.0f}")
+            st.metric("🏠 City Base Rate", f"₹{parts['base']:,.0f}")
         with col_b:
-            st.metric("📍 Location Premium", f"₹{breakdown['Value'][1]:,.0f}")
+            st.metric("📍 Property Adjustments", f"₹{adjustments:,.0f}")
         with col_c:
-            st.metric("✨ Amenities", f"₹{breakdown['Value'][2]:,.0f}")
+            st.metric("🚗 Parking", f"₹{parts['parking']:,.0f}")
         with col_d:
-            st.metric("📈 Market Factors", f"₹{breakdown['Value'][3]:,.0f}")
+            st.metric("✨ Amenities", f"₹{parts['amenities']:,.0f}")
+        st.caption(
+            "Each multiplier's share is its log-mean part of the difference from the city base rate, "
+            "so the components add up exactly to the predicted price."
+        )
     
     with tab2:
+        tracer.section("tab.summary")
         # Property summary
         st.markdown("#### 🏠 Property Summary")
         
@@ -434,7 +492,7 @@ if st.button("🎯 Calculate Property Price", type="primary", use_container_widt
                 <div><strong>🏠 Type:</strong> {property_type}</div>
                 <div><strong>🏡 Configuration:</strong> {bhk}</div>
                 <div><strong>📐 Area:</strong> {area:,} sq ft</div>
-                <div><strong>📍 Location:</strong> {location_type}</div>
+                <div><strong>📍 Location:</strong> {location_type}{f" · {locality}" if locality else ""}</div>
                 <div><strong>📅 Age:</strong> {age}</div>
                 <div><strong>🏢 Floor:</strong> {floor}</div>
                 <div><strong>🪑 Furnishing:</strong> {furnishing}</div>
@@ -464,49 +522,50 @@ if st.button("🎯 Calculate Property Price", type="primary", use_container_widt
             st.info("🏠 No additional amenities selected")
     
     with tab3:
+        tracer.section("tab.market")
         # Market analysis
         st.markdown("#### 📈 Market Analysis")
         
-        # Sample market trend data
-        months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun']
-        prices = [predicted_price * (0.95 + i * 0.02) for i in range(6)]
-        
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=months, y=prices,
-            mode='lines+markers',
-            name='Price Trend',
-            line=dict(color='#667eea', width=3),
-            marker=dict(size=8, color='#764ba2')
-        ))
-        fig.update_layout(
-            title="6-Month Price Trend",
-            xaxis_title="Month",
-            yaxis_title="Price (₹)",
-            height=400
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        history = get_price_history()
+        if history is None:
+            show_chart(report["figures"]["trend"], "trend", report_id)
+            st.caption("Illustrative trend. Set PRICE_HISTORY_PATH to a price history store to chart recorded sales.")
+        else:
+            from analytics import history_figure
+
+            # History is appended independently of the pricing tables, so it stays out of the cached report
+            with tracer.span("history.query"):
+                history.refresh()
+                series = history.trend(city, location_type)
+                city_series = history.trend(city)
+            show_chart(lambda: history_figure(
+                series, city_series, report["metrics"]["price_per_sqft"],
+                f"{city} · {location_type}: Price per sq ft"
+            ), "history", (history.version, report_id))
+            if len(series["months"]):
+                st.caption(
+                    f"{series['months'][0]} to {series['months'][-1]} · "
+                    f"{int(series['count'].sum()):,} recorded sales in {location_type} areas of {city}"
+                )
         
         # Market insights
         st.markdown(f"""
         <div style="background: #f0f9ff; padding: 1.5rem; border-radius: 12px; border-left: 4px solid #4facfe;">
             <h4 style="color: #0369a1; margin: 0 0 1rem 0;">💡 Market Insights</h4>
             <ul style="color: #0c4a6e; margin: 0;">
-                <li>Property prices in {city} have shown {"strong growth" if city in ["Mumbai", "Delhi NCR", "Bangalore"] else "steady appreciation"}</li>
-                <li>{location_type} areas are {"highly sought after" if location_type in ["Prime Location", "IT Hub"] else "showing good potential"}</li>
-                <li>{bhk} properties are {"in high demand" if bhk in ["2 BHK", "3 BHK"] else "niche market segment"}</li>
-                <li>Properties with amenities command {"premium pricing" if sum(amenities.values()) >= 4 else "standard rates"}</li>
+                {"".join(f"<li>{insight}</li>" for insight in report["insights"])}
             </ul>
         </div>
         """, unsafe_allow_html=True)
     
     with tab4:
+        tracer.section("tab.investment")
         # Investment insights
         st.markdown("#### 💼 Investment Insights")
         
-        # Rental yield calculation
-        annual_rent = predicted_price * (0.024 if city in ["Mumbai", "Delhi NCR"] else 0.03)
-        rental_yield = (annual_rent / predicted_price) * 100
+        investment = report["investment"]
+        annual_rent = investment["annual_rent"]
+        rental_yield = investment["rental_yield"]
         
         col_x, col_y, col_z = st.columns(3)
         
@@ -514,11 +573,11 @@ if st.button("🎯 Calculate Property Price", type="primary", use_container_widt
             st.metric("🏠 Rental Yield", f"{rental_yield:.1f}%", "Per annum")
         
         with col_y:
-            monthly_rent = annual_rent / 12
+            monthly_rent = investment["monthly_rent"]
             st.metric("💰 Monthly Rent", f"₹{monthly_rent:,.0f}", f"₹{annual_rent:,.0f}/year")
         
         with col_z:
-            appreciation = 8 if city in ["Mumbai", "Delhi NCR", "Bangalore"] else 6
+            appreciation = investment["appreciation"]
             st.metric("📈 Capital Appreciation", f"{appreciation}%", "Expected yearly")
         
         # Tax benefits
@@ -534,15 +593,18 @@ if st.button("🎯 Calculate Property Price", type="primary", use_container_widt
         </div>
         """, unsafe_allow_html=True)
         
-        # Investment grade
-        total_return = rental_yield + appreciation
-        grade = "Excellent" if total_return > 12 else "Good" if total_return > 9 else "Average"
+        # Investment grade, on the IRR of buying with the default loan over the default holding period
+        from cashflow import HORIZON_YEARS
+
+        graded_irr = investment["irr"]
+        grade = investment["grade"]
         
         st.markdown(f"""
         <div style="background: linear-gradient(135deg, #f0f9ff 0%, #e0f2fe 100%); padding: 1.5rem; border-radius: 12px; border: 2px solid #4facfe;">
             <h4 style="color: #0369a1; margin: 0 0 1rem 0;">⭐ Investment Grade: {grade}</h4>
             <p style="color: #0c4a6e; margin: 0;">
-                <strong>Total Expected Return:</strong> {total_return:.1f}% per annum<br>
+                <strong>Projected IRR:</strong> {"n/a" if np.isnan(graded_irr) else f"{graded_irr:.1f}%"} per annum on
+                your equity over {HORIZON_YEARS} years with the default loan<br>
                 <strong>Recommendation:</strong> {
                     "Strong Buy - Excellent growth potential with good rental yields" if grade == "Excellent" 
                     else "Good Investment - Steady returns with moderate appreciation" if grade == "Good"
@@ -552,8 +614,232 @@ if st.button("🎯 Calculate Property Price", type="primary", use_container_widt
         </div>
         """, unsafe_allow_html=True)
 
+        # Year-by-year projection with the loan terms chosen in the Loan Planner tab
+        from analytics import cashflow_figure
+        from cashflow import (
+            DISCOUNT_RATE, MAINTENANCE_RATE, RENT_GROWTH, SELLING_COST, TAX_RATE, irr, npv, project
+        )
+        from emi import DEFAULT_DOWN_PAYMENT, DEFAULT_RATE, DEFAULT_TENURE
+
+        st.markdown("#### 💹 Cash-Flow Projection")
+        holding_years = st.slider("Holding Period (Years)", 3, 30, 10, key="cashflow_years")
+        loan_terms = {
+            "down_payment": st.session_state.get("loan_down_payment", DEFAULT_DOWN_PAYMENT),
+            "loan_rate": st.session_state.get("loan_rate", DEFAULT_RATE),
+            "loan_tenure": st.session_state.get("loan_tenure", DEFAULT_TENURE),
+        }
+        flows = {name: values[0] for name, values in project(
+            [predicted_price], rental_yield, appreciation, holding_years, **loan_terms
+        ).items()}
+        projected_irr = float(irr(flows["net"]))
+        projected_npv = float(npv(flows["net"]))
+        col_i, col_n, col_m = st.columns(3)
+        with col_i:
+            st.metric("📊 IRR", "n/a" if np.isnan(projected_irr) else f"{projected_irr:.1f}%", "On your equity")
+        with col_n:
+            st.metric(f"💵 NPV at {DISCOUNT_RATE:g}%", f"₹{projected_npv:,.0f}")
+        with col_m:
+            inflows = flows["net"][flows["net"] > 0].sum()
+            outflows = -flows["net"][flows["net"] < 0].sum()
+            st.metric("🔁 Equity Multiple", f"{inflows / outflows:.2f}x" if outflows else "n/a", "Cash back per ₹ put in")
+        show_chart(
+            lambda: cashflow_figure(flows), "cashflow", (report_id, holding_years, *loan_terms.values())
+        )
+        st.caption(
+            f"{loan_terms['down_payment']:g}% down, {loan_terms['loan_rate']:g}% over {loan_terms['loan_tenure']} years "
+            f"(set in Loan Planner). Rent grows {RENT_GROWTH:g}% a year. Maintenance is {MAINTENANCE_RATE:g}% of value. "
+            f"Tax saved at the {TAX_RATE:g}% slab under Sections 24 and 80C. "
+            f"Sold in the final year less {SELLING_COST:g}% costs."
+        )
+
+    with tab5:
+        tracer.section("tab.loan")
+        # Loan planner
+        from analytics import amortization_figure, emi_heatmap_figure
+        from emi import amortization_schedule, loan_amount, scenario_grid
+
+        st.markdown("#### 🏦 Loan Planner")
+        
+        col_p, col_q, col_r = st.columns(3)
+        with col_p:
+            down_payment = st.slider("Down Payment (%)", 0, 50, 20, 5, key="loan_down_payment")
+        with col_q:
+            loan_rate = st.slider("Interest Rate (%)", 6.0, 13.0, 9.0, 0.25, key="loan_rate")
+        with col_r:
+            loan_tenure = st.selectbox("Tenure (Years)", [5, 10, 15, 20, 25, 30], index=3, key="loan_tenure")
+        
+        # Every rate x tenure x down payment scenario in one vectorized pass
+        grid_rates = np.arange(6.0, 13.01, 0.25)
+        grid_tenures = np.array([5, 10, 15, 20, 25, 30])
+        grid_down_payments = np.arange(0, 51, 5)
+        down_index = int(np.searchsorted(grid_down_payments, down_payment))
+        show_chart(lambda: emi_heatmap_figure(
+            scenario_grid(predicted_price, grid_rates, grid_tenures, grid_down_payments)["emi"][:, :, down_index],
+            grid_rates, grid_tenures, down_payment
+        ), "emi_heatmap", (report_id, down_payment))
+        
+        principal = float(loan_amount(predicted_price, down_payment))
+        schedule = amortization_schedule(principal, loan_rate, loan_tenure)
+        col_s, col_t, col_u = st.columns(3)
+        with col_s:
+            st.metric("🏦 Monthly EMI", f"₹{schedule['payment'][0]:,.0f}", f"Loan ₹{principal:,.0f}")
+        with col_t:
+            st.metric("💸 Total Interest", f"₹{schedule['interest'].sum():,.0f}")
+        with col_u:
+            st.metric("🧾 Total Payment", f"₹{schedule['payment'].sum():,.0f}", f"over {loan_tenure} years")
+        show_chart(lambda: amortization_figure(schedule), "amortization", (report_id, down_payment, loan_rate, loan_tenure))
+
+    with tab6:
+        tracer.section("tab.what_if")
+        # Sensitivity explorer
+        from analytics import sensitivity_figure
+        from sensitivity import SWEEP_LABELS, sweep
+
+        st.markdown("#### 🔬 What-If Explorer")
+        
+        col_v, col_w, col_k = st.columns(3)
+        with col_v:
+            sweep_x = st.selectbox(
+                "Vary", list(SWEEP_LABELS), index=0, format_func=SWEEP_LABELS.get, key="sweep_x"
+            )
+        with col_w:
+            sweep_y = st.selectbox(
+                "Across", [None] + [name for name in SWEEP_LABELS if name != sweep_x], index=1,
+                format_func=lambda name: "Nothing (single line)" if name is None else SWEEP_LABELS[name],
+                key="sweep_y"
+            )
+        with col_k:
+            sweep_chart = st.radio("Chart", ["Heatmap", "Lines"], horizontal=True, key="sweep_chart")
+        
+        # One vectorized pass over the whole grid, reused while the base inputs stay the same
+        result = get_sweep_cache().get_or_compute(
+            (tables.version, report_key(inputs), sweep_x, sweep_y), lambda: sweep(inputs, sweep_x, sweep_y, cube=tables)
+        )
+        show_chart(
+            lambda: sensitivity_figure(result, SWEEP_LABELS[sweep_x], SWEEP_LABELS.get(sweep_y), sweep_chart),
+            "what_if", (report_id, sweep_x, sweep_y, sweep_chart)
+        )
+        st.caption(f"{result['prices'].size:,} scenarios around your current inputs")
+
+    with tab7:
+        tracer.section("tab.similar")
+        st.markdown("#### 🏘️ Similar Properties")
+
+        if not os.environ.get("LISTINGS_PATH"):
+            st.info("Set LISTINGS_PATH to a CSV or Parquet file of listings with a 'price' column to see comparable sales.")
+        else:
+            with st.spinner("Indexing listings (first use only)..."):
+                comparables_index = get_comparables_index()
+            n_comparables = st.slider("Number of comparables", 3, 25, 10, key="comparables_k")
+            with tracer.span("comparables.query"):
+                similar = comparables_index.query(inputs, n_comparables)
+
+            if not len(similar["row"]):
+                st.warning(f"No listings for a {property_type} in {city}.")
+            else:
+                median_price = float(np.median(similar["price"]))
+                col_m, col_n = st.columns(2)
+                with col_m:
+                    st.metric("🏷️ Median Comparable Price", f"₹{median_price:,.0f}")
+                with col_n:
+                    st.metric(
+                        "🎯 Model Estimate", f"₹{predicted_price:,}",
+                        f"{(predicted_price / median_price - 1) * 100:+.1f}% vs comparables"
+                    )
+                st.dataframe({
+                    "Price (₹)": similar["price"], "Model (₹)": similar["model_price"],
+                    "Area": similar["area"], "BHK": similar["bhk"], "Location": similar["location_type"],
+                    "Age": similar["age"], "Floor": similar["floor"], "Furnishing": similar["furnishing"],
+                    "Parking": similar["parking"], "Amenities": similar["amenities"],
+                    "Distance": similar["distance"].round(3),
+                }, use_container_width=True, hide_index=True)
+                st.caption(f"Nearest of {comparables_index.group_size(inputs):,} listings with the same city and "
+                           "property type")
+
+    with tab8:
+        tracer.section("tab.portfolio")
+        from portfolio import Portfolio
+        from emi import DEFAULT_DOWN_PAYMENT, DEFAULT_RATE, DEFAULT_TENURE
+
+        st.markdown("#### 📁 Portfolio")
+
+        # Each change reprices one holding and adjusts the running totals; nothing else is recomputed.
+        # A change reruns the script so every widget below is drawn from the updated holdings.
+        portfolio = st.session_state.setdefault("portfolio", Portfolio())
+        with tracer.span("portfolio.update"):
+            repriced = portfolio.revalue(tables)
+            col_add, col_import = st.columns(2)
+            with col_add:
+                if st.button("➕ Add this property", key="portfolio_add", use_container_width=True):
+                    portfolio.add(inputs, tables)
+                    st.rerun()
+            with col_import:
+                upload = st.file_uploader("Import holdings (CSV with the listings columns)", type="csv",
+                                          key="portfolio_import")
+                if upload is not None and st.session_state.get("portfolio_imported") != upload.file_id:
+                    import pandas as pd
+                    # Mark the upload handled first, so a bad file is reported once rather than retried every rerun
+                    st.session_state["portfolio_imported"] = upload.file_id
+                    try:
+                        portfolio.add_dataframe(pd.read_csv(upload), tables)
+                    except ValueError as exc:
+                        st.session_state["portfolio_import_error"] = f"Could not import {upload.name}: {exc}"
+                    else:
+                        st.session_state.pop("portfolio_import_error", None)
+                        st.rerun()
+                if upload is None:
+                    st.session_state.pop("portfolio_import_error", None)
+                if "portfolio_import_error" in st.session_state:
+                    st.error(st.session_state["portfolio_import_error"])
+            if len(portfolio):
+                col_pick, col_update, col_remove = st.columns([2, 1, 1])
+                with col_pick:
+                    selected = st.selectbox(
+                        "Holding", list(portfolio.holdings), key="portfolio_selected",
+                        format_func=lambda holding_id: "#{} · {bhk} {property_type} in {city}".format(
+                            holding_id, **portfolio.holdings[holding_id]["inputs"]
+                        )
+                    )
+                with col_update:
+                    if st.button("✏️ Replace with these inputs", key="portfolio_update", use_container_width=True) \
+                            and selected in portfolio.holdings:
+                        portfolio.update(selected, inputs, tables)
+                        st.rerun()
+                with col_remove:
+                    if st.button("🗑️ Remove", key="portfolio_remove", use_container_width=True) \
+                            and selected in portfolio.holdings:
+                        portfolio.remove(selected)
+                        st.rerun()
+
+        if not len(portfolio):
+            st.info("Add the property above, or import a CSV of holdings, to track a portfolio.")
+        else:
+            summary = portfolio.summary()
+            col_h, col_v, col_e = st.columns(3)
+            with col_h:
+                st.metric("🏘️ Holdings", f"{summary['holdings']:,}")
+            with col_v:
+                st.metric("💰 Total Value", f"₹{summary['value'] / 1e7:,.2f} Cr")
+            with col_e:
+                st.metric(
+                    "🏦 Monthly EMI", f"₹{summary['monthly_emi']:,.0f}",
+                    f"{DEFAULT_DOWN_PAYMENT}% down, {DEFAULT_RATE}%, {DEFAULT_TENURE} yrs"
+                )
+            col_y, col_a, col_g = st.columns(3)
+            with col_y:
+                st.metric("🏠 Rental Yield", f"{summary['rental_yield']:.2f}%", f"₹{summary['monthly_rent']:,.0f}/month")
+            with col_a:
+                st.metric("📈 Capital Appreciation", f"{summary['appreciation']:.2f}%", "Value-weighted, yearly")
+            with col_g:
+                portfolio_irr = "n/a" if np.isnan(summary["irr"]) else f"{summary['irr']:.1f}%"
+                st.metric("⭐ Investment Grade", summary["grade"], f"{portfolio_irr} projected IRR")
+            st.dataframe(portfolio.table(), use_container_width=True, hide_index=True)
+            if repriced:
+                st.caption(f"Repriced {repriced:,} holdings with pricing tables {tables.version}")
+
 else:
     # Welcome message
+    tracer.section("welcome")
     st.markdown("""
     <div style="
         background: linear-gradient(135deg, rgba(240, 249, 255, 0.9) 0%, rgba(224, 242, 254, 0.9) 100%);
@@ -573,6 +859,7 @@ else:
     """, unsafe_allow_html=True)
 
 # Footer
+tracer.section("footer")
 st.markdown("---")
 st.markdown("""
 <div style="text-align: center; padding: 2rem; color: white;">
@@ -584,3 +871,5 @@ st.markdown("""
     <div class="modern-gradient" style="margin: 1rem auto; width: 100px;"></div>
 </div>
 """, unsafe_allow_html=True)
+
+tracer.end_rerun()
@@ -0,0 +1,243 @@
+"""Locality-level rates with a prefix index for typeahead search.
+
+A locality file holds tens of thousands of named localities. Each has a
+factor on its city's base rate, for example 1.9 for a locality priced at
+1.9x the city rate. The factor multiplies the rate in
+calculate_indian_property_price, so every other input keeps its usual
+multiplier.
+
+The file is a fixed binary layout, read into memory in one pass on open:
+magic, header length and data offset (little-endian uint64), a JSON header,
+then at a 64-byte aligned offset:
+
+    factors       float32[n]     factor per locality
+    name_offsets  uint32[n + 1]  byte offsets into the name block
+    names         UTF-8          names, back to back
+
+Rows are sorted by city, then by case-folded name, and the header records
+where each city's rows start. So a prefix search is a bisect over one city's
+rows, and a lookup by name is one more. Only the names a search touches are
+decoded, so opening the file is one read and no per-locality work.
+
+Usage:
+    python localities.py demo localities.bin [--per-city 2500]
+    python localities.py search localities.bin Mumbai "shanti"
+"""
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+LOCALITY_MAGIC = b"LOCIDX01"
+LOCALITY_PREFIX = struct.Struct("<8sQQ")
+DEFAULT_MATCHES = 20
+
+
+def write_localities(path, cities, names, factors):
+    """Write a locality file from equal-length city, name and factor sequences.
+
+    The file is written to a temporary path and renamed into place. Names
+    must be unique within a city, ignoring case.
+    """
+    rows = sorted(zip(cities, names, factors), key=lambda row: (row[0], row[1].casefold()))
+    for previous, row in zip(rows, rows[1:]):
+        if previous[0] == row[0] and previous[1].casefold() == row[1].casefold():
+            raise ValueError(f"duplicate locality {row[1]!r} in {row[0]}")
+
+    city_names = sorted(set(city for city, _, _ in rows))
+    city_codes = {city: code for code, city in enumerate(city_names)}
+    city_starts = np.zeros(len(city_names) + 1, dtype=np.int64)
+    city_starts[1:] = np.cumsum(np.bincount([city_codes[city] for city, _, _ in rows], minlength=len(city_names)))
+
+    encoded = [name.encode() for _, name, _ in rows]
+    name_offsets = np.zeros(len(rows) + 1, dtype=np.uint32)
+    name_offsets[1:] = np.cumsum([len(name) for name in encoded])
+    factor_array = np.array([factor for _, _, factor in rows], dtype=np.float32)
+    name_block = b"".join(encoded)
+    data = factor_array.tobytes() + name_offsets.tobytes() + name_block
+
+    header = json.dumps({
+        "format": 1,
+        "version": hashlib.sha256(data).hexdigest()[:16],
+        "count": len(rows),
+        "cities": city_names,
+        "city_starts": city_starts.tolist(),
+    }).encode()
+    offset = -(-(LOCALITY_PREFIX.size + len(header)) // 64) * 64
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as handle:
+        handle.write(LOCALITY_PREFIX.pack(LOCALITY_MAGIC, len(header), offset))
+        handle.write(header)
+        handle.write(b"\0" * (offset - LOCALITY_PREFIX.size - len(header)))
+        handle.write(data)
+    os.replace(tmp_path, path)
+
+
+class _SortKeys:
+    # Case-folded names as a read-only sequence, decoded only at the positions bisect asks for
+    def __init__(self, index):
+        self.index = index
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, position):
+        return self.index.name(position).casefold()
+
+
+class LocalityIndex:
+    """A locality file read into memory (see the module docstring).
+
+    Raises ValueError for a file that is not a complete, well-formed
+    locality file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # Read the whole file rather than mapping it: arrays over a mapping would
+        # fault (SIGBUS) if the file were later truncated or rewritten in place
+        with open(path, "rb") as handle:
+            self._data = handle.read()
+        data = self._data
+        if len(data) < LOCALITY_PREFIX.size or not data.startswith(LOCALITY_MAGIC):
+            raise ValueError(f"{path}: not a locality file")
+
+        _, header_length, offset = LOCALITY_PREFIX.unpack_from(data)
+        if offset < LOCALITY_PREFIX.size + header_length or offset > len(data):
+            raise ValueError(f"{path}: truncated locality file")
+        header = json.loads(data[LOCALITY_PREFIX.size:LOCALITY_PREFIX.size + header_length])
+        if not isinstance(header, dict):
+            raise ValueError(f"{path}: malformed locality file header")
+        if header.get("format") != 1:
+            raise ValueError(f"{path}: unsupported locality file format {header.get('format')!r}")
+        count, cities, city_starts = header.get("count"), header.get("cities"), header.get("city_starts")
+        if not isinstance(count, int) or count < 0 or not isinstance(cities, list) \
+                or not isinstance(city_starts, list) or len(city_starts) != len(cities) + 1 \
+                or not all(isinstance(start, int) for start in city_starts) \
+                or city_starts != sorted(city_starts) or city_starts[0] != 0 or city_starts[-1] != count:
+            raise ValueError(f"{path}: malformed locality file header")
+        self._names_start = offset + 8 * count + 4
+        if self._names_start > len(data):
+            raise ValueError(f"{path}: truncated locality file")
+
+        self.version = header.get("version")
+        self.cities = cities
+        self._city_ranges = {city: (start, stop) for city, start, stop in zip(cities, city_starts, city_starts[1:])}
+        self.factors = np.frombuffer(data, dtype=np.float32, count=count, offset=offset)
+        self._name_offsets = np.frombuffer(data, dtype=np.uint32, count=count + 1, offset=offset + 4 * count)
+        if self._name_offsets[0] != 0 or (np.diff(self._name_offsets.astype(np.int64)) < 0).any() \
+                or self._names_start + int(self._name_offsets[-1]) > len(data):
+            raise ValueError(f"{path}: truncated locality file")
+        self._keys = _SortKeys(self)
+
+    def __len__(self):
+        return len(self.factors)
+
+    def name(self, position):
+        start = self._names_start + int(self._name_offsets[position])
+        stop = self._names_start + int(self._name_offsets[position + 1])
+        return self._data[start:stop].decode()
+
+    def count(self, city):
+        start, stop = self._city_ranges.get(city, (0, 0))
+        return stop - start
+
+    def prefix_range(self, city, prefix):
+        """(start, stop) rows of the city's localities whose names start with prefix, ignoring case."""
+        low, high = self._city_ranges.get(city, (0, 0))
+        key = prefix.casefold()
+        start = bisect.bisect_left(self._keys, key, low, high)
+        # Every name with this prefix sorts below the prefix followed by the largest code point
+        stop = bisect.bisect_left(self._keys, key + "\U0010ffff", start, high)
+        return start, stop
+
+    def search(self, city, prefix, limit=DEFAULT_MATCHES):
+        """Up to limit names in the city starting with prefix, in alphabetical order."""
+        start, stop = self.prefix_range(city, prefix)
+        return [self.name(position) for position in range(start, min(stop, start + limit))]
+
+    def factor(self, city, name):
+        """The rate factor of one locality; KeyError if the city has no locality of that name."""
+        low, high = self._city_ranges.get(city, (0, 0))
+        position = bisect.bisect_left(self._keys, name.casefold(), low, high)
+        if position < high and self.name(position) == name:
+            return float(self.factors[position])
+        raise KeyError(f"no locality {name!r} in {city}")
+
+
+def open_from_env():
+    """LocalityIndex over $LOCALITIES_PATH, or None when unset."""
+    path = os.environ.get("LOCALITIES_PATH")
+    return LocalityIndex(path) if path else None
+
+
+# Parts of the generated demo names
+NAME_PREFIXES = [
+    "Ambedkar", "Ashok", "Bhagat", "Chandra", "Civil", "Ganesh", "Gandhi", "Golden", "Green", "Hanuman", "Indira",
+    "Jawahar", "Kamala", "Krishna", "Lake", "Laxmi", "Model", "Nehru", "Netaji", "Old", "Patel", "Rajiv", "Royal",
+    "Sai", "Shanti", "Shastri", "Shiv", "Subhash", "Sunrise", "Tilak", "Vijay", "Vivekanand",
+]
+NAME_SUFFIXES = [
+    "Bagh", "Chowk", "Colony", "Enclave", "Extension", "Ganj", "Gardens", "Heights", "Layout", "Nagar", "Park",
+    "Puram", "Residency", "Road", "Town", "Vihar",
+]
+NAME_QUALIFIERS = ["", " East", " West", " North", " South"] + [f" Phase {n}" for n in range(2, 5)] \
+    + [f" Sector {n}" for n in range(1, 13)]
+
+
+def generate_localities(per_city=2500, seed=0, cities=None):
+    """Synthetic (cities, names, factors) with per_city distinct localities in each city."""
+    from pricing import CITY_PRICES
+
+    rng = np.random.default_rng(seed)
+    candidates = [f"{prefix} {suffix}{qualifier}" for prefix in NAME_PREFIXES for suffix in NAME_SUFFIXES
+                  for qualifier in NAME_QUALIFIERS]
+    if per_city > len(candidates):
+        raise ValueError(f"at most {len(candidates)} localities per city")
+    all_cities, names, factors = [], [], []
+    for city in cities or CITY_PRICES:
+        chosen = rng.choice(len(candidates), per_city, replace=False)
+        all_cities += [city] * per_city
+        names += [candidates[i] for i in chosen]
+        factors += np.clip(rng.lognormal(0.0, 0.3, per_city), 0.4, 3.0).round(3).tolist()
+    return all_cities, names, factors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or search a locality rate file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    demo = commands.add_parser("demo", help="write synthetic localities for every city")
+    demo.add_argument("path")
+    demo.add_argument("--per-city", type=int, default=2500)
+    demo.add_argument("--seed", type=int, default=0)
+    search = commands.add_parser("search", help="list the localities in a city starting with a prefix")
+    search.add_argument("path")
+    search.add_argument("city")
+    search.add_argument("prefix")
+    search.add_argument("--limit", type=int, default=DEFAULT_MATCHES)
+    args = parser.parse_args()
+
+    if args.command == "demo":
+        write_localities(args.path, *generate_localities(args.per_city, args.seed))
+        index = LocalityIndex(args.path)
+        print(f"Wrote {len(index):,} localities in {len(index.cities)} cities to {args.path} "
+              f"({os.path.getsize(args.path) / 2**20:.1f} MiB)", file=sys.stderr)
+    else:
+        index = LocalityIndex(args.path)
+        start = time.perf_counter()
+        names = index.search(args.city, args.prefix, args.limit)
+        elapsed = time.perf_counter() - start
+        for name in names:
+            print(f"{name}\t{index.factor(args.city, name):.3f}")
+        first, stop = index.prefix_range(args.city, args.prefix)
+        print(f"{stop - first:,} matches in {elapsed * 1e6:.0f} us", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Sharded scoring across a process pool.
+
+Rows are split into contiguous shards, scored with pricing.score_dataframe in
+worker processes, and merged back in input order. workers=1 runs everything
+in-process.
+
+Every call prices with the tables active when it starts. Workers receive that
+PriceCube once at start-up and switch off their own table watchers, so a hot
+reload cannot reach them on a schedule of its own; the in-process path passes
+the same cube explicitly. Changed tables apply from the next call.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import pricing
+
+
+def _pin_cube(cube):
+    pricing.TABLE_WATCHER = None
+    pricing.install_cube(cube)
+
+
+def make_pool(workers, cube):
+    return ProcessPoolExecutor(max_workers=workers, initializer=_pin_cube, initargs=(cube,))
+
+
+def shard_bounds(n_rows, n_shards):
+    """(start, stop) row ranges splitting n_rows into at most n_shards near-equal shards."""
+    edges = np.linspace(0, n_rows, min(n_shards, n_rows) + 1).astype(int)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _merge(parts):
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+def score_frame_parallel(df, workers=None, shards_per_worker=4):
+    """Score an in-memory DataFrame; returns the same columns as pricing.score_dataframe."""
+    workers = workers or os.cpu_count() or 1
+    cube = pricing.current_cube()
+    if workers <= 1 or len(df) < 2:
+        return pricing.score_dataframe(df, cube=cube)
+    bounds = shard_bounds(len(df), workers * shards_per_worker)
+    with make_pool(workers, cube) as pool:
+        parts = list(pool.map(pricing.score_dataframe, (df.iloc[start:stop] for start, stop in bounds)))
+    return _merge(parts)
+
+
+def score_chunks(chunks, workers=1, max_in_flight=None, attribution=False):
+    """Yield (chunk, scored columns) pairs in input order.
+
+    At most max_in_flight chunks (default 2 per worker) are submitted ahead
+    of the one being yielded, which keeps memory bounded on long streams.
+    attribution is passed on to pricing.score_dataframe.
+    """
+    cube = pricing.current_cube()
+    if workers <= 1:
+        for chunk in chunks:
+            yield chunk, pricing.score_dataframe(chunk, attribution, cube)
+        return
+
+    max_in_flight = max_in_flight or 2 * workers
+    with make_pool(workers, cube) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(pricing.score_dataframe, chunk, attribution)))
+            if len(pending) >= max_in_flight:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+        while pending:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
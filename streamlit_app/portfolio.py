@@ -0,0 +1,178 @@
+"""A portfolio of priced properties with running totals.
+
+Each holding is priced when it is added or edited, and its figures are added
+to or taken out of running sums. Changing one holding therefore costs the
+same with 5 holdings as with 500, and summary() reads the sums rather than
+walking the rows. The per-holding figures are the ones the Investment
+Insights tab shows for a single property: the price, the EMI at the default
+loan terms, rent, expected appreciation and the projected yearly cash flows.
+Cash flows add up across holdings, so the portfolio is graded on the IRR of
+their sum.
+
+A Portfolio is plain data, so it can live in st.session_state.
+"""
+from analytics import city_returns, investment_grade
+from cashflow import irr, project
+from pricing import AMENITIES, INPUT_COLUMNS, calculate_indian_property_price, current_cube, derived_metrics
+
+# Running sums kept for the whole portfolio
+TOTAL_FIELDS = ("value", "monthly_emi", "annual_rent", "appreciation_value", "cash_flows")
+
+
+def value_holding(inputs, cube):
+    """Price and investment figures for one property described like the sidebar inputs."""
+    price = calculate_indian_property_price(
+        inputs["city"], inputs["property_type"], inputs["bhk"], inputs["area"], inputs["location_type"],
+        inputs["age"], inputs["floor"], inputs["furnishing"], inputs["parking"], inputs["amenities"], cube,
+        inputs.get("locality_factor", 1.0)
+    )
+    rental_yield, appreciation = city_returns(inputs["city"])
+    cash_flows = project(price, rental_yield, appreciation)["net"]
+    return _holding(inputs, price, derived_metrics(price, inputs["area"])["monthly_emi"], cube.version, cash_flows)
+
+
+def _holding(inputs, price, emi, version, cash_flows):
+    rental_yield, appreciation = city_returns(inputs["city"])
+    return {
+        "inputs": inputs,
+        "value": price,
+        "monthly_emi": float(emi),
+        "annual_rent": price * rental_yield / 100,
+        "appreciation_value": price * appreciation / 100,
+        "rental_yield": rental_yield,
+        "appreciation": appreciation,
+        "cash_flows": cash_flows,
+        "table_version": version,
+    }
+
+
+class Portfolio:
+    """Holdings keyed by an integer id, with totals kept up to date on every change."""
+
+    def __init__(self):
+        self.holdings = {}
+        self.totals = dict.fromkeys(TOTAL_FIELDS, 0.0)
+        self.revision = 0  # bumped on every change, for caching views of the holdings
+        self._next_id = 1
+        self._table = None
+
+    def __len__(self):
+        return len(self.holdings)
+
+    def _apply(self, holding, sign):
+        for field in TOTAL_FIELDS:
+            self.totals[field] += sign * holding[field]
+
+    def _store(self, holding_id, holding):
+        old = self.holdings.get(holding_id)
+        if old is not None:
+            self._apply(old, -1)
+        self.holdings[holding_id] = holding
+        self._apply(holding, 1)
+        self.revision += 1
+
+    def add(self, inputs, cube=None):
+        """Price inputs and add them as a new holding; returns its id."""
+        holding_id = self._next_id
+        self._next_id += 1
+        self._store(holding_id, value_holding(_copy_inputs(inputs), cube or current_cube()))
+        return holding_id
+
+    def update(self, holding_id, inputs, cube=None):
+        """Replace one holding's inputs, repricing only that holding."""
+        if holding_id not in self.holdings:
+            raise KeyError(f"no holding {holding_id}")
+        self._store(holding_id, value_holding(_copy_inputs(inputs), cube or current_cube()))
+
+    def remove(self, holding_id):
+        self._apply(self.holdings.pop(holding_id), -1)
+        self.revision += 1
+
+    def add_dataframe(self, df, cube=None):
+        """Add every row of a listings DataFrame (INPUT_COLUMNS plus amenity flags) in one batch; returns the ids.
+
+        Raises ValueError, adding nothing, when a column is missing, an area
+        is not a positive number or a category is unknown.
+        """
+        import numpy as np
+        import pandas as pd
+
+        from cashflow import city_assumptions
+        from pricing import price_dataframe
+
+        missing = [name for name in INPUT_COLUMNS if name not in df.columns]
+        if missing:
+            raise ValueError(f"missing columns: {', '.join(missing)}")
+        area = pd.to_numeric(df["area"], errors="coerce").to_numpy(dtype=float)
+        invalid = ~(np.isfinite(area) & (area > 0))
+        if invalid.any():
+            raise ValueError(f"'area' must be a positive number (row {int(invalid.argmax()) + 1})")
+        df = df.assign(area=area)
+        cube = cube or current_cube()
+        try:
+            prices = price_dataframe(df, cube)
+        except KeyError as exc:
+            raise ValueError(exc.args[0]) from None
+        emis = derived_metrics(prices.astype(float), area)["monthly_emi"]
+        cash_flows = project(prices.astype(float), *city_assumptions(df["city"].to_numpy()))["net"]
+        amenity_columns = [name for name in AMENITIES if name in df.columns]
+        ids = []
+        for row, price, emi, flows in zip(df.to_dict("records"), prices.tolist(), emis.tolist(), cash_flows):
+            inputs = {name: row[name] for name in INPUT_COLUMNS}
+            inputs["amenities"] = {name: bool(row[name]) if name in amenity_columns else False for name in AMENITIES}
+            holding_id = self._next_id
+            self._next_id += 1
+            self._store(holding_id, _holding(inputs, price, emi, cube.version, flows))
+            ids.append(holding_id)
+        return ids
+
+    def revalue(self, cube=None):
+        """Reprice the holdings valued with other pricing tables (after a hot reload); returns how many."""
+        cube = cube or current_cube()
+        stale = [holding_id for holding_id, holding in self.holdings.items() if holding["table_version"] != cube.version]
+        for holding_id in stale:
+            self._store(holding_id, value_holding(self.holdings[holding_id]["inputs"], cube))
+        return len(stale)
+
+    def resync(self):
+        """Recompute the totals from the holdings, clearing any rounding drift from many edits."""
+        self.totals = {field: sum(holding[field] for holding in self.holdings.values()) for field in TOTAL_FIELDS}
+
+    def summary(self):
+        """Portfolio-wide figures in the form of analytics.investment_summary(), plus the totals."""
+        totals = self.totals
+        value = totals["value"]
+        rental_yield = totals["annual_rent"] / value * 100 if value else 0.0
+        appreciation = totals["appreciation_value"] / value * 100 if value else 0.0
+        projected_irr = float(irr(totals["cash_flows"])) if value else None
+        return {
+            "holdings": len(self.holdings),
+            "value": value,
+            "monthly_emi": totals["monthly_emi"],
+            "annual_rent": totals["annual_rent"],
+            "monthly_rent": totals["annual_rent"] / 12,
+            "rental_yield": rental_yield,
+            "appreciation": appreciation,
+            "total_return": rental_yield + appreciation,
+            "irr": projected_irr,
+            "grade": investment_grade(projected_irr) if value else None,
+        }
+
+    def table(self):
+        """Columns describing every holding, rebuilt only when the portfolio has changed."""
+        if self._table is None or self._table[0] != self.revision:
+            holdings = list(self.holdings.items())
+            columns = {"ID": [holding_id for holding_id, _ in holdings]}
+            for label, name in (("City", "city"), ("Type", "property_type"), ("BHK", "bhk"), ("Area", "area"),
+                                ("Location", "location_type")):
+                columns[label] = [holding["inputs"][name] for _, holding in holdings]
+            for label, name in (("Value (₹)", "value"), ("EMI (₹/month)", "monthly_emi"),
+                                ("Rent (₹/year)", "annual_rent"), ("Yield (%)", "rental_yield")):
+                columns[label] = [holding[name] for _, holding in holdings]
+            self._table = (self.revision, columns)
+        return self._table[1]
+
+
+def _copy_inputs(inputs):
+    # Sidebar widgets hand back the same amenities dict on every rerun, so keep a private copy
+    return {**inputs, "amenities": dict(inputs["amenities"])}
@@ -0,0 +1,274 @@
+"""Monthly price-per-sq-ft history per city and location type, stored as NumPy memmaps.
+
+A store is a directory of fixed-layout arrays with shape
+(months, cities, location types + 1); the extra location slot holds the
+city-wide rollup. Each array is a raw file with month as the outer axis, so
+adding a month appends one block to the end of every file:
+
+    sum.bin         float64 sum of price per sq ft of the sales in each cell
+    count.bin       int64 number of sales in each cell
+    rolling_3.bin   float64 sales-weighted mean over the trailing 3 months
+    rolling_12.bin  float64 ... and 12 months (NaN where the window has no sales)
+    meta.json       cities, location types, first month and month count
+
+append() adds sales into the rollups and recomputes rolling means only from
+the earliest month it touched, so a new month costs the same however long
+the history is. Readers map the files read-only and slice one city, which
+touches a few KiB rather than the whole history.
+
+Usage:
+    python price_history.py demo history/ --start 2016-01 --months 120
+    python price_history.py append history/ sales.parquet
+    python price_history.py show history/ Mumbai "Prime Location"
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from pricing import CITY_PRICES, LOCATION_MULTIPLIERS
+
+ALL_LOCATIONS = "All"
+ROLLING_WINDOWS = (3, 12)
+ARRAYS = {"sum": np.float64, "count": np.int64, **{f"rolling_{window}": np.float64 for window in ROLLING_WINDOWS}}
+
+
+def month_number(month):
+    """Months since year 0 for a "YYYY-MM" string."""
+    year, month = str(month)[:7].split("-")
+    return int(year) * 12 + int(month) - 1
+
+
+def month_label(number):
+    return f"{number // 12:04d}-{number % 12 + 1:02d}"
+
+
+class PriceHistory:
+    """A history store opened for reading (mode "r") or appending (mode "r+")."""
+
+    def __init__(self, path, mode="r"):
+        self.path = path
+        self.mode = mode
+        self._meta_mtime = None
+        self.refresh()
+
+    @classmethod
+    def create(cls, path, start, cities=None, location_types=None):
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, "meta.json")):
+            raise FileExistsError(f"{path} already holds a price history")
+        for name in ARRAYS:
+            open(os.path.join(path, f"{name}.bin"), "wb").close()
+        _write_meta(path, {
+            "format": 1,
+            "cities": list(cities or CITY_PRICES),
+            "location_types": list(location_types or LOCATION_MULTIPLIERS) + [ALL_LOCATIONS],
+            "start": month_label(month_number(start)),
+            "months": 0,
+            "windows": list(ROLLING_WINDOWS),
+        })
+        return cls(path, mode="r+")
+
+    def refresh(self):
+        """Re-map the arrays if another process appended since the last call; returns True if so."""
+        meta_path = os.path.join(self.path, "meta.json")
+        mtime = os.stat(meta_path).st_mtime_ns
+        if mtime == self._meta_mtime:
+            return False
+        with open(meta_path) as handle:
+            self.meta = json.load(handle)
+        self._meta_mtime = mtime
+        # Changes whenever an append lands, for keying anything derived from the store
+        self.version = mtime
+        self.cities = self.meta["cities"]
+        self.location_types = self.meta["location_types"]
+        self.city_codes = {name: code for code, name in enumerate(self.cities)}
+        self.location_codes = {name: code for code, name in enumerate(self.location_types)}
+        self.start = month_number(self.meta["start"])
+        self._map(self.meta["months"])
+        return True
+
+    def _map(self, months):
+        shape = (months, len(self.cities), len(self.location_types))
+        self.arrays = {}
+        for name, dtype in ARRAYS.items():
+            if months:
+                self.arrays[name] = np.memmap(os.path.join(self.path, f"{name}.bin"), dtype, self.mode, shape=shape)
+            else:
+                self.arrays[name] = np.zeros(shape, dtype)
+        self.months = months
+
+    def month_labels(self):
+        return [month_label(self.start + i) for i in range(self.months)]
+
+    def append(self, months, cities, location_types, price_per_sqft):
+        """Add sales (parallel arrays) into the rollups; returns the number of months recomputed."""
+        if self.mode != "r+":
+            raise PermissionError("open the store with mode='r+' to append")
+        if not len(months):
+            return 0
+        offsets = _codes(months, lambda month: month_number(month) - self.start)
+        if offsets.min() < 0:
+            raise ValueError(f"sales before the store's first month {self.meta['start']}")
+        try:
+            city = _codes(cities, self.city_codes.__getitem__)
+            location = _codes(location_types, self.location_codes.__getitem__)
+        except KeyError as exc:
+            raise ValueError(f"unknown city or location type: {exc}") from None
+
+        # Grow every file by whole zero months, then map the larger arrays
+        total = max(self.months, int(offsets.max()) + 1)
+        if total > self.months:
+            for name, dtype in ARRAYS.items():
+                block = np.zeros((total - self.months, len(self.cities), len(self.location_types)), dtype)
+                with open(os.path.join(self.path, f"{name}.bin"), "ab") as handle:
+                    handle.write(block.tobytes())
+            self._map(total)
+
+        # Per-cell sums over just the months touched, one bincount each, for both the
+        # location cell and the city-wide slot
+        first = int(offsets.min())
+        shape = (total - first, *self.arrays["sum"].shape[1:])
+        values = np.asarray(price_per_sqft, dtype=np.float64)
+        all_slot = self.location_codes[ALL_LOCATIONS]
+        cells = np.concatenate([
+            np.ravel_multi_index((offsets - first, city, location), shape),
+            np.ravel_multi_index((offsets - first, city, np.full_like(location, all_slot)), shape),
+        ])
+        weights = np.concatenate([values, values])
+        size = int(np.prod(shape))
+        self.arrays["sum"][first:] += np.bincount(cells, weights, minlength=size).reshape(shape)
+        self.arrays["count"][first:] += np.bincount(cells, minlength=size).reshape(shape)
+
+        self._update_rolling(first)
+        for array in self.arrays.values():
+            array.flush()
+        _write_meta(self.path, {**self.meta, "months": total, "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S")})
+        self.refresh()
+        return total - first
+
+    def _update_rolling(self, first):
+        """Recompute rolling means for months first..end from the sums, reading only the windows needed."""
+        for window in ROLLING_WINDOWS:
+            low = max(0, first - window + 1)
+            sums = np.cumsum(self.arrays["sum"][low:], axis=0)
+            counts = np.cumsum(self.arrays["count"][low:], axis=0)
+            sums = np.concatenate([np.zeros_like(sums[:1]), sums])
+            counts = np.concatenate([np.zeros_like(counts[:1]), counts])
+            ends = np.arange(first, self.months) - low + 1
+            starts = np.maximum(ends - window, 0)
+            window_sums = sums[ends] - sums[starts]
+            window_counts = counts[ends] - counts[starts]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                self.arrays[f"rolling_{window}"][first:] = np.where(
+                    window_counts > 0, window_sums / window_counts, np.nan
+                )
+
+    def append_dataframe(self, df, month_column="month"):
+        """append() for a sales DataFrame with month, city, location_type, area and price columns."""
+        months = df[month_column].astype(str).to_numpy()
+        return self.append(
+            months, df["city"].to_numpy(), df["location_type"].to_numpy(),
+            df["price"].to_numpy(dtype=np.float64) / df["area"].to_numpy(dtype=np.float64)
+        )
+
+    def trend(self, city, location_type=None, last=None):
+        """Monthly series for one city (and location type, or city-wide when None).
+
+        Returns {"months", "mean", "count", "rolling_3", "rolling_12"} covering
+        the last `last` months (all by default); mean is NaN for months
+        without sales.
+        """
+        c = self.city_codes[city]
+        location = self.location_codes[location_type or ALL_LOCATIONS]
+        # One reference to the mapping, so a concurrent refresh() cannot mix two sizes
+        arrays = self.arrays
+        months = len(arrays["count"])
+        begin = 0 if last is None else max(0, months - last)
+        counts = np.array(arrays["count"][begin:, c, location])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(counts > 0, arrays["sum"][begin:, c, location] / counts, np.nan)
+        labels = [month_label(self.start + i) for i in range(begin, months)]
+        series = {"months": labels, "mean": mean, "count": counts}
+        for window in ROLLING_WINDOWS:
+            series[f"rolling_{window}"] = np.array(arrays[f"rolling_{window}"][begin:, c, location])
+        return series
+
+
+def _codes(values, lookup):
+    # Look up each distinct value once rather than once per sale
+    import pandas as pd
+
+    inverse, distinct = pd.factorize(np.asarray(values, dtype=object))
+    return np.array([lookup(str(value)) for value in distinct], dtype=np.intp)[inverse]
+
+
+def _write_meta(path, meta):
+    # Written last and renamed into place, so readers never map more months than are on disk
+    tmp_path = os.path.join(path, "meta.json.tmp")
+    with open(tmp_path, "w") as handle:
+        json.dump(meta, handle, indent=2)
+    os.replace(tmp_path, os.path.join(path, "meta.json"))
+
+
+def open_from_env():
+    """Read-only PriceHistory at $PRICE_HISTORY_PATH, or None when unset."""
+    path = os.environ.get("PRICE_HISTORY_PATH")
+    return PriceHistory(path) if path else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and inspect a price history store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    demo = commands.add_parser("demo", help="fill a new store with synthetic monthly sales")
+    demo.add_argument("store")
+    demo.add_argument("--start", default="2016-01")
+    demo.add_argument("--months", type=int, default=120)
+    demo.add_argument("--rows-per-month", type=int, default=20_000)
+    append = commands.add_parser("append", help="add a CSV or Parquet file of sales")
+    append.add_argument("store")
+    append.add_argument("sales")
+    append.add_argument("--chunk-rows", type=int, default=200_000)
+    show = commands.add_parser("show", help="print the last 12 months for a city")
+    show.add_argument("store")
+    show.add_argument("city")
+    show.add_argument("location_type", nargs="?")
+    args = parser.parse_args()
+
+    if args.command == "demo":
+        from sample_listings import generate_sales
+
+        history = PriceHistory.create(args.store, args.start)
+        start = time.perf_counter()
+        for i in range(args.months):
+            month = month_label(history.start + i)
+            history.append_dataframe(generate_sales(args.rows_per_month, month, (args.months - 1 - i) / 12, seed=i))
+        print(f"Wrote {args.months} months x {args.rows_per_month:,} sales in {time.perf_counter() - start:.1f}s",
+              file=sys.stderr)
+    elif args.command == "append":
+        from score_listings import iter_chunks
+
+        if not os.path.exists(os.path.join(args.store, "meta.json")):
+            # A store cannot grow backwards, so a new one starts at the earliest month anywhere in the file
+            first = min(
+                min(month_number(month) for month in chunk["month"].astype(str).unique())
+                for chunk in iter_chunks(args.sales, args.chunk_rows)
+            )
+            PriceHistory.create(args.store, month_label(first))
+        history = PriceHistory(args.store, mode="r+")
+        rows = 0
+        for chunk in iter_chunks(args.sales, args.chunk_rows):
+            history.append_dataframe(chunk)
+            rows += len(chunk)
+        print(f"Added {rows:,} sales; store covers {history.months} months", file=sys.stderr)
+    else:
+        series = PriceHistory(args.store).trend(args.city, args.location_type, last=12)
+        for month, mean, count, rolling in zip(series["months"], series["mean"], series["count"], series["rolling_12"]):
+            print(f"{month}  ₹{mean:9,.0f}/sq ft  12-month ₹{rolling:9,.0f}  ({count:,} sales)")
+
+
+if __name__ == "__main__":
+    main()
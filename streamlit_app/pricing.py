@@ -0,0 +1,494 @@
+"""Pricing tables and valuation functions for the Indian property price predictor.
+
+This module has no Streamlit dependency so batch jobs can import it directly.
+"""
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from emi import DEFAULT_DOWN_PAYMENT, DEFAULT_RATE, DEFAULT_TENURE, loan_amount, monthly_emi
+
+# Base prices per sq ft for major Indian cities (in INR)
+CITY_PRICES = {
+    "Mumbai": 25000, "Delhi NCR": 12000, "Bangalore": 8500, "Hyderabad": 6500,
+    "Chennai": 7000, "Pune": 7500, "Kolkata": 5500, "Ahmedabad": 5000,
+    "Surat": 4500, "Jaipur": 4000, "Lucknow": 3500, "Kanpur": 3000,
+    "Nagpur": 3500, "Indore": 3200, "Bhopal": 3000, "Visakhapatnam": 4500,
+    "Patna": 2800, "Vadodara": 4200, "Ghaziabad": 5500, "Ludhiana": 4000
+}
+
+# Property type multipliers
+PROPERTY_MULTIPLIERS = {
+    "Apartment/Flat": 1.0, "Independent House": 1.2, "Villa": 1.5,
+    "Builder Floor": 1.1, "Penthouse": 1.8, "Studio Apartment": 0.85
+}
+
+# Location multipliers
+LOCATION_MULTIPLIERS = {
+    "Prime Location": 1.4, "Central Area": 1.2, "Suburb": 1.0,
+    "Outskirts": 0.8, "IT Hub": 1.3, "Business District": 1.25
+}
+
+# Age multipliers
+AGE_MULTIPLIERS = {
+    "Under Construction": 0.9, "Ready to Move": 1.0, "0-1 Years": 1.05,
+    "1-5 Years": 1.0, "5-10 Years": 0.95, "10-15 Years": 0.85, "15+ Years": 0.75
+}
+
+# Floor multipliers
+FLOOR_MULTIPLIERS = {
+    "Ground Floor": 0.95, "1st-3rd Floor": 1.0, "4th-7th Floor": 1.05,
+    "8th-12th Floor": 1.08, "Above 12th Floor": 1.12
+}
+
+# Furnishing multipliers
+FURNISHING_MULTIPLIERS = {
+    "Unfurnished": 1.0, "Semi-Furnished": 1.08, "Fully Furnished": 1.15
+}
+
+# BHK adjustments
+BHK_MULTIPLIERS = {"1 RK": 0.8, "1 BHK": 0.9, "2 BHK": 1.0, "3 BHK": 1.1, "4 BHK": 1.2, "5+ BHK": 1.3}
+
+# Parking bonus
+PARKING_BONUS = {"No Parking": 0, "1 Car": 200000, "2 Cars": 350000, "3+ Cars": 500000}
+
+# Amenities bonus, in the order the sidebar shows the checkboxes
+AMENITY_BONUS = {
+    "lift": 100000, "power_backup": 150000, "security": 200000, "gym": 300000,
+    "swimming_pool": 500000, "garden": 100000, "temple": 50000, "vastu": 100000
+}
+AMENITIES = list(AMENITY_BONUS)
+
+# Purchase cost rates shown in the app's metric row
+STAMP_DUTY_RATE = 0.05  # 5% stamp duty
+REGISTRATION_RATE = 0.01  # 1% registration
+
+# Categorical factors folded into the price cube, in axis order
+FACTOR_TABLES = {
+    "city": CITY_PRICES,
+    "property_type": PROPERTY_MULTIPLIERS,
+    "location_type": LOCATION_MULTIPLIERS,
+    "age": AGE_MULTIPLIERS,
+    "floor": FLOOR_MULTIPLIERS,
+    "furnishing": FURNISHING_MULTIPLIERS,
+    "bhk": BHK_MULTIPLIERS,
+}
+FACTORS = list(FACTOR_TABLES)
+
+# Column names used by the batch and file-based scoring paths
+INPUT_COLUMNS = ["city", "property_type", "bhk", "area", "location_type", "age", "floor", "furnishing", "parking"]
+
+
+class PriceCube:
+    """Combined price per sq ft for every category combination.
+
+    Every price has the form area x (city rate x six multipliers) + parking
+    + amenities, so the product is precomputed once into an integer-indexed
+    table and each prediction becomes a single array lookup.
+    """
+
+    def __init__(self, factor_tables=FACTOR_TABLES, parking_bonus=PARKING_BONUS, amenity_bonus=AMENITY_BONUS,
+                 dtype=np.float32, version=None, metadata=None, rates=None):
+        self.factor_tables = {factor: dict(table) for factor, table in factor_tables.items()}
+        self.version = version or tables_version(factor_tables, parking_bonus, amenity_bonus)
+        self.metadata = dict(metadata or {})
+        self.factors = list(factor_tables)
+        self.categories = {factor: list(table) for factor, table in factor_tables.items()}
+        self.codes = {factor: {name: code for code, name in enumerate(names)} for factor, names in self.categories.items()}
+
+        shape = tuple(len(table) for table in factor_tables.values())
+        if rates is not None:
+            # Precomputed cube, e.g. read from a binary table file
+            if rates.shape != shape:
+                raise ValueError(f"rates shape {rates.shape} does not match the factor tables {shape}")
+            self.rates = rates
+        else:
+            # Multiply in float64 along each axis, then store compactly
+            rates = np.ones(shape, dtype=np.float64)
+            for axis, table in enumerate(factor_tables.values()):
+                axis_shape = [1] * rates.ndim
+                axis_shape[axis] = len(table)
+                rates = rates * np.array(list(table.values()), dtype=np.float64).reshape(axis_shape)
+            self.rates = rates.astype(dtype)
+
+        self.parking_table = dict(parking_bonus)
+        self.amenity_table = dict(amenity_bonus)
+        self.parking_categories = list(parking_bonus)
+        self.parking_codes = {name: code for code, name in enumerate(self.parking_categories)}
+        self.parking_bonus = np.array(list(parking_bonus.values()), dtype=np.float64)
+        self.amenities = list(amenity_bonus)
+        self.amenity_bonus = np.array(list(amenity_bonus.values()), dtype=np.int64)
+
+    @property
+    def nbytes(self):
+        return self.rates.nbytes + self.parking_bonus.nbytes + self.amenity_bonus.nbytes
+
+    def index(self, **inputs):
+        """Cube index tuple for one combination of factor values."""
+        return tuple(self.codes[factor][inputs[factor]] for factor in self.factors)
+
+    def rate(self, **inputs):
+        """Combined price per sq ft for one combination of factor values."""
+        return float(self.rates[self.index(**inputs)])
+
+    def encode(self, factor, values):
+        """Integer codes for a column of category names (integer input is taken as codes)."""
+        names = self.parking_categories if factor == "parking" else self.categories[factor]
+        values = np.asarray(values)
+        if np.issubdtype(values.dtype, np.integer):
+            if len(values) and (values.min() < 0 or values.max() >= len(names)):
+                raise KeyError(f"code out of range in column '{factor}'")
+            return values
+        return _encode(self.parking_codes if factor == "parking" else self.codes[factor], values, factor)
+
+
+def tables_version(factor_tables, parking_bonus, amenity_bonus):
+    """Short content hash identifying a set of pricing tables."""
+    content = json.dumps([factor_tables, parking_bonus, amenity_bonus], sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+# Binary table files: magic, header length and data offset (little-endian
+# uint64), a JSON header, then the raw rate cube aligned to 64 bytes
+BINARY_MAGIC = b"PRCUBE01"
+BINARY_PREFIX = struct.Struct("<8sQQ")
+
+
+def _artifact(cube, metadata=None):
+    return {
+        "format": 1,
+        "version": cube.version,
+        "metadata": {**cube.metadata, **(metadata or {})},
+        "factors": cube.factor_tables,
+        "parking": cube.parking_table,
+        "amenities": cube.amenity_table,
+    }
+
+
+def save_pricing_tables(path, cube, metadata=None):
+    """Write the tables behind a PriceCube as a versioned artifact.
+
+    Paths ending in .json get the readable JSON form; anything else gets the
+    binary form, which also stores the precomputed cube so loading it is a
+    single read rather than a rebuild. Either is written to a temporary file
+    and renamed into place, so readers never see a partial file.
+    """
+    artifact = _artifact(cube, metadata)
+    tmp_path = f"{path}.tmp"
+    if str(path).endswith(".json"):
+        with open(tmp_path, "w") as handle:
+            json.dump(artifact, handle, indent=2)
+    else:
+        rates = np.ascontiguousarray(cube.rates)
+        header = json.dumps({**artifact, "dtype": rates.dtype.str, "shape": rates.shape}).encode()
+        offset = -(-(BINARY_PREFIX.size + len(header)) // 64) * 64
+        with open(tmp_path, "wb") as handle:
+            handle.write(BINARY_PREFIX.pack(BINARY_MAGIC, len(header), offset))
+            handle.write(header)
+            handle.write(b"\0" * (offset - BINARY_PREFIX.size - len(header)))
+            handle.write(rates.tobytes())
+    os.replace(tmp_path, path)
+
+
+def _cube_from_artifact(path, artifact, rates=None):
+    if not isinstance(artifact, dict):
+        raise ValueError(f"{path}: pricing tables must be a JSON object, not {type(artifact).__name__}")
+    if artifact.get("format") != 1:
+        raise ValueError(f"{path}: unsupported pricing table format {artifact.get('format')!r}")
+    for key in ("version", "factors", "parking", "amenities"):
+        if not isinstance(artifact.get(key), str if key == "version" else dict):
+            raise ValueError(f"{path}: missing or malformed {key!r} in pricing tables")
+    if list(artifact["factors"]) != FACTORS or list(artifact["amenities"]) != AMENITIES:
+        raise ValueError(f"{path}: factor or amenity names do not match this app")
+    return PriceCube(
+        artifact["factors"], artifact["parking"], artifact["amenities"],
+        version=artifact["version"], metadata=artifact.get("metadata"), rates=rates
+    )
+
+
+def load_pricing_tables(path):
+    """PriceCube built from a table artifact written by save_pricing_tables (JSON or binary).
+
+    Raises ValueError for a file that is not a complete, well-formed artifact.
+    """
+    with open(path, "rb") as handle:
+        prefix = handle.read(BINARY_PREFIX.size)
+        if not prefix.startswith(BINARY_MAGIC):
+            handle.seek(0)
+            return _cube_from_artifact(path, json.load(handle))
+        # Read the whole file rather than mapping it: an array over a mapping would
+        # fault (SIGBUS) if the file were later truncated or rewritten in place
+        data = prefix + handle.read()
+
+    if len(prefix) < BINARY_PREFIX.size:
+        raise ValueError(f"{path}: truncated pricing table file")
+    _, header_length, offset = BINARY_PREFIX.unpack(prefix)
+    header = json.loads(data[BINARY_PREFIX.size:BINARY_PREFIX.size + header_length])
+    shape = header.get("shape") if isinstance(header, dict) else None
+    if not isinstance(shape, list) or not all(isinstance(size, int) and size >= 0 for size in shape) \
+            or header.get("dtype") not in ("<f4", "<f8"):
+        raise ValueError(f"{path}: malformed pricing table header")
+    dtype = np.dtype(header["dtype"])
+    shape = tuple(shape)
+    count = int(np.prod(shape))
+    if offset < BINARY_PREFIX.size + header_length or offset + dtype.itemsize * count > len(data):
+        raise ValueError(f"{path}: truncated pricing table file")
+    rates = np.frombuffer(data, dtype=dtype, count=count, offset=offset).reshape(shape)
+    return _cube_from_artifact(path, header, rates)
+
+
+def _check_same_layout(cube, active):
+    if cube.categories != active.categories or cube.parking_categories != active.parking_categories \
+            or cube.amenities != active.amenities:
+        raise ValueError("category layout changed; restart to apply these tables")
+
+
+class TableWatcher:
+    """Reload the pricing tables whenever their file changes.
+
+    poll() stats the file at most once per interval. When its modification
+    time, size or inode has changed, the new tables are loaded and installed
+    as the active cube. Only one thread reloads at a time and no caller ever
+    waits for it: prices already being computed keep the cube they started
+    with. A file that fails to load, or that adds, removes or reorders
+    categories (which would change the codes callers already hold), is
+    counted in errors and the current tables stay active.
+    """
+
+    def __init__(self, path, interval=1.0):
+        self.path = path
+        self.interval = interval
+        self.signature = self._signature()
+        self.next_check = time.monotonic() + interval
+        self.reloads = 0
+        self.errors = 0
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def poll(self):
+        """Reload if the file changed; returns True when new tables were installed."""
+        now = time.monotonic()
+        if now < self.next_check or not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self.next_check = now + self.interval
+            signature = self._signature()
+            if signature is None or signature == self.signature:
+                return False
+            # Remember the signature even on failure so a broken file is not re-read every poll
+            self.signature = signature
+            try:
+                cube = load_pricing_tables(self.path)
+                _check_same_layout(cube, PRICE_CUBE)
+            except Exception as exc:  # whatever is wrong with the file, keep serving the current tables
+                self.errors += 1
+                self.last_error = f"{type(exc).__name__}: {exc}"
+                return False
+            install_cube(cube)
+            self.reloads += 1
+            return True
+        finally:
+            self._lock.release()
+
+
+def _encode(codes, values, column):
+    # Small inputs (single app predictions) skip the pandas import entirely
+    if len(values) <= 64:
+        try:
+            return np.array([codes[value] for value in values], dtype=np.intp)
+        except KeyError as exc:
+            raise KeyError(f"unknown value {exc.args[0]!r} in column '{column}'") from None
+
+    # Hash-factorize the column once, then map the few distinct names to codes
+    import pandas as pd
+
+    row_codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    if (row_codes < 0).any():
+        raise KeyError(f"missing value in column '{column}'")
+    try:
+        lut = np.array([codes[value] for value in uniques], dtype=np.intp)
+    except KeyError as exc:
+        raise KeyError(f"unknown value {exc.args[0]!r} in column '{column}'") from None
+    return lut[row_codes]
+
+
+def install_cube(cube):
+    """Make cube the active pricing tables; calls already in progress keep the cube they started with."""
+    global PRICE_CUBE
+    PRICE_CUBE = cube
+
+
+def current_cube():
+    """The active PriceCube, after picking up any change to the $PRICING_TABLES file."""
+    if TABLE_WATCHER is not None:
+        TABLE_WATCHER.poll()
+    return PRICE_CUBE
+
+
+# Built once at import; shared by the scalar and batch paths. PRICING_TABLES
+# points at a fitted table artifact to use instead of the built-in tables; it
+# is re-checked every PRICING_TABLES_POLL_SECONDS and hot-swapped on change.
+TABLE_WATCHER = TableWatcher(
+    os.environ["PRICING_TABLES"], float(os.environ.get("PRICING_TABLES_POLL_SECONDS", 1.0))
+) if os.environ.get("PRICING_TABLES") else None
+PRICE_CUBE = load_pricing_tables(TABLE_WATCHER.path) if TABLE_WATCHER else PriceCube()
+
+
+# Enhanced prediction function for Indian market
+def calculate_indian_property_price(city, property_type, bhk, area, location_type, age, floor, furnishing, parking, amenities,
+                                    cube=None, locality_factor=1.0):
+    cube = cube or current_cube()
+
+    # Base price with all multipliers applied, read from the precomputed cube; a
+    # locality scales its city's rate (see localities.py)
+    base_price = cube.rate(
+        city=city, property_type=property_type, location_type=location_type,
+        age=age, floor=floor, furnishing=furnishing, bhk=bhk
+    ) * locality_factor * area
+
+    # Parking bonus
+    base_price += cube.parking_table[parking]
+
+    # Amenities bonus
+    amenity_bonus = 0
+    for name, bonus in cube.amenity_table.items():
+        if amenities[name]:
+            amenity_bonus += bonus
+
+    base_price += amenity_bonus
+
+    return int(base_price)
+
+
+def _amenity_matrix(amenities, n_rows):
+    # Accept either a (rows, len(AMENITIES)) flag array or a dict of per-amenity flag arrays
+    if amenities is None:
+        return np.zeros((n_rows, len(AMENITIES)), dtype=bool)
+    if isinstance(amenities, dict):
+        flags = np.zeros((n_rows, len(AMENITIES)), dtype=bool)
+        for i, name in enumerate(AMENITIES):
+            if name in amenities:
+                flags[:, i] = np.asarray(amenities[name], dtype=bool)
+        return flags
+    flags = np.asarray(amenities, dtype=bool)
+    if flags.shape != (n_rows, len(AMENITIES)):
+        raise ValueError(f"amenity flags must have shape ({n_rows}, {len(AMENITIES)}), got {flags.shape}")
+    return flags
+
+
+def price_components(city, property_type, bhk, area, location_type, age, floor, furnishing, parking, amenities=None,
+                     cube=None, locality_factor=None):
+    """Per-row (rate per sq ft, area, parking bonus, amenity bonus) arrays.
+
+    Every price is trunc(rate * area + parking bonus + amenity bonus),
+    evaluated left to right. Categorical columns may hold names or PriceCube
+    integer codes. cube defaults to the active tables. locality_factor, a
+    scalar or per-row array, multiplies the rate (None means 1).
+    """
+    cube = cube or current_cube()
+    area = np.asarray(area)
+    n_rows = len(area)
+
+    columns = {
+        "city": city, "property_type": property_type, "location_type": location_type,
+        "age": age, "floor": floor, "furnishing": furnishing, "bhk": bhk,
+    }
+    index = tuple(cube.encode(factor, columns[factor]) for factor in cube.factors)
+
+    rate = cube.rates[index].astype(np.float64)
+    if locality_factor is not None:
+        rate = rate * locality_factor
+    parking_bonus = cube.parking_bonus[cube.encode("parking", parking)]
+    amenity_bonus = _amenity_matrix(amenities, n_rows).astype(np.int64) @ cube.amenity_bonus
+    return rate, area, parking_bonus, amenity_bonus
+
+
+def calculate_indian_property_price_batch(city, property_type, bhk, area, location_type, age, floor, furnishing, parking,
+                                          amenities=None, cube=None, locality_factor=None):
+    """Vectorized form of calculate_indian_property_price over equal-length arrays.
+
+    Categorical columns may hold names or PriceCube integer codes. Returns an
+    int64 array that matches the scalar function row for row.
+    """
+    rate, area, parking_bonus, amenity_bonus = price_components(
+        city, property_type, bhk, area, location_type, age, floor, furnishing, parking, amenities, cube, locality_factor
+    )
+
+    # Same operation order as the scalar function so the float rounding is identical
+    base_price = rate * area
+    base_price += parking_bonus
+    base_price += amenity_bonus
+
+    return np.trunc(base_price).astype(np.int64)
+
+
+def frame_columns(df):
+    """Positional arguments for the batch functions, taken from a listings DataFrame.
+
+    The frame needs the INPUT_COLUMNS; amenity columns named as in AMENITIES
+    are optional and count as absent when missing.
+    """
+    amenities = {name: df[name].to_numpy() for name in AMENITIES if name in df.columns}
+    return (
+        df["city"].to_numpy(), df["property_type"].to_numpy(), df["bhk"].to_numpy(),
+        df["area"].to_numpy(), df["location_type"].to_numpy(), df["age"].to_numpy(),
+        df["floor"].to_numpy(), df["furnishing"].to_numpy(), df["parking"].to_numpy(),
+        amenities
+    )
+
+
+def price_dataframe(df, cube=None):
+    """Price every row of a listings DataFrame (see frame_columns for the schema)."""
+    return calculate_indian_property_price_batch(*frame_columns(df), cube=cube)
+
+
+def derived_metrics(predicted_price, area):
+    """Price per sq ft, monthly EMI, stamp duty and registration fee.
+
+    The EMI is the exact annuity payment on the loan left after the default
+    down payment, at the default rate and tenure. Works on scalars or NumPy
+    arrays alike.
+    """
+    return {
+        "price_per_sqft": predicted_price / area,
+        "monthly_emi": monthly_emi(loan_amount(predicted_price, DEFAULT_DOWN_PAYMENT), DEFAULT_RATE, DEFAULT_TENURE),
+        "stamp_duty": predicted_price * STAMP_DUTY_RATE,
+        "registration_fee": predicted_price * REGISTRATION_RATE,
+    }
+
+
+def score_dataframe(df, attribution=False, cube=None):
+    """Predicted price plus the derived cost columns for every row of df, as NumPy arrays.
+
+    Each row is tagged with the version of the pricing tables that priced it.
+    With attribution, the attribution.ATTRIBUTION_COLUMNS are added with an
+    "attribution_" prefix.
+    """
+    cube = cube or current_cube()
+    if attribution:
+        from attribution import attribute_dataframe
+
+        parts = attribute_dataframe(df, cube)
+        prices = parts.pop("predicted_price")
+    else:
+        prices = price_dataframe(df, cube)
+    columns = {"predicted_price": prices}
+    for name, values in derived_metrics(prices, df["area"].to_numpy()).items():
+        columns[name] = values.round(2)
+    if attribution:
+        for name, values in parts.items():
+            columns[f"attribution_{name}"] = values.round(2)
+    columns["table_version"] = np.full(len(prices), cube.version)
+    return columns
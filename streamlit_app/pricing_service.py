@@ -0,0 +1,311 @@
+"""Headless HTTP pricing service with micro-batching (stdlib asyncio only).
+
+Endpoints:
+    POST /predict  body is one property object or a list of them, using the
+                   argument names of calculate_indian_property_price
+                   ("amenities" is an optional object of flags)
+    GET  /stats    latency percentiles, throughput and batching counters
+    GET  /health
+
+Every prediction response carries the "table_version" of the pricing tables
+that priced it; tables named by $PRICING_TABLES are hot-reloaded on change.
+
+Concurrent requests that arrive within --window-ms of each other are priced
+together in one calculate_indian_property_price_batch call.
+
+Usage: python pricing_service.py [--port 8600] [--window-ms 2] [--max-batch 4096]
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+from pricing import AMENITIES, calculate_indian_property_price_batch, current_cube
+
+MAX_BODY_BYTES = 8 * 2**20
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class Overloaded(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    """A request that cannot be parsed; answered with 400 and the connection closed."""
+
+
+def encode_properties(properties):
+    """Turn a list of property dicts into cube codes, area and amenity flags."""
+    cube = current_cube()
+    columns = {}
+    for factor in [*cube.factors, "parking"]:
+        codes = cube.parking_codes if factor == "parking" else cube.codes[factor]
+        try:
+            columns[factor] = np.array([codes[item[factor]] for item in properties], dtype=np.intp)
+        except KeyError as exc:
+            raise ValueError(f"missing or unknown value for '{factor}': {exc}") from None
+    try:
+        columns["area"] = np.array([float(item["area"]) for item in properties])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("every property needs a numeric 'area'") from None
+    invalid = ~(np.isfinite(columns["area"]) & (columns["area"] > 0))
+    if invalid.any():
+        raise ValueError(f"'area' must be a positive finite number, got {columns['area'][invalid.argmax()]}")
+    columns["amenities"] = np.array([_amenity_flags(item) for item in properties], dtype=bool).reshape(
+        len(properties), len(AMENITIES)
+    )
+    return columns
+
+
+def _amenity_flags(item):
+    # Only JSON booleans: bool("false") is True and would add the bonus
+    amenities = item.get("amenities", {})
+    if not isinstance(amenities, dict):
+        raise ValueError("'amenities' must be an object of true/false flags")
+    for name, flag in amenities.items():
+        if name not in AMENITIES:
+            raise ValueError(f"unknown amenity {name!r}")
+        if not isinstance(flag, bool):
+            raise ValueError(f"amenity {name!r} must be true or false, got {flag!r}")
+    return [amenities.get(name, False) for name in AMENITIES]
+
+
+class MicroBatcher:
+    """Coalesce concurrent pricing requests into batch calls.
+
+    A batch is flushed when window_ms has passed since its first request or
+    when it holds max_batch rows. Submissions beyond max_pending queued rows
+    are rejected with Overloaded.
+    """
+
+    def __init__(self, window_ms=2.0, max_batch=4096, max_pending=65536):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.pending = []
+        self.pending_rows = 0
+        self.flush_handle = None
+        self.batches = 0
+        self.batched_rows = 0
+
+    async def submit(self, columns):
+        n_rows = len(columns["area"])
+        if self.pending_rows + n_rows > self.max_pending:
+            raise Overloaded(f"{self.pending_rows} rows already queued")
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((columns, future))
+        self.pending_rows += n_rows
+        if self.pending_rows >= self.max_batch:
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(self.window, self.flush)
+        return await future
+
+    def flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        batch, self.pending, self.pending_rows = self.pending, [], 0
+        if not batch:
+            return
+
+        merged = {key: np.concatenate([columns[key] for columns, _ in batch]) for key in batch[0][0]}
+        # Hot reloads keep the category codes fixed, so codes encoded under older tables stay valid
+        cube = current_cube()
+        try:
+            prices = calculate_indian_property_price_batch(
+                merged["city"], merged["property_type"], merged["bhk"], merged["area"],
+                merged["location_type"], merged["age"], merged["floor"], merged["furnishing"],
+                merged["parking"], merged["amenities"], cube
+            )
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        self.batches += 1
+        self.batched_rows += len(prices)
+        start = 0
+        for columns, future in batch:
+            stop = start + len(columns["area"])
+            if not future.done():
+                future.set_result((prices[start:stop].tolist(), cube.version))
+            start = stop
+
+
+class ServiceStats:
+    """Rolling request latencies plus totals since start."""
+
+    def __init__(self, window=10000):
+        self.latencies = deque(maxlen=window)
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.rows = 0
+        self.rejected = 0
+        self.failed = 0
+
+    def record(self, seconds, n_rows):
+        self.latencies.append(seconds)
+        self.requests += 1
+        self.rows += n_rows
+
+    def snapshot(self, batcher):
+        elapsed = time.perf_counter() - self.started
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+        return {
+            "requests": self.requests,
+            "rows": self.rows,
+            "rejected": self.rejected,
+            "failed": self.failed,
+            "uptime_s": round(elapsed, 3),
+            "requests_per_s": round(self.requests / elapsed, 1),
+            "rows_per_s": round(self.rows / elapsed, 1),
+            "latency_ms_p50": round(float(np.percentile(latencies, 50)), 3),
+            "latency_ms_p99": round(float(np.percentile(latencies, 99)), 3),
+            "batches": batcher.batches,
+            "mean_batch_rows": round(batcher.batched_rows / batcher.batches, 1) if batcher.batches else 0,
+            "queued_rows": batcher.pending_rows,
+        }
+
+
+class PricingService:
+    def __init__(self, window_ms=2.0, max_batch=4096, max_pending=65536, max_connections=1024):
+        self.batcher = MicroBatcher(window_ms, max_batch, max_pending)
+        self.stats = ServiceStats()
+        self.connections = asyncio.Semaphore(max_connections)
+
+    async def start(self, host="127.0.0.1", port=8600):
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def handle_connection(self, reader, writer):
+        async with self.connections:
+            try:
+                while True:
+                    try:
+                        request = await self.read_request(reader)
+                    except BadRequest as exc:
+                        # The rest of the stream cannot be framed, so answer and close
+                        self.write_response(writer, 400, {"error": str(exc)}, False)
+                        await writer.drain()
+                        break
+                    if request is None:
+                        break
+                    method, path, body, keep_alive = request
+                    status, payload = await self.dispatch(method, path, body)
+                    self.write_response(writer, status, payload, keep_alive)
+                    await writer.drain()
+                    if not keep_alive:
+                        break
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+                pass
+            finally:
+                writer.close()
+
+    async def read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, path, version = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise BadRequest("malformed request line") from None
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = headers.get("content-length", "0")
+        if not length.isdigit():
+            raise BadRequest(f"invalid Content-Length {length!r}")
+        length = int(length)
+        if length > MAX_BODY_BYTES:
+            return method, path, None, False
+        body = await reader.readexactly(length) if length else b""
+        keep_alive = headers.get("connection", "").lower() != "close" and version.strip() == "HTTP/1.1"
+        return method, path, body, keep_alive
+
+    async def dispatch(self, method, path, body):
+        if path == "/health":
+            return 200, {"status": "ok", "table_version": current_cube().version}
+        if path == "/stats":
+            return 200, self.stats.snapshot(self.batcher)
+        if path != "/predict":
+            return 404, {"error": f"unknown path {path}"}
+        if method != "POST":
+            return 405, {"error": "use POST"}
+        if body is None:
+            return 413, {"error": f"body larger than {MAX_BODY_BYTES} bytes"}
+
+        start = time.perf_counter()
+        try:
+            payload = json.loads(body)
+            properties = payload if isinstance(payload, list) else [payload]
+            columns = encode_properties(properties)
+        except (ValueError, AttributeError, TypeError) as exc:
+            return 400, {"error": str(exc)}
+        # A request that could never fit in the queue is too large, not a sign of overload
+        if len(properties) > self.batcher.max_pending:
+            limit = self.batcher.max_pending
+            return 413, {"error": f"{len(properties)} properties in one request; the limit is {limit}"}
+        try:
+            prices, version = await self.batcher.submit(columns)
+        except Overloaded as exc:
+            self.stats.rejected += 1
+            return 503, {"error": f"overloaded: {exc}"}
+        except Exception as exc:
+            # A failed batch fails every request coalesced into it; each still gets an answer
+            self.stats.failed += 1
+            return 500, {"error": f"pricing failed: {type(exc).__name__}: {exc}"}
+        self.stats.record(time.perf_counter() - start, len(prices))
+        result = {"prices": prices} if isinstance(payload, list) else {"price": prices[0]}
+        return 200, {**result, "table_version": version}
+
+    def write_response(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode()
+        headers = [
+            f"HTTP/1.1 {status} {REASONS[status]}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + body)
+
+
+async def serve(host, port, **options):
+    service = PricingService(**options)
+    server = await service.start(host, port)
+    print(f"Pricing service listening on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-batching pricing service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--window-ms", type=float, default=2.0, help="how long to collect requests into one batch")
+    parser.add_argument("--max-batch", type=int, default=4096, help="rows that trigger an immediate flush")
+    parser.add_argument("--max-pending", type=int, default=65536, help="queued rows before requests get 503")
+    parser.add_argument("--max-connections", type=int, default=1024)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(
+            args.host, args.port, window_ms=args.window_ms, max_batch=args.max_batch,
+            max_pending=args.max_pending, max_connections=args.max_connections
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Persistent prediction store shared by every app process on a host.
+
+Results live in a SQLite database in WAL mode, keyed by a stable hash of the
+pricing inputs plus the pricing-table version, so a change to the factor
+tables makes every old entry unreachable. Entries for other versions are
+purged when the store is opened; after a hot reload, old entries simply age
+out. The store keeps about max_entries rows, evicting the least recently
+used ones. Counting the rows is a full index scan, so each process checks
+the size only every evict_every puts; the store can briefly run over by that
+many rows per process.
+
+Enable it in the app by setting PRICE_CACHE_DB to a file path.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import pricing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    value TEXT NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access);
+"""
+
+
+def table_version(cube=None):
+    """Version of the pricing tables the given (or active) PriceCube was built from."""
+    return (cube or pricing.current_cube()).version
+
+
+def stable_key(inputs, version):
+    """Hash of the inputs that does not depend on dict order or the Python process."""
+    payload = json.dumps({"inputs": inputs, "version": version}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultStore:
+    """Size-bounded LRU store of JSON values in SQLite.
+
+    Each thread gets its own connection; WAL mode lets several processes
+    read while one writes, and busy_timeout makes writers wait for the lock
+    instead of failing.
+    """
+
+    def __init__(self, path, max_entries=100_000, version=None):
+        self.path = path
+        self.max_entries = max_entries
+        # Puts between size checks: 1% of the bound, at most 1000
+        self.evict_every = max(1, min(1000, max_entries // 100))
+        self.version = version or table_version()
+        self._puts = 0
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+        self.lookup_seconds = 0.0
+
+        db = self._connection()
+        db.executescript(SCHEMA)
+        # Entries priced with other tables can never be hit again
+        with db:
+            db.execute("DELETE FROM results WHERE version != ?", (self.version,))
+
+    def _connection(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("PRAGMA busy_timeout=30000")
+            self._local.db = db
+        return db
+
+    def key(self, inputs, version=None):
+        return stable_key(inputs, version or self.version)
+
+    def get(self, inputs, version=None):
+        """Stored value for inputs priced with the given table version (default: the store's), or None."""
+        start = time.perf_counter()
+        key = self.key(inputs, version)
+        db = self._connection()
+        row = db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            db.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.lookup_seconds += time.perf_counter() - start
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, inputs, value, version=None):
+        db = self._connection()
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO results (key, version, value, last_access) VALUES (?, ?, ?, ?)",
+                (self.key(inputs, version), version or self.version, json.dumps(value, default=_to_json), time.time())
+            )
+            self._puts += 1
+            if self._puts % self.evict_every == 0:
+                self._evict(db)
+
+    def _evict(self, db):
+        excess = db.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.max_entries
+        if excess > 0:
+            db.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_access LIMIT ?)",
+                (excess,)
+            )
+
+    def get_or_compute(self, inputs, compute, version=None):
+        value = self.get(inputs, version)
+        if value is None:
+            value = compute()
+            self.put(inputs, value, version)
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        size = self._connection().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return {
+            "path": self.path,
+            "version": self.version,
+            "size": size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "mean_lookup_ms": 1000 * self.lookup_seconds / lookups if lookups else 0.0,
+        }
+
+
+def _to_json(value):
+    # NumPy arrays and scalars inside plotly figure dicts
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def open_from_env():
+    """ResultStore at $PRICE_CACHE_DB (size from $PRICE_CACHE_MAX_ENTRIES), or None when unset."""
+    path = os.environ.get("PRICE_CACHE_DB")
+    if not path:
+        return None
+    return ResultStore(path, max_entries=int(os.environ.get("PRICE_CACHE_MAX_ENTRIES", 100_000)))
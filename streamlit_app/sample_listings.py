@@ -0,0 +1,78 @@
+"""Random listings in the app's input schema, for benchmarks and local testing."""
+import numpy as np
+
+from pricing import (
+    AGE_MULTIPLIERS, AMENITIES, BHK_MULTIPLIERS, CITY_PRICES, FLOOR_MULTIPLIERS,
+    FURNISHING_MULTIPLIERS, LOCATION_MULTIPLIERS, PARKING_BONUS, PROPERTY_MULTIPLIERS, price_dataframe
+)
+
+
+def generate_listings(n_rows, seed=0, price_noise=None):
+    """Return a DataFrame of n_rows listings drawn uniformly from every category.
+
+    With price_noise (sigma of a lognormal factor), an observed "price"
+    column is added: the model price scattered around its true value, which
+    is what train_model.py fits against.
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+
+    def pick(table):
+        return np.array(list(table), dtype=object)[rng.integers(0, len(table), n_rows)]
+
+    data = {
+        "city": pick(CITY_PRICES),
+        "property_type": pick(PROPERTY_MULTIPLIERS),
+        "bhk": pick(BHK_MULTIPLIERS),
+        # Slider range in the app: 200 to 5000 sq ft in steps of 50
+        "area": rng.integers(4, 101, n_rows) * 50,
+        "location_type": pick(LOCATION_MULTIPLIERS),
+        "age": pick(AGE_MULTIPLIERS),
+        "floor": pick(FLOOR_MULTIPLIERS),
+        "furnishing": pick(FURNISHING_MULTIPLIERS),
+        "parking": pick(PARKING_BONUS),
+    }
+    for name in AMENITIES:
+        data[name] = rng.random(n_rows) < 0.5
+    df = pd.DataFrame(data)
+    if price_noise is not None:
+        df["price"] = (price_dataframe(df) * rng.lognormal(0.0, price_noise, n_rows)).round()
+    return df
+
+
+def generate_sales(n_rows, month, years_ago, seed=0, price_noise=0.1):
+    """Listings sold in `month` ("YYYY-MM"), for building a price history.
+
+    Prices are today's model price discounted by each city's annual growth
+    (4% to 10%, in CITY_PRICES order) over `years_ago` years, with a small
+    seasonal swing.
+    """
+    df = generate_listings(n_rows, seed=seed, price_noise=price_noise)
+    growth = dict(zip(CITY_PRICES, np.linspace(0.04, 0.10, len(CITY_PRICES))))
+    seasonal = 1 + 0.015 * np.sin(2 * np.pi * (int(month[5:7]) - 3) / 12)
+    deflator = seasonal / (1 + df["city"].map(growth).to_numpy(dtype=np.float64)) ** years_ago
+    df["price"] = (df["price"] * deflator).round()
+    df["month"] = month
+    return df
+
+
+def write_listings(path, n_rows, chunk_rows=200_000, seed=0, price_noise=None):
+    """Write n_rows random listings to a CSV or Parquet file, one chunk at a time."""
+    from score_listings import ChunkWriter
+
+    with ChunkWriter(path) as writer:
+        for i, start in enumerate(range(0, n_rows, chunk_rows)):
+            writer.write(generate_listings(min(chunk_rows, n_rows - start), seed=seed + i, price_noise=price_noise))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write a random listings file")
+    parser.add_argument("output", help="CSV or Parquet path (by extension)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--price-noise", type=float, default=None, help="add an observed 'price' column with this lognormal sigma")
+    args = parser.parse_args()
+    write_listings(args.output, args.rows, seed=args.seed, price_noise=args.price_noise)
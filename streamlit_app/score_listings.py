@@ -0,0 +1,189 @@
+"""Score a listings file in fixed-size chunks with bounded memory.
+
+Reads CSV (optionally compressed) or Parquet, prices each chunk with the same
+tables as the app, and appends predicted_price, price_per_sqft, monthly_emi,
+stamp_duty and registration_fee columns to the output file, plus per-factor
+price attribution columns with --attribution. Only a bounded number of
+chunks is held in memory at a time, so peak RSS does not grow with the file
+size.
+
+Every chunk's category columns are checked against the pricing tables before
+it is scored; the first unknown or missing value stops the run with its
+column, row and value. Output goes to a temporary file that is renamed into
+place only when every row has been scored, so a failed run leaves no partial
+file behind.
+
+Usage: python score_listings.py listings.csv scored.parquet [--chunk-rows 200000] [--workers 4] [--attribution]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pricing
+from parallel_scoring import score_chunks
+
+DEFAULT_CHUNK_ROWS = 200_000
+
+
+def _is_parquet(path):
+    return path.lower().endswith((".parquet", ".pq"))
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise SystemExit("Parquet input/output needs pyarrow: pip install pyarrow") from None
+
+
+def iter_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield DataFrames of at most chunk_rows rows from a CSV or Parquet file."""
+    if _is_parquet(path):
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+
+
+def check_categories(chunk, first_row, cube):
+    """Raise ValueError for the first category value in chunk the tables don't know.
+
+    Integer columns are taken as codes, as in PriceCube.encode. first_row is
+    the data row number of the chunk's first row, used in the message.
+    """
+    from pandas.api.types import is_integer_dtype
+
+    for factor in [*cube.factors, "parking"]:
+        if factor not in chunk.columns:
+            raise ValueError(f"no '{factor}' column")
+        names = cube.parking_categories if factor == "parking" else cube.categories[factor]
+        values = chunk[factor]
+        if is_integer_dtype(values.dtype):
+            bad = ((values < 0) | (values >= len(names))).to_numpy()
+        else:
+            bad = ~values.isin(names).to_numpy()
+        if bad.any():
+            index = int(bad.argmax())
+            raise ValueError(f"row {first_row + index}: unknown value {values.iloc[index]!r} in column '{factor}'")
+
+
+def checked_chunks(chunks, cube):
+    """Pass chunks through after check_categories; rows are numbered from 1."""
+    first_row = 1
+    for chunk in chunks:
+        check_categories(chunk, first_row, cube)
+        first_row += len(chunk)
+        yield chunk
+
+
+class ChunkWriter:
+    """Append scored chunks to a CSV or Parquet file (by the extension of path, or of format_path)."""
+
+    def __init__(self, path, format_path=None):
+        self.path = path
+        self.parquet = _is_parquet(format_path or path)
+        self.handle = None
+        self.writer = None
+
+    def write(self, df):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, table.schema)
+            self.writer.write_table(table)
+        else:
+            if self.handle is None:
+                self.handle = open(self.path, "w", newline="")
+                df.to_csv(self.handle, index=False)
+            else:
+                df.to_csv(self.handle, index=False, header=False)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        if self.handle is not None:
+            self.handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def score_file(input_path, output_path, chunk_rows=DEFAULT_CHUNK_ROWS, progress=None, workers=1, attribution=False):
+    """Stream input_path through the pricing model into output_path; returns rows scored.
+
+    With workers > 1, chunks are scored in a process pool while the next ones
+    are read; output order always matches input order. Raises ValueError for
+    an unknown category (see check_categories), leaving output_path untouched.
+    """
+    if _is_parquet(output_path):
+        _require_pyarrow()
+    chunks = checked_chunks(iter_chunks(input_path, chunk_rows), pricing.current_cube())
+    tmp_path = f"{output_path}.tmp"
+    rows = 0
+    try:
+        with ChunkWriter(tmp_path, output_path) as writer:
+            for chunk, columns in score_chunks(chunks, workers, attribution=attribution):
+                writer.write(chunk.assign(**columns))
+                rows += len(chunk)
+                if progress:
+                    progress(rows)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    # The writer opens its file with the first chunk, so an input with no chunks writes nothing
+    if os.path.exists(tmp_path):
+        os.replace(tmp_path, output_path)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a listings file with the property price model")
+    parser.add_argument("input", help="CSV or Parquet listings file")
+    parser.add_argument("output", help="CSV or Parquet output file (by extension)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=1, help="scoring processes (1 scores in this process)")
+    parser.add_argument("--attribution", action="store_true", help="add per-factor price attribution columns")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+
+    def progress(rows):
+        if not args.quiet:
+            elapsed = time.perf_counter() - start
+            print(f"\r{rows:,} rows  {rows / elapsed:,.0f} rows/s  peak RSS {peak_rss_mb():,.0f} MiB", end="", file=sys.stderr)
+
+    try:
+        rows = score_file(args.input, args.output, args.chunk_rows, progress, args.workers, args.attribution)
+    except ValueError as exc:
+        raise SystemExit(f"\n{args.input}: {exc}; nothing written to {args.output}") from None
+    elapsed = time.perf_counter() - start
+    print(f"\nScored {rows:,} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s), "
+          f"peak RSS {peak_rss_mb():,.0f} MiB", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
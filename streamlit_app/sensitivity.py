@@ -0,0 +1,78 @@
+"""What-if sweeps of one or two pricing inputs around a base configuration.
+
+The whole grid is priced in a single calculate_indian_property_price_batch
+call on integer cube codes, so thousands of points cost milliseconds.
+"""
+import numpy as np
+
+from pricing import AMENITIES, calculate_indian_property_price_batch, current_cube
+
+# Slider range in the app: 200 to 5000 sq ft in steps of 50
+AREA_VALUES = list(range(200, 5001, 50))
+
+SWEEP_LABELS = {
+    "area": "Area (Sq Ft)",
+    "city": "City",
+    "property_type": "Property Type",
+    "bhk": "BHK",
+    "location_type": "Location Type",
+    "age": "Property Age",
+    "floor": "Floor",
+    "furnishing": "Furnishing",
+    "parking": "Parking",
+}
+
+
+def sweep_values(name, cube=None):
+    """Every value the app allows for an input."""
+    cube = cube or current_cube()
+    if name == "area":
+        return AREA_VALUES
+    if name == "parking":
+        return list(cube.parking_categories)
+    return list(cube.categories[name])
+
+
+def _codes(cube, name, values):
+    if name == "area":
+        return np.asarray(values, dtype=np.float64)
+    return cube.encode(name, values)
+
+
+def sweep(inputs, x, y=None, x_values=None, y_values=None, cube=None):
+    """Prices over x (and optionally y) with every other input held at its base value.
+
+    Returns {"x": x_values, "y": y_values, "prices": array} where prices has
+    shape (len(y_values), len(x_values)), or (len(x_values),) for a 1-D sweep.
+    """
+    cube = cube or current_cube()
+    if x == y:
+        raise ValueError("x and y must be different inputs")
+    x_values = list(x_values if x_values is not None else sweep_values(x, cube))
+    axes = [(x, x_values)]
+    if y is not None:
+        y_values = list(y_values if y_values is not None else sweep_values(y, cube))
+        axes.insert(0, (y, y_values))
+
+    # Swept inputs vary along their grid axis; the rest are broadcast constants
+    grids = np.meshgrid(*[_codes(cube, name, values) for name, values in axes], indexing="ij")
+    shape = grids[0].shape
+    columns = {}
+    for name in SWEEP_LABELS:
+        swept = [grid for (axis_name, _), grid in zip(axes, grids) if axis_name == name]
+        if swept:
+            columns[name] = swept[0].ravel()
+        else:
+            columns[name] = np.full(grids[0].size, _codes(cube, name, [inputs[name]])[0])
+    flags = np.array([bool(inputs["amenities"].get(name, False)) for name in AMENITIES])
+    amenities = np.broadcast_to(flags, (grids[0].size, len(AMENITIES)))
+
+    # A locality belongs to its city; other cities in a city sweep are priced at their base rate
+    in_city = columns["city"] == _codes(cube, "city", [inputs["city"]])[0]
+    locality_factor = np.where(in_city, inputs.get("locality_factor", 1.0), 1.0)
+
+    prices = calculate_indian_property_price_batch(
+        columns["city"], columns["property_type"], columns["bhk"], columns["area"], columns["location_type"],
+        columns["age"], columns["floor"], columns["furnishing"], columns["parking"], amenities, cube, locality_factor
+    )
+    return {"x": x_values, "y": y_values, "prices": prices.reshape(shape), "table_version": cube.version}
@@ -0,0 +1,244 @@
+"""Opt-in per-rerun tracing and metrics for the Streamlit app (stdlib only).
+
+Enable with either environment variable:
+
+    APP_TRACE_FILE=/tmp/app_trace.jsonl   one JSON line per rerun: section timings,
+                                          counters and chart payload sizes
+    APP_METRICS_PORT=9464                 Prometheus text at http://127.0.0.1:9464/metrics
+                                          (and a JSON snapshot at /metrics.json)
+
+When neither is set, get_tracer() returns a NullTracer whose methods do
+nothing, so the instrumentation left in the app costs well under a
+microsecond per call.
+
+A rerun is timed as a sequence of sections: section(name) closes the
+previous section and opens the next, which fits a top-to-bottom script
+without re-indenting it. span(name) times a nested block on its own.
+"""
+import json
+import os
+import threading
+import time
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer.record_span(self.name, time.perf_counter() - self.start)
+
+
+class Tracer:
+    """Collects timings, counters and byte sizes per rerun and in process-wide totals.
+
+    Streamlit runs each session's script in its own thread, so the rerun in
+    progress is thread-local; totals are shared under a lock.
+    """
+
+    enabled = True
+
+    def __init__(self, jsonl_path=None):
+        self.jsonl_path = jsonl_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._file = open(jsonl_path, "a", buffering=1) if jsonl_path else None
+        self.spans = {}  # name -> [count, total seconds, max seconds]
+        self.counters = {}
+        self.payloads = {}  # name -> [count, total bytes, last bytes]
+
+    def _rerun(self):
+        return getattr(self._local, "rerun", None)
+
+    def start_rerun(self):
+        self._local.rerun = {"start": time.perf_counter(), "spans": {}, "counters": {}, "charts": {}}
+        self._local.section = None
+        self.count("reruns")
+
+    def section(self, name):
+        """End the current section (if any) and start timing the next one."""
+        now = time.perf_counter()
+        current = getattr(self._local, "section", None)
+        if current is not None:
+            self.record_span(current[0], now - current[1])
+        self._local.section = (name, now)
+
+    def span(self, name):
+        return _Span(self, name)
+
+    def record_span(self, name, seconds):
+        rerun = self._rerun()
+        if rerun is not None:
+            rerun["spans"][name] = rerun["spans"].get(name, 0.0) + seconds
+        with self._lock:
+            totals = self.spans.setdefault(name, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] = max(totals[2], seconds)
+
+    def count(self, name, amount=1):
+        rerun = self._rerun()
+        if rerun is not None:
+            rerun["counters"][name] = rerun["counters"].get(name, 0) + amount
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_bytes(self, name, size):
+        rerun = self._rerun()
+        if rerun is not None:
+            rerun["charts"][name] = size
+        with self._lock:
+            totals = self.payloads.setdefault(name, [0, 0, 0])
+            totals[0] += 1
+            totals[1] += size
+            totals[2] = size
+
+    def end_rerun(self):
+        """Close the last section and emit the rerun's record; returns it."""
+        rerun = self._rerun()
+        if rerun is None:
+            return None
+        self.section(None)
+        self._local.section = None
+        self._local.rerun = None
+        total = time.perf_counter() - rerun["start"]
+        self.record_span("rerun", total)
+        record = {
+            "ts": round(time.time(), 3),
+            "rerun_ms": round(1000 * total, 3),
+            "sections_ms": {name: round(1000 * seconds, 3) for name, seconds in rerun["spans"].items()},
+            "counters": rerun["counters"],
+            "chart_bytes": rerun["charts"],
+        }
+        if self._file is not None:
+            line = json.dumps(record)
+            with self._lock:
+                self._file.write(line + "\n")
+        return record
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "spans": {name: {"count": count, "total_s": total, "max_s": peak}
+                          for name, (count, total, peak) in self.spans.items()},
+                "counters": dict(self.counters),
+                "chart_bytes": {name: {"count": count, "total": total, "last": last}
+                                for name, (count, total, last) in self.payloads.items()},
+            }
+
+    def prometheus_text(self):
+        """Totals in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP app_section_seconds Time spent in each section of the app script.",
+            "# TYPE app_section_seconds summary",
+        ]
+        for name, span in sorted(snapshot["spans"].items()):
+            lines.append(f'app_section_seconds_sum{{section="{name}"}} {span["total_s"]:.6f}')
+            lines.append(f'app_section_seconds_count{{section="{name}"}} {span["count"]}')
+        # Its own family: a name under app_section_seconds would read as part of the summary
+        lines += ["# HELP app_section_max_seconds Slowest single run of each section.",
+                  "# TYPE app_section_max_seconds gauge"]
+        for name, span in sorted(snapshot["spans"].items()):
+            lines.append(f'app_section_max_seconds{{section="{name}"}} {span["max_s"]:.6f}')
+        for name, value in sorted(snapshot["counters"].items()):
+            lines += [f"# TYPE app_{name}_total counter", f"app_{name}_total {value}"]
+        lines += ["# HELP app_chart_payload_bytes Serialized size of each chart sent to the browser.",
+                  "# TYPE app_chart_payload_bytes summary"]
+        for name, payload in sorted(snapshot["chart_bytes"].items()):
+            lines.append(f'app_chart_payload_bytes_sum{{chart="{name}"}} {payload["total"]}')
+            lines.append(f'app_chart_payload_bytes_count{{chart="{name}"}} {payload["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+class NullTracer:
+    """Stand-in used when tracing is off; every method is a no-op."""
+
+    enabled = False
+
+    def start_rerun(self):
+        pass
+
+    def section(self, name):
+        pass
+
+    def span(self, name):
+        return _NULL_SPAN
+
+    def record_span(self, name, seconds):
+        pass
+
+    def count(self, name, amount=1):
+        pass
+
+    def record_bytes(self, name, size):
+        pass
+
+    def end_rerun(self):
+        return None
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def serve_metrics(tracer, port, host="127.0.0.1"):
+    """Serve /metrics (Prometheus text) and /metrics.json from a daemon thread; returns the server."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = tracer.prometheus_text().encode(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = json.dumps(tracer.snapshot()).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer():
+    """The process-wide tracer configured from the environment (created on first call)."""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                path = os.environ.get("APP_TRACE_FILE")
+                port = os.environ.get("APP_METRICS_PORT")
+                tracer = Tracer(path) if path or port else NullTracer()
+                if port:
+                    serve_metrics(tracer, int(port))
+                _tracer = tracer
+    return _tracer
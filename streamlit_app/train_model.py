@@ -0,0 +1,219 @@
+"""Fit the pricing tables from a listings file with observed prices, out of core.
+
+The model is the app's own, with multiplicative noise on the total:
+
+    log(price) = log(area * exp(city + property_type + location + age + floor + furnishing + bhk)
+                     + parking bonus + amenity bonuses) + noise
+
+with one log-coefficient per category level (the reference level of each
+multiplier table is pinned to 1.0; cities carry the absolute rate). It is
+fitted by Gauss-Newton: every pass streams the file once, accumulating J'J
+and J'r for the linearized model chunk by chunk, then solves one small
+system for the update. Only one chunk and a (parameters x parameters)
+matrix are held in memory, so files larger than RAM fit on one machine.
+The update is ridge-shrunk towards the starting tables, which keeps levels
+with no rows at their current values.
+
+Usage: python train_model.py listings.parquet pricing_tables.json [--passes 6] [--chunk-rows 200000]
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+import pricing
+from score_listings import DEFAULT_CHUNK_ROWS, iter_chunks, peak_rss_mb
+
+BONUS_UNIT = 100_000  # ₹1 lakh
+
+
+class DesignLayout:
+    """Column layout of the one-hot design matrices, taken from a PriceCube."""
+
+    def __init__(self, cube):
+        self.cube = cube
+        self.offsets = {}
+        self.references = {}
+        n_columns = 0
+        for factor in cube.factors:
+            table = cube.factor_tables[factor]
+            # Cities have no reference level; every other table keeps its 1.0 level fixed
+            reference = None if factor == "city" else next(
+                (code for code, value in enumerate(table.values()) if value == 1.0), 0
+            )
+            self.references[factor] = reference
+            self.offsets[factor] = n_columns
+            n_columns += len(table) - (reference is not None)
+        self.n_log = n_columns
+        self.n_bonus = len(cube.parking_categories) - 1 + len(cube.amenities)
+
+    def _column(self, factor, codes):
+        reference = self.references[factor]
+        if reference is None:
+            return self.offsets[factor] + codes
+        column = self.offsets[factor] + codes - (codes > reference)
+        return np.where(codes == reference, -1, column)
+
+    def log_design(self, codes):
+        """Dense one-hot matrix (rows, n_log) for a dict of factor code arrays."""
+        n_rows = len(next(iter(codes.values())))
+        design = np.zeros((n_rows, self.n_log))
+        rows = np.arange(n_rows)
+        for factor in self.cube.factors:
+            columns = self._column(factor, codes[factor])
+            mask = columns >= 0
+            design[rows[mask], columns[mask]] = 1.0
+        return design
+
+    def bonus_design(self, parking_codes, amenity_flags):
+        """Parking one-hot (No Parking dropped) next to the amenity flags."""
+        n_parking = len(self.cube.parking_categories) - 1
+        design = np.zeros((len(parking_codes), self.n_bonus))
+        mask = parking_codes > 0
+        design[np.arange(len(parking_codes))[mask], parking_codes[mask] - 1] = 1.0
+        design[:, n_parking:] = amenity_flags
+        return design
+
+    def initial_params(self):
+        """(log coefficients, bonuses) equal to the cube's own tables."""
+        log_params = np.zeros(self.n_log)
+        for factor in self.cube.factors:
+            values = np.log(np.array(list(self.cube.factor_tables[factor].values()), dtype=np.float64))
+            columns = self._column(factor, np.arange(len(values)))
+            log_params[columns[columns >= 0]] = values[columns >= 0]
+        bonus_params = np.concatenate([self.cube.parking_bonus[1:], self.cube.amenity_bonus.astype(np.float64)])
+        return log_params, bonus_params
+
+    def to_cube(self, log_params, bonus_params, metadata):
+        factor_tables = {}
+        for factor in self.cube.factors:
+            names = self.cube.categories[factor]
+            columns = self._column(factor, np.arange(len(names)))
+            values = np.where(columns >= 0, np.exp(log_params[np.maximum(columns, 0)]), 1.0)
+            digits = 0 if factor == "city" else 4
+            factor_tables[factor] = {name: round(float(value), digits) for name, value in zip(names, values)}
+        n_parking = len(self.cube.parking_categories) - 1
+        parking = {self.cube.parking_categories[0]: 0}
+        parking.update({
+            name: round(float(value)) for name, value in zip(self.cube.parking_categories[1:], bonus_params[:n_parking])
+        })
+        amenities = {name: round(float(value)) for name, value in zip(self.cube.amenities, bonus_params[n_parking:])}
+        return pricing.PriceCube(factor_tables, parking, amenities, metadata=metadata)
+
+
+def _encode_chunk(cube, df):
+    codes = {factor: cube.encode(factor, df[factor].to_numpy()) for factor in cube.factors}
+    parking = cube.encode("parking", df["parking"].to_numpy())
+    flags = np.zeros((len(df), len(cube.amenities)))
+    for i, name in enumerate(cube.amenities):
+        if name in df.columns:
+            flags[:, i] = df[name].to_numpy(dtype=bool)
+    return codes, parking, flags
+
+
+def fit(path, chunk_rows=DEFAULT_CHUNK_ROWS, passes=6, tol=1e-4, ridge=1e-3, price_column="price",
+        start_cube=None, progress=None):
+    """Fit pricing tables from the listings at path; returns (PriceCube, fit statistics)."""
+    layout = DesignLayout(start_cube or pricing.current_cube())
+    log_params, bonus_params = layout.initial_params()
+    # Bonuses are solved in lakh so both parameter blocks have similar scale
+    params = np.concatenate([log_params, bonus_params / BONUS_UNIT])
+    prior = params.copy()
+    n_params = len(params)
+    start = time.perf_counter()
+    rows_seen = 0
+    history = []
+
+    for pass_number in range(1, passes + 1):
+        jtj = np.zeros((n_params, n_params))
+        jtr = np.zeros(n_params)
+        sse = 0.0
+        rows = 0
+        log_params, bonus_params = params[:layout.n_log], params[layout.n_log:]
+
+        for df in iter_chunks(path, chunk_rows):
+            price = df[price_column].to_numpy(dtype=np.float64)
+            df = df[price > 0]
+            price = price[price > 0]
+            codes, parking, flags = _encode_chunk(layout.cube, df)
+            x = layout.log_design(codes)
+            z = layout.bonus_design(parking, flags)
+
+            multiplicative = df["area"].to_numpy(dtype=np.float64) * np.exp(x @ log_params)
+            predicted = np.maximum(multiplicative + BONUS_UNIT * (z @ bonus_params), 1.0)
+            residual = np.log(price) - np.log(predicted)
+            # d log(predicted) / d params, scaled in place to save a copy of each design
+            x *= (multiplicative / predicted)[:, None]
+            z *= (BONUS_UNIT / predicted)[:, None]
+            jacobian = np.hstack([x, z])
+            jtj += jacobian.T @ jacobian
+            jtr += jacobian.T @ residual
+
+            sse += float(residual @ residual)
+            rows += len(df)
+            rows_seen += len(df)
+            if progress:
+                progress(pass_number, rows, rows_seen / (time.perf_counter() - start))
+
+        # Ridge towards the starting tables, scaled per parameter since the log and bonus
+        # blocks have very different curvature; levels with no rows keep their prior values
+        curvature = np.diag(jtj)
+        damping = ridge * np.maximum(curvature, curvature.mean() * 1e-6)
+        step = np.linalg.solve(jtj + np.diag(damping), jtr + damping * (prior - params))
+        params = params + step
+        change = float(np.max(np.abs(step)))
+        history.append({"pass": pass_number, "rmse_log": (sse / max(rows, 1)) ** 0.5, "change": change})
+        if change < tol:
+            break
+
+    elapsed = time.perf_counter() - start
+    stats = {
+        "rows": rows,
+        "passes": len(history),
+        "seconds": round(elapsed, 3),
+        "rows_per_s": round(rows_seen / elapsed, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "history": history,
+    }
+    metadata = {
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": str(path),
+        "rows": rows,
+        "rmse_log": round(history[-1]["rmse_log"], 5),
+    }
+    cube = layout.to_cube(params[:layout.n_log], BONUS_UNIT * params[layout.n_log:], metadata)
+    return cube, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit pricing tables from a listings file")
+    parser.add_argument("input", help="CSV or Parquet listings with an observed price column")
+    parser.add_argument("output", help="pricing table artifact to write (JSON if it ends in .json, otherwise binary)")
+    parser.add_argument("--price-column", default="price")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--passes", type=int, default=6, help="maximum passes over the file")
+    parser.add_argument("--ridge", type=float, default=1e-3, help="shrinkage towards the current tables")
+    args = parser.parse_args()
+
+    def progress(pass_number, rows, rate):
+        print(f"\rpass {pass_number}: {rows:,} rows  {rate:,.0f} rows/s  peak RSS {peak_rss_mb():,.0f} MiB",
+              end="", file=sys.stderr)
+
+    cube, stats = fit(
+        args.input, args.chunk_rows, args.passes, ridge=args.ridge,
+        price_column=args.price_column, progress=progress
+    )
+    pricing.save_pricing_tables(args.output, cube)
+    print(file=sys.stderr)
+    for entry in stats["history"]:
+        print(f"pass {entry['pass']}: rmse(log price) {entry['rmse_log']:.4f}, max step {entry['change']:.2e}",
+              file=sys.stderr)
+    print(f"Fitted {stats['rows']:,} rows x {stats['passes']} passes in {stats['seconds']:.1f}s "
+          f"({stats['rows_per_s']:,.0f} rows/s), peak RSS {stats['peak_rss_mb']:,.0f} MiB", file=sys.stderr)
+    print(f"Wrote {args.output} (version {cube.version})", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Monte Carlo price-uncertainty bands.
+
+Each multiplier in the pricing model (the city rate and the six categorical
+factors) is multiplied by an independent random draw around 1, taken from a
+configurable distribution; parking and amenity bonuses stay fixed. Prices are
+simulated for many draws per property with a seeded generator and summarized
+as percentiles.
+
+Batch mode works through the properties in chunks so that at most
+max_cells simulated prices are held in memory at once.
+"""
+import numpy as np
+
+from pricing import FACTORS, frame_columns, price_components
+
+# factor: (distribution, spread). lognormal spread is sigma of log(multiplier);
+# uniform and triangular spread is the half-width around 1.
+DEFAULT_DISTRIBUTIONS = {
+    "city": ("lognormal", 0.08),
+    "property_type": ("lognormal", 0.04),
+    "location_type": ("lognormal", 0.06),
+    "age": ("uniform", 0.04),
+    "floor": ("uniform", 0.02),
+    "furnishing": ("triangular", 0.03),
+    "bhk": ("lognormal", 0.03),
+}
+
+DEFAULT_DRAWS = 20_000
+DEFAULT_QUANTILES = (5, 50, 95)
+DEFAULT_MAX_CELLS = 2**23  # 64 MiB of float64 per simulated chunk
+
+
+def draw_noise(rng, shape, distributions=DEFAULT_DISTRIBUTIONS):
+    """Product of one random draw per factor, each centred on 1, with the given shape.
+
+    A product of independent lognormals is itself lognormal, so all lognormal
+    factors are drawn as one variate with the combined sigma.
+    """
+    noise = np.ones(shape)
+    lognormal_variance = 0.0
+    for factor in FACTORS:
+        kind, spread = distributions.get(factor, ("fixed", 0.0))
+        if kind == "fixed" or spread == 0:
+            continue
+        if kind == "lognormal":
+            lognormal_variance += spread ** 2
+        elif kind == "uniform":
+            noise *= rng.uniform(1 - spread, 1 + spread, shape)
+        elif kind == "triangular":
+            noise *= rng.triangular(1 - spread, 1.0, 1 + spread, shape)
+        else:
+            raise ValueError(f"unknown distribution '{kind}' for factor '{factor}'")
+    if lognormal_variance:
+        noise *= rng.lognormal(0.0, np.sqrt(lognormal_variance), shape)
+    return noise
+
+
+def simulate_bands(rate, area, parking_bonus, amenity_bonus, draws=DEFAULT_DRAWS, seed=0,
+                   quantiles=DEFAULT_QUANTILES, distributions=DEFAULT_DISTRIBUTIONS, max_cells=DEFAULT_MAX_CELLS):
+    """Percentiles of simulated prices for each row of price_components() output.
+
+    Returns an array of shape (rows, len(quantiles)). Results depend only on
+    seed, draws and max_cells.
+    """
+    rate = np.asarray(rate, dtype=np.float64)
+    base = rate * np.asarray(area, dtype=np.float64)
+    bonus = np.asarray(parking_bonus, dtype=np.float64) + np.asarray(amenity_bonus, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+
+    bands = np.empty((len(rate), len(quantiles)))
+    chunk_rows = max(1, max_cells // draws)
+    for start in range(0, len(rate), chunk_rows):
+        stop = min(start + chunk_rows, len(rate))
+        prices = draw_noise(rng, (stop - start, draws), distributions)
+        prices *= base[start:stop, None]
+        prices += bonus[start:stop, None]
+        bands[start:stop] = np.percentile(prices, quantiles, axis=1).T
+    return bands
+
+
+def price_bands_batch(city, property_type, bhk, area, location_type, age, floor, furnishing, parking, amenities=None,
+                      cube=None, locality_factor=None, **options):
+    """P5/P50/P95 (or the requested quantiles) for many properties; see simulate_bands for options."""
+    return simulate_bands(*price_components(
+        city, property_type, bhk, area, location_type, age, floor, furnishing, parking, amenities, cube, locality_factor
+    ), **options)
+
+
+def price_bands_dataframe(df, **options):
+    return price_bands_batch(*frame_columns(df), **options)
+
+
+def property_price_bands(inputs, cube=None, **options):
+    """{"p5": ..., "p50": ..., "p95": ...} for one property given as sidebar inputs."""
+    quantiles = options.get("quantiles", DEFAULT_QUANTILES)
+    amenities = inputs["amenities"]
+    bands = price_bands_batch(
+        [inputs["city"]], [inputs["property_type"]], [inputs["bhk"]], [inputs["area"]],
+        [inputs["location_type"]], [inputs["age"]], [inputs["floor"]], [inputs["furnishing"]],
+        [inputs["parking"]], {name: [flag] for name, flag in amenities.items()}, cube,
+        inputs.get("locality_factor", 1.0), **options
+    )[0]
+    return {f"p{q:g}": float(value) for q, value in zip(quantiles, bands)}
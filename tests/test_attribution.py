@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from attribution import ATTRIBUTION_COLUMNS, attribute_batch, attribute_dataframe, attribute_property
+from pricing import AMENITIES, FACTOR_TABLES, PriceCube, frame_columns, price_dataframe
+from sample_listings import generate_listings
+
+
+@pytest.fixture(scope="module")
+def listings():
+    return generate_listings(5000, seed=12)
+
+
+def total(parts):
+    return sum(parts[name] for name in ATTRIBUTION_COLUMNS)
+
+
+def test_parts_sum_to_the_predicted_price(listings):
+    parts = attribute_dataframe(listings)
+    assert np.array_equal(parts["predicted_price"], price_dataframe(listings))
+    assert np.abs(total(parts) - parts["predicted_price"]).max() <= 1e-6 * parts["predicted_price"].max()
+
+
+def test_parts_do_not_depend_on_the_order_of_the_multipliers(listings):
+    factors = list(FACTOR_TABLES)
+    rng = np.random.default_rng(0)
+    expected = attribute_dataframe(listings)
+    for _ in range(3):
+        order = ["city"] + [factors[i] for i in rng.permutation(np.arange(1, len(factors)))]
+        cube = PriceCube({factor: FACTOR_TABLES[factor] for factor in order})
+        parts = attribute_dataframe(listings, cube)
+        # Reordering the cube may move the float32 rounding by a rupee; the split itself does not change
+        assert np.abs(parts["predicted_price"] - expected["predicted_price"]).max() <= 1
+        assert np.abs(total(parts) - parts["predicted_price"]).max() <= 1e-6 * parts["predicted_price"].max()
+        for name in ATTRIBUTION_COLUMNS:
+            if name != "base":
+                assert np.allclose(parts[name], expected[name], rtol=1e-6, atol=1e-3)
+
+
+def test_locality_gets_its_share(listings):
+    head = listings.head(500)
+    factors = np.random.default_rng(1).uniform(0.5, 2.0, len(head))
+    parts = attribute_batch(*frame_columns(head), locality_factor=factors)
+    assert np.abs(total(parts) - parts["predicted_price"]).max() <= 1e-6 * parts["predicted_price"].max()
+    assert ((parts["locality"] > 0) == (factors > 1)).all()
+    assert (attribute_dataframe(head)["locality"] == 0).all()
+
+
+def test_neutral_factor_gets_nothing_and_bonuses_are_exact():
+    inputs = {
+        "city": "Mumbai", "property_type": "Apartment/Flat", "bhk": "2 BHK", "area": 950.0,
+        "location_type": "Suburb", "age": "1-5 Years", "floor": "4th-7th Floor", "furnishing": "Semi-Furnished",
+        "parking": "2 Cars", "amenities": {name: name == AMENITIES[0] for name in AMENITIES},
+    }
+    parts = attribute_property(inputs)
+    for factor in ("property_type", "location_type", "age", "floor", "furnishing", "bhk"):
+        if FACTOR_TABLES[factor][inputs[factor]] == 1.0:
+            assert parts[factor] == 0.0
+        assert (parts[factor] < 0) == (FACTOR_TABLES[factor][inputs[factor]] < 1.0)
+    assert parts["amenities"] == PriceCube().amenity_bonus[0]
+    assert parts["parking"] == PriceCube().parking_table["2 Cars"]
+    assert list(parts) == ATTRIBUTION_COLUMNS
@@ -0,0 +1,52 @@
+import importlib.util
+import os
+
+spec = importlib.util.spec_from_file_location(
+    "suite", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks", "suite.py")
+)
+suite = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(suite)
+
+
+def report(values, **extra):
+    return {"results": {name: suite.metric(value, "rows/s", True) for name, value in values.items()}, **extra}
+
+
+BASELINE = report({"scalar.calls_per_s": 1000, "batch.codes_1e3.rows_per_s": 5000, "batch.codes_1e7.rows_per_s": 9000})
+
+
+def test_slowdown_beyond_threshold_regresses():
+    current = report({**{name: entry["value"] for name, entry in BASELINE["results"].items()},
+                      "scalar.calls_per_s": 850})
+    assert suite.compare(BASELINE, current, 0.10) == ["scalar.calls_per_s"]
+    assert suite.compare(BASELINE, current, 0.20) == []
+
+
+def test_missing_metric_fails_the_gate():
+    current = report({"scalar.calls_per_s": 1000, "batch.codes_1e3.rows_per_s": 5000})
+    assert suite.compare(BASELINE, current, 0.10) == ["batch.codes_1e7.rows_per_s"]
+    # Result files from before "benchmarks" was recorded count every benchmark as selected
+    current = report({"scalar.calls_per_s": 1000}, benchmarks=["scalar", "batch"])
+    assert suite.compare(BASELINE, current, 0.10) == ["batch.codes_1e3.rows_per_s", "batch.codes_1e7.rows_per_s"]
+
+
+def test_benchmarks_left_out_on_purpose_are_skipped():
+    current = report({"scalar.calls_per_s": 1000}, benchmarks=["scalar"], skipped=[])
+    assert suite.compare(BASELINE, current, 0.10) == []
+    current = report({"scalar.calls_per_s": 1000, "batch.codes_1e3.rows_per_s": 5000}, benchmarks=["scalar", "batch"],
+                     skipped=["batch.codes_1e7.rows_per_s"])
+    assert suite.compare(BASELINE, current, 0.10) == []
+
+
+def test_skipped_metrics_follow_max_rows():
+    class Args:
+        only = ["batch"]
+        max_rows = 100_000
+
+    assert suite.skipped_metrics(Args) == ["batch.codes_1e7.rows_per_s"]
+    Args.max_rows = 1000
+    assert suite.skipped_metrics(Args) == [
+        "batch.codes_1e5.rows_per_s", "batch.codes_1e7.rows_per_s", "batch.names_1e5.rows_per_s"
+    ]
+    Args.only = ["scalar"]
+    assert suite.skipped_metrics(Args) == []
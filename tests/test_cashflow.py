@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from cashflow import irr, npv, project
+
+
+def roots_irr(flows):
+    """IRRs in % from the real roots of the NPV polynomial in 1 / (1 + rate)."""
+    roots = np.roots(flows[::-1])
+    x = roots[np.abs(roots.imag) <= 1e-9 * np.abs(roots)].real
+    rates = 100 * (1 / x[x > 0] - 1)
+    return np.sort(rates[rates > -99])
+
+
+def test_irr_thirty_year_zero_down():
+    # Newton used to jump near -99% here and creep back, returning -34% after max_iter
+    net = project(41_473_470.0, 2.13, 4.12, 30, down_payment=0.0, loan_rate=9.2, loan_tenure=30)["net"]
+    expected = roots_irr(net)
+    assert len(expected) == 1
+    assert irr(net) == pytest.approx(expected[0], rel=1e-8)
+
+
+@pytest.mark.parametrize("years", [5, 15, 30])
+def test_irr_matches_polynomial_roots(years):
+    rng = np.random.default_rng(years)
+    n = 2000
+    net = project(
+        rng.uniform(2e6, 5e7, n), rng.uniform(1, 6, n), rng.uniform(0, 12, n), years,
+        down_payment=rng.choice([0.0, 10.0, 20.0, 50.0], n), loan_rate=rng.uniform(6, 14, n),
+        loan_tenure=rng.choice([5, 10, 20, 30], n)
+    )["net"]
+    rates = irr(net)
+    checked = 0
+    for row, rate in zip(net, rates):
+        expected = roots_irr(row)
+        if len(expected) == 1:
+            assert rate == pytest.approx(expected[0], rel=1e-7, abs=1e-7)
+            checked += 1
+    assert checked > n // 2
+
+
+def test_irr_without_sign_change_is_nan():
+    assert np.isnan(irr(np.array([100.0, 10.0, 10.0])))
+
+
+def test_irr_unconverged_rows_are_nan():
+    net = project(1e7, 3.0, 6.0, 30, down_payment=0.0)["net"]
+    assert np.isnan(irr(net, max_iter=1))
+
+
+def test_npv_at_irr_is_zero():
+    flows = np.array([-1000.0, 300.0, 400.0, 500.0])
+    assert npv(flows, irr(flows)) == pytest.approx(0.0, abs=1e-8)
+
+
+@pytest.mark.parametrize("price, city, grade", [
+    (2e6, "Mumbai", "Excellent"),
+    (2e6, "Pune", "Good"),
+    (3e7, "Pune", "Average"),
+])
+def test_investment_grade_follows_projected_irr(price, city, grade):
+    from analytics import investment_summary
+
+    summary = investment_summary(price, city)
+    net = project(price, summary["rental_yield"], summary["appreciation"])["net"]
+    assert summary["irr"] == irr(net)
+    assert summary["grade"] == grade
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+import pricing
+from comparables import EXACT_FACTORS, NUMERIC_FACTORS, ComparablesIndex, KDTree, _frame_columns, encode_features
+from pricing import AMENITIES, PriceCube
+from sample_listings import generate_listings
+
+
+def brute_force(points, point, k):
+    distances = ((points - point) ** 2).sum(axis=1)
+    return np.sort(distances)[:k]
+
+
+@pytest.mark.parametrize("n, dims, leaf_size", [(1, 3, 32), (40, 2, 4), (5000, 6, 32), (3000, 12, 8)])
+def test_kdtree_matches_brute_force(n, dims, leaf_size):
+    rng = np.random.default_rng(n)
+    points = rng.normal(size=(n, dims))
+    tree = KDTree(points, leaf_size)
+    for point in rng.normal(size=(50, dims)) * 1.5:
+        for k in (1, 5, 50):
+            squared, rows = tree.query(point, k)
+            expected = brute_force(points, point, k)
+            assert np.allclose(squared, expected, rtol=1e-12, atol=0)
+            assert np.allclose(((points[rows] - point) ** 2).sum(axis=1), squared, rtol=1e-12, atol=0)
+            assert len(set(rows.tolist())) == len(rows)
+
+
+def test_kdtree_with_duplicate_points():
+    # Identical points cannot be split; ties come back in row order
+    points = np.repeat(np.arange(10.0)[:, None], 20, axis=0)
+    tree = KDTree(points, leaf_size=4)
+    squared, rows = tree.query([3.2], 25)
+    assert np.allclose(squared, brute_force(points, [3.2], 25))
+    assert list(rows[:20]) == sorted(rows[:20])
+
+
+def query_inputs(df):
+    return [{**row, "amenities": {name: bool(row[name]) for name in AMENITIES}} for row in df.to_dict("records")]
+
+
+def test_index_query_matches_scan_of_group():
+    df = generate_listings(20_000, seed=0, price_noise=0.1)
+    index = ComparablesIndex(df)
+    features = encode_features(_frame_columns(df), index.cube)
+    for inputs in query_inputs(generate_listings(40, seed=7)):
+        result = index.query(inputs, 10)
+        mask = np.ones(len(df), dtype=bool)
+        for factor in EXACT_FACTORS:
+            mask &= df[factor].to_numpy() == inputs[factor]
+        point = encode_features({
+            **{name: [inputs[name]] for name in ("area", "parking", *NUMERIC_FACTORS)},
+            "amenities": np.array([[inputs["amenities"][name] for name in AMENITIES]]),
+        }, index.cube)[0]
+        expected = np.sqrt(brute_force(features[mask], point, 10))
+        assert np.allclose(result["distance"], expected, rtol=1e-9, atol=1e-12)
+        assert (result["city"] == inputs["city"]).all()
+        assert np.array_equal(result["price"], df["price"].to_numpy()[result["row"]])
+
+
+def test_query_uses_the_tables_the_index_was_built_with(monkeypatch):
+    df = generate_listings(5000, seed=1, price_noise=0.1)
+    index = ComparablesIndex(df)
+    inputs = query_inputs(generate_listings(1, seed=2))[0]
+    before = index.query(inputs, 10)
+
+    tables = {factor: dict(table) for factor, table in pricing.FACTOR_TABLES.items()}
+    tables["furnishing"] = {name: value * (1.3 + i) for i, (name, value) in enumerate(tables["furnishing"].items())}
+    reloaded = PriceCube(tables)
+    monkeypatch.setattr(pricing, "PRICE_CUBE", reloaded)
+    after = index.query(inputs, 10)
+    assert np.array_equal(before["row"], after["row"])
+    assert np.array_equal(before["distance"], after["distance"])
+    # Model prices follow the active tables, like the app's own prediction
+    assert not np.array_equal(before["model_price"], after["model_price"])
+
+
+def test_group_size_counts_only_the_matching_group():
+    df = generate_listings(5000, seed=3, price_noise=0.1)
+    index = ComparablesIndex(df)
+    for inputs in query_inputs(generate_listings(10, seed=4)):
+        expected = ((df["city"] == inputs["city"]) & (df["property_type"] == inputs["property_type"])).sum()
+        assert index.group_size(inputs) == expected
+    assert index.group_size({**inputs, "city": "Mumbai"}) < len(index)
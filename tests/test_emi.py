@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from emi import amortization_schedule, loan_amount, monthly_emi, outstanding_balance, scenario_grid, total_interest
+
+LOANS = [(5_000_000, 9.0, 20), (12_345_678, 7.25, 30), (800_000, 14.5, 5), (2_000_000, 0.0, 10), (1_000_000, 8.4, 1.5)]
+
+
+def simulate(principal, annual_rate, years):
+    """Month-by-month balances from paying the EMI, with interest accrued each month."""
+    payment = monthly_emi(principal, annual_rate, years)
+    balance, balances, interest = float(principal), [], []
+    for _ in range(int(round(years * 12))):
+        interest.append(balance * annual_rate / 1200)
+        balance += interest[-1] - payment
+        balances.append(balance)
+    return np.array(balances), np.array(interest)
+
+
+@pytest.mark.parametrize("principal, annual_rate, years", LOANS)
+def test_schedule_matches_month_by_month_simulation(principal, annual_rate, years):
+    schedule = amortization_schedule(principal, annual_rate, years)
+    balances, interest = simulate(principal, annual_rate, years)
+    assert len(schedule["month"]) == round(years * 12)
+    assert np.allclose(schedule["balance"], np.maximum(balances, 0), rtol=0, atol=1e-6 * principal)
+    assert np.allclose(schedule["interest"], interest, rtol=0, atol=1e-6 * principal)
+    # The loan is paid off exactly: principal repaid sums to the loan, payments to loan + interest
+    assert schedule["balance"][-1] == pytest.approx(0, abs=1e-6 * principal)
+    assert schedule["principal"].sum() == pytest.approx(principal, rel=1e-9)
+    assert schedule["payment"].sum() == pytest.approx(principal + total_interest(principal, annual_rate, years),
+                                                      rel=1e-9)
+    assert schedule["interest"].sum() == pytest.approx(total_interest(principal, annual_rate, years),
+                                                       rel=1e-9, abs=1e-6)
+
+
+@pytest.mark.parametrize("principal, annual_rate, years", LOANS)
+def test_outstanding_balance_matches_schedule(principal, annual_rate, years):
+    schedule = amortization_schedule(principal, annual_rate, years)
+    for month in (0, 1, 7, len(schedule["month"]) // 2, len(schedule["month"])):
+        expected = principal if month == 0 else schedule["balance"][month - 1]
+        assert outstanding_balance(principal, annual_rate, years, month) == pytest.approx(expected, abs=1e-6)
+
+
+def test_zero_rate_spreads_the_principal_evenly():
+    assert monthly_emi(1_200_000, 0.0, 10) == pytest.approx(10_000)
+    assert total_interest(1_200_000, 0.0, 10) == pytest.approx(0, abs=1e-6)
+
+
+def test_scenario_grid_matches_scalar_emi():
+    price, rates, tenures, downs = 9_000_000, [0.0, 7.5, 9.0, 11.25], [5, 15, 20, 30], [10.0, 20.0, 35.0]
+    grid = scenario_grid(price, rates, tenures, downs)
+    assert grid["emi"].shape == grid["loan"].shape == grid["total_interest"].shape == (4, 4, 3)
+    for i, rate in enumerate(rates):
+        for j, tenure in enumerate(tenures):
+            for k, down in enumerate(downs):
+                loan = loan_amount(price, down)
+                assert grid["loan"][i, j, k] == loan
+                assert grid["emi"][i, j, k] == pytest.approx(monthly_emi(loan, rate, tenure), rel=1e-12)
+                assert grid["total_interest"][i, j, k] == pytest.approx(total_interest(loan, rate, tenure),
+                                                                        rel=1e-9, abs=1e-6)
@@ -0,0 +1,94 @@
+import json
+
+import numpy as np
+import pytest
+
+from localities import LOCALITY_MAGIC, LOCALITY_PREFIX, LocalityIndex, generate_localities, write_localities
+
+
+@pytest.fixture(scope="module")
+def locality_file(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("localities") / "localities.bin")
+    cities, names, factors = generate_localities(300, seed=1, cities=["Mumbai", "Pune", "Delhi NCR"])
+    write_localities(path, cities, names, factors)
+    return path, cities, names, factors
+
+
+def test_rows_survive_in_place_rewrite(tmp_path, locality_file):
+    # A mapped index would SIGBUS here once the file shrinks under it
+    path = tmp_path / "localities.bin"
+    path.write_bytes(open(locality_file[0], "rb").read())
+    index = LocalityIndex(str(path))
+    expected = index.search("Mumbai", "S")
+    with open(path, "r+b") as handle:
+        handle.truncate(LOCALITY_PREFIX.size)
+    assert index.search("Mumbai", "S") == expected and expected
+
+
+def with_header(data, **changes):
+    # The same file with header fields changed, keeping the data offset
+    _, header_length, offset = LOCALITY_PREFIX.unpack_from(data)
+    header = {**json.loads(data[LOCALITY_PREFIX.size:LOCALITY_PREFIX.size + header_length]), **changes}
+    encoded = json.dumps(header).encode()
+    assert LOCALITY_PREFIX.size + len(encoded) <= offset
+    return LOCALITY_PREFIX.pack(LOCALITY_MAGIC, len(encoded), offset) \
+        + encoded.ljust(offset - LOCALITY_PREFIX.size, b"\0") + data[offset:]
+
+
+MALFORMED = {
+    "empty": lambda data: b"",
+    "wrong magic": lambda data: b"PRCUBE01" + data[8:],
+    "short prefix": lambda data: LOCALITY_MAGIC + b"\x01\x02",
+    "header past end": lambda data: LOCALITY_PREFIX.pack(LOCALITY_MAGIC, 1 << 20, 1 << 21) + b"{}",
+    "header not json": lambda data: LOCALITY_PREFIX.pack(LOCALITY_MAGIC, 4, 64) + b"{{{{".ljust(40, b"\0"),
+    "header not an object": lambda data: LOCALITY_PREFIX.pack(LOCALITY_MAGIC, 2, 64) + b"[]".ljust(40, b"\0"),
+    "wrong format": lambda data: with_header(data, format=2),
+    "missing count": lambda data: with_header(data, count=None),
+    "count too large": lambda data: with_header(data, count=10**9),
+    "city starts mismatch": lambda data: with_header(data, city_starts=[0, 5]),
+    "truncated names": lambda data: data[:-10],
+    "truncated factors": lambda data: data[:LOCALITY_PREFIX.size + 600],
+}
+
+
+@pytest.mark.parametrize("case", list(MALFORMED))
+def test_malformed_file_raises_value_error(tmp_path, locality_file, case):
+    path = tmp_path / "localities.bin"
+    path.write_bytes(MALFORMED[case](open(locality_file[0], "rb").read()))
+    with pytest.raises(ValueError):
+        LocalityIndex(str(path))
+
+
+def brute_force(cities, names, city, prefix):
+    """The city's names starting with prefix, ignoring case, in the index's sort order."""
+    key = prefix.casefold()
+    matches = [name for c, name in zip(cities, names) if c == city and name.casefold().startswith(key)]
+    return sorted(matches, key=str.casefold)
+
+
+@pytest.mark.parametrize("prefix", ["", "s", "Sh", "SHANTI", "shanti nagar", "Gandhi Park Sector 1", "Lake Road",
+                                    "zz", "Ambedkar Bagh", "ö"])
+def test_search_matches_brute_force(locality_file, prefix):
+    path, cities, names, _ = locality_file
+    index = LocalityIndex(path)
+    for city in ("Mumbai", "Pune", "Delhi NCR", "Chennai"):
+        expected = brute_force(cities, names, city, prefix)
+        start, stop = index.prefix_range(city, prefix)
+        assert stop - start == len(expected)
+        assert [index.name(position) for position in range(start, stop)] == expected
+        assert index.search(city, prefix) == expected[:20]
+        assert index.search(city, prefix, limit=3) == expected[:3]
+    assert index.count("Pune") == 300 and index.count("Chennai") == 0
+
+
+def test_factor_matches_the_written_factors(locality_file):
+    path, cities, names, factors = locality_file
+    index = LocalityIndex(path)
+    for city, name, factor in zip(cities, names, factors):
+        assert index.factor(city, name) == float(np.float32(factor))
+    with pytest.raises(KeyError):
+        index.factor("Mumbai", "Nowhere Nagar")
+    with pytest.raises(KeyError):
+        index.factor("Pune", names[cities.index("Mumbai")].upper())
+    with pytest.raises(KeyError):
+        index.factor("Chennai", names[0])
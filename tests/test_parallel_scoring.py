@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import pricing
+from parallel_scoring import score_chunks, score_frame_parallel
+from pricing import PriceCube, TableWatcher, save_pricing_tables
+from sample_listings import generate_listings
+
+
+@pytest.fixture
+def watched_tables(tmp_path, monkeypatch):
+    """A watched table file that can be rewritten mid-run; returns (path, initial version)."""
+    path = str(tmp_path / "tables.bin")
+    cube = PriceCube()
+    save_pricing_tables(path, cube)
+    monkeypatch.setattr(pricing, "TABLE_WATCHER", TableWatcher(path, interval=0))
+    monkeypatch.setattr(pricing, "PRICE_CUBE", cube)
+    return path, cube.version
+
+
+def changed_cube():
+    tables = {factor: dict(table) for factor, table in pricing.FACTOR_TABLES.items()}
+    tables["city"]["Mumbai"] *= 1.5
+    return PriceCube(tables)
+
+
+def test_parallel_matches_in_process():
+    df = generate_listings(3000, seed=5)
+    serial, parallel = score_frame_parallel(df, workers=1), score_frame_parallel(df, workers=2)
+    assert serial.keys() == parallel.keys()
+    for name in serial:
+        assert np.array_equal(serial[name], parallel[name])
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_tables_are_pinned_for_the_whole_run(watched_tables, workers):
+    path, version = watched_tables
+    chunks = (generate_listings(200, seed=seed) for seed in range(8))
+    versions = []
+    for index, (_, columns) in enumerate(score_chunks(chunks, workers, max_in_flight=2)):
+        if index == 1:
+            save_pricing_tables(path, changed_cube())
+        versions += set(columns["table_version"])
+    assert set(versions) == {version}
+    # The next run picks up the new tables
+    _, columns = next(score_chunks(iter([generate_listings(10, seed=9)]), workers))
+    assert set(columns["table_version"]) == {changed_cube().version}
@@ -0,0 +1,48 @@
+import re
+
+import pytest
+
+from portfolio import Portfolio
+from sample_listings import generate_listings
+
+
+def test_add_dataframe_matches_adding_one_by_one():
+    df = generate_listings(50, seed=2)
+    batch, single = Portfolio(), Portfolio()
+    batch.add_dataframe(df)
+    for row in batch.holdings.values():
+        single.add(row["inputs"])
+    assert [h["value"] for h in batch.holdings.values()] == [h["value"] for h in single.holdings.values()]
+    assert batch.totals.keys() == single.totals.keys()
+    for field, total in single.totals.items():
+        assert batch.totals[field] == pytest.approx(total), field
+
+
+@pytest.mark.parametrize("change, message", [
+    (lambda df: df.drop(columns=["city", "parking"]), "missing columns: city, parking"),
+    (lambda df: df.assign(area=["big"] + [1000.0] * (len(df) - 1)), "'area' must be a positive number (row 1)"),
+    (lambda df: df.assign(area=[1000.0, -5.0] + [1000.0] * (len(df) - 2)), "'area' must be a positive number (row 2)"),
+    (lambda df: df.assign(city=["Atlantis"] * len(df)), "column 'city'"),
+])
+def test_add_dataframe_rejects_bad_rows_and_adds_nothing(change, message):
+    portfolio = Portfolio()
+    with pytest.raises(ValueError, match=re.escape(message)):
+        portfolio.add_dataframe(change(generate_listings(5, seed=1)))
+    assert len(portfolio) == 0 and portfolio.revision == 0
+
+
+def test_summary_grades_the_irr_of_all_holdings():
+    from analytics import investment_grade, investment_summary
+    from cashflow import irr
+
+    portfolio = Portfolio()
+    ids = portfolio.add_dataframe(generate_listings(20, seed=4))
+    net = sum(holding["cash_flows"] for holding in portfolio.holdings.values())
+    summary = portfolio.summary()
+    assert summary["irr"] == pytest.approx(irr(net))
+    assert summary["grade"] == investment_grade(summary["irr"])
+
+    for holding_id in ids[1:]:
+        portfolio.remove(holding_id)
+    only = portfolio.holdings[ids[0]]
+    assert portfolio.summary()["irr"] == pytest.approx(investment_summary(only["value"], only["inputs"]["city"])["irr"])
@@ -0,0 +1,32 @@
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from price_history import PriceHistory
+from sample_listings import generate_sales
+
+SCRIPT = sys.modules["price_history"].__file__
+
+
+def test_append_cli_creates_store_from_unsorted_file(tmp_path):
+    months = ["2021-06", "2021-07", "2020-01", "2021-01", "2019-11"]
+    sales = pd.concat([generate_sales(300, month, 1.0, seed=i) for i, month in enumerate(months)], ignore_index=True)
+    path = tmp_path / "sales.csv"
+    sales.to_csv(path, index=False)
+    store = tmp_path / "history"
+    # Small chunks, so the earliest month is not in the first one
+    subprocess.run([sys.executable, SCRIPT, "append", str(store), str(path), "--chunk-rows", "500"], check=True,
+                   capture_output=True)
+
+    history = PriceHistory(str(store))
+    assert history.meta["start"] == "2019-11"
+    assert history.month_labels()[-1] == "2021-07"
+    city = sales["city"].iloc[0]
+    trend = history.trend(city)
+    counts = dict(zip(trend["months"], trend["count"]))
+    for month in months:
+        assert counts[month] == (sales[sales["month"] == month]["city"] == city).sum()
+    assert trend["count"].sum() == (sales["city"] == city).sum()
+    assert np.isnan(trend["mean"][trend["count"] == 0]).all()
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from pricing import (
+    AMENITIES, FACTOR_TABLES, INPUT_COLUMNS, PriceCube, calculate_indian_property_price,
+    calculate_indian_property_price_batch, current_cube,
+)
+from sample_listings import generate_listings
+
+
+def scalar_prices(df, locality_factor=None):
+    factors = np.ones(len(df)) if locality_factor is None else np.broadcast_to(locality_factor, len(df))
+    rows = df[INPUT_COLUMNS].itertuples(index=False)
+    flags = df[AMENITIES].to_dict("records")
+    return np.array([
+        calculate_indian_property_price(*row, amenities, None, float(factor))
+        for row, amenities, factor in zip(rows, flags, factors)
+    ])
+
+
+def batch_prices(df, **options):
+    return calculate_indian_property_price_batch(
+        *[df[name].to_numpy() for name in INPUT_COLUMNS], {name: df[name].to_numpy() for name in AMENITIES}, **options
+    )
+
+
+# 50 rows take the dict-lookup encoding path, 5,000 the pandas factorize path
+@pytest.mark.parametrize("rows", [1, 50, 5000])
+def test_batch_matches_scalar_exactly(rows):
+    df = generate_listings(rows, seed=rows)
+    batch = batch_prices(df)
+    assert batch.dtype == np.int64
+    assert np.array_equal(batch, scalar_prices(df))
+
+
+def test_batch_matches_scalar_with_locality_factors():
+    df = generate_listings(3000, seed=11)
+    factors = np.random.default_rng(0).lognormal(0.0, 0.3, len(df)).astype(np.float32).astype(np.float64)
+    assert np.array_equal(batch_prices(df, locality_factor=factors), scalar_prices(df, factors))
+    assert np.array_equal(batch_prices(df, locality_factor=1.7), scalar_prices(df, 1.7))
+    # A factor of one prices like no locality at all
+    assert np.array_equal(batch_prices(df, locality_factor=np.ones(len(df))), batch_prices(df))
+
+
+def test_batch_without_amenities_counts_none():
+    df = generate_listings(200, seed=3)
+    no_amenities = df.assign(**dict.fromkeys(AMENITIES, False))
+    batch = calculate_indian_property_price_batch(*[df[name].to_numpy() for name in INPUT_COLUMNS])
+    assert np.array_equal(batch, scalar_prices(no_amenities))
+
+
+def test_unknown_category_raises_key_error():
+    df = generate_listings(100, seed=4)
+    df.loc[7, "city"] = "Atlantis"
+    with pytest.raises(KeyError):
+        batch_prices(df)
+
+
+def test_integer_codes_price_like_names():
+    df = generate_listings(5000, seed=8)
+    cube = current_cube()
+    coded = df.copy()
+    for factor in [*cube.factors, "parking"]:
+        coded[factor] = cube.encode(factor, df[factor].to_numpy())
+    assert np.issubdtype(coded["city"].dtype, np.integer)
+    assert np.array_equal(batch_prices(coded), batch_prices(df))
+    assert np.array_equal(batch_prices(coded.head(10)), scalar_prices(df.head(10)))
+
+
+def test_out_of_range_code_raises_key_error():
+    df = generate_listings(10, seed=9)
+    codes = current_cube().encode("bhk", df["bhk"].to_numpy())
+    codes[3] = len(current_cube().categories["bhk"])
+    with pytest.raises(KeyError, match="bhk"):
+        batch_prices(df.assign(bhk=codes))
+
+
+def test_cube_holds_the_product_of_the_factor_tables():
+    cube = PriceCube()
+    rng = np.random.default_rng(1)
+    for _ in range(500):
+        inputs = {factor: list(table)[rng.integers(len(table))] for factor, table in FACTOR_TABLES.items()}
+        product = np.prod([FACTOR_TABLES[factor][name] for factor, name in inputs.items()], dtype=np.float64)
+        assert cube.rate(**inputs) == float(np.float32(product))
+    assert cube.rates.shape == tuple(len(table) for table in FACTOR_TABLES.values())
@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import pytest
+
+from pricing import AMENITIES, calculate_indian_property_price
+from pricing_service import PricingService
+
+PROPERTY = {
+    "city": "Mumbai", "property_type": "Apartment/Flat", "bhk": "2 BHK", "area": 900.0,
+    "location_type": "Suburb", "age": "1-5 Years", "floor": "4th-7th Floor",
+    "furnishing": "Semi-Furnished", "parking": "1 Car", "amenities": {},
+}
+
+
+def dispatch(body, **options):
+    return asyncio.run(PricingService(**options).dispatch("POST", "/predict", body.encode()))
+
+
+def test_predict_matches_scalar_price():
+    status, payload = dispatch(json.dumps(PROPERTY))
+    assert status == 200
+    args = [PROPERTY[name] for name in ("city", "property_type", "bhk", "area", "location_type", "age", "floor",
+                                        "furnishing", "parking")]
+    assert payload["price"] == calculate_indian_property_price(*args, dict.fromkeys(AMENITIES, False))
+
+
+@pytest.mark.parametrize("area", ["NaN", "Infinity", "-Infinity", "-900", "0"])
+def test_invalid_area_is_rejected(area):
+    body = json.dumps({**PROPERTY, "area": 0}).replace('"area": 0', f'"area": {area}')
+    status, payload = dispatch(body)
+    assert status == 400
+    assert "area" in payload["error"]
+
+
+def test_request_larger_than_queue_is_413():
+    status, _ = dispatch(json.dumps([PROPERTY] * 5), max_pending=4)
+    assert status == 413
+    status, payload = dispatch(json.dumps([PROPERTY] * 4), max_pending=4)
+    assert status == 200 and len(payload["prices"]) == 4
+
+
+async def exchange(raw, **options):
+    """Send raw bytes to a running service and return everything it answers before closing."""
+    service = PricingService(**options)
+    server = await service.start("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(raw)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        return response
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def status_of(response):
+    return int(response.split(b" ", 2)[1])
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-5", b"1.5", b" "])
+def test_invalid_content_length_is_400(length):
+    response = asyncio.run(exchange(b"POST /predict HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n{}"))
+    assert status_of(response) == 400
+    assert b"Content-Length" in response.split(b"\r\n\r\n", 1)[1]
+
+
+def test_malformed_request_line_is_400():
+    assert status_of(asyncio.run(exchange(b"GARBAGE\r\n\r\n"))) == 400
+
+
+def test_keep_alive_requests_over_one_connection():
+    body = json.dumps(PROPERTY).encode()
+    request = b"POST /predict HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body)
+    last = b"GET /health HTTP/1.1\r\nConnection: close\r\n\r\n"
+    response = asyncio.run(exchange(request * 2 + last))
+    assert response.count(b"HTTP/1.1 200 OK") == 3
+
+
+def test_failed_batch_answers_every_request_with_500(monkeypatch):
+    import pricing_service
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("cube went away")
+
+    monkeypatch.setattr(pricing_service, "calculate_indian_property_price_batch", broken)
+
+    async def run():
+        service = PricingService(window_ms=20)
+        body = json.dumps(PROPERTY).encode()
+        results = await asyncio.gather(*[service.dispatch("POST", "/predict", body) for _ in range(3)])
+        return service, results
+
+    service, results = asyncio.run(run())
+    assert [status for status, _ in results] == [500] * 3
+    assert all("cube went away" in payload["error"] for _, payload in results)
+    assert service.batcher.batches == 0
+    assert service.stats.snapshot(service.batcher)["failed"] == 3
+
+
+def test_amenity_flags_must_be_json_booleans():
+    name = AMENITIES[0]
+    status, with_flag = dispatch(json.dumps({**PROPERTY, "amenities": {name: True}}))
+    assert status == 200
+    status, without = dispatch(json.dumps({**PROPERTY, "amenities": {name: False}}))
+    assert status == 200 and with_flag["price"] > without["price"]
+    for flag in ["false", "true", 1, 0, None, [True]]:
+        status, payload = dispatch(json.dumps({**PROPERTY, "amenities": {name: flag}}))
+        assert status == 400 and name in payload["error"]
+    for amenities in [{"Jacuzzi": True}, [name], "all"]:
+        status, _ = dispatch(json.dumps({**PROPERTY, "amenities": amenities}))
+        assert status == 400
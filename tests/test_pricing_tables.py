@@ -0,0 +1,101 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import pricing
+from pricing import BINARY_MAGIC, BINARY_PREFIX, PriceCube, TableWatcher, load_pricing_tables, save_pricing_tables
+
+
+@pytest.fixture
+def cube():
+    tables = {factor: dict(table) for factor, table in pricing.FACTOR_TABLES.items()}
+    tables["city"]["Mumbai"] *= 1.1
+    return PriceCube(tables, metadata={"source": "test"})
+
+
+@pytest.mark.parametrize("name", ["tables.json", "tables.bin"])
+def test_round_trip(tmp_path, cube, name):
+    path = tmp_path / name
+    save_pricing_tables(path, cube, {"rows": 3})
+    loaded = load_pricing_tables(path)
+    assert loaded.version == cube.version
+    assert loaded.metadata == {"source": "test", "rows": 3}
+    assert loaded.factor_tables == cube.factor_tables
+    assert loaded.rates.dtype == cube.rates.dtype
+    assert np.array_equal(loaded.rates, cube.rates)
+    assert not os.path.exists(f"{path}.tmp")
+
+
+def test_binary_rates_survive_in_place_rewrite(tmp_path, cube):
+    # A mapped cube would SIGBUS here once the file shrinks under it
+    path = tmp_path / "tables.bin"
+    save_pricing_tables(path, cube)
+    loaded = load_pricing_tables(path)
+    with open(path, "r+b") as handle:
+        handle.truncate(BINARY_PREFIX.size)
+    assert np.array_equal(loaded.rates, cube.rates)
+
+
+def binary_file(cube, **header_changes):
+    # The bytes save_pricing_tables would write, with the header edited
+    header = {**pricing._artifact(cube), "dtype": cube.rates.dtype.str, "shape": list(cube.rates.shape),
+              **header_changes}
+    encoded = json.dumps(header).encode()
+    offset = -(-(BINARY_PREFIX.size + len(encoded)) // 64) * 64
+    return BINARY_PREFIX.pack(BINARY_MAGIC, len(encoded), offset) + encoded.ljust(offset - BINARY_PREFIX.size, b"\0") \
+        + cube.rates.tobytes()
+
+
+MALFORMED = {
+    "empty": lambda cube: b"",
+    "short prefix": lambda cube: BINARY_MAGIC + b"\x01",
+    "json list": lambda cube: b"[1, 2, 3]",
+    "json missing tables": lambda cube: json.dumps({"format": 1, "version": "x"}).encode(),
+    "json wrong format": lambda cube: json.dumps({**pricing._artifact(cube), "format": 2}).encode(),
+    "not json": lambda cube: b"\xff\xfe not tables",
+    "truncated cube": lambda cube: binary_file(cube)[:-4],
+    "header too long": lambda cube: BINARY_PREFIX.pack(BINARY_MAGIC, 1 << 20, 64) + b"{}",
+    "header not an object": lambda cube: BINARY_PREFIX.pack(BINARY_MAGIC, 2, 64) + b"[]".ljust(40, b"\0"),
+    "bad dtype": lambda cube: binary_file(cube, dtype="O"),
+    "bad shape": lambda cube: binary_file(cube, shape=[-1]),
+    "wrong shape": lambda cube: binary_file(cube, shape=[1, 2]),
+}
+
+
+@pytest.mark.parametrize("case", list(MALFORMED))
+def test_malformed_file_raises_value_error(tmp_path, cube, case):
+    path = tmp_path / "tables.bin"
+    path.write_bytes(MALFORMED[case](cube))
+    with pytest.raises(ValueError):
+        load_pricing_tables(path)
+
+
+@pytest.mark.parametrize("case", list(MALFORMED))
+def test_watcher_keeps_current_tables_on_malformed_file(tmp_path, cube, case):
+    path = tmp_path / "tables.bin"
+    save_pricing_tables(path, cube)
+    watcher = TableWatcher(str(path), interval=0)
+    active = pricing.current_cube()
+    # Replace the file (new inode) so the poll sees a change whatever the mtime resolution
+    (tmp_path / "new").write_bytes(MALFORMED[case](cube))
+    os.replace(tmp_path / "new", path)
+    assert watcher.poll() is False
+    assert watcher.errors == 1 and watcher.last_error
+    assert pricing.current_cube() is active
+
+
+def test_watcher_installs_changed_tables(tmp_path, cube):
+    path = tmp_path / "tables.bin"
+    save_pricing_tables(path, PriceCube())
+    watcher = TableWatcher(str(path), interval=0)
+    active = pricing.current_cube()
+    try:
+        save_pricing_tables(path, cube)
+        assert watcher.poll() is True
+        assert pricing.current_cube().version == cube.version
+        assert watcher.poll() is False
+    finally:
+        pricing.install_cube(active)
+    assert watcher.reloads == 1 and watcher.errors == 0
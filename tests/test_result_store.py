@@ -0,0 +1,29 @@
+from result_store import ResultStore
+
+
+def test_size_stays_within_one_eviction_interval(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"), max_entries=500, version="v1")
+    assert store.evict_every == 5
+    for i in range(2000):
+        store.put({"i": i}, {"price": i})
+        assert store.stats()["size"] <= store.max_entries + store.evict_every
+    assert store.stats()["size"] == store.max_entries
+
+
+def test_eviction_keeps_recently_used_entries(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"), max_entries=100, version="v1")
+    for i in range(100):
+        store.put({"i": i}, i)
+    assert store.get({"i": 0}) == 0
+    for i in range(100, 150):
+        store.put({"i": i}, i)
+    assert store.get({"i": 0}) == 0
+    assert store.get({"i": 149}) == 149
+    assert sum(store.get({"i": i}) is not None for i in range(1, 100)) == 49
+
+
+def test_other_table_versions_are_purged_on_open(tmp_path):
+    path = str(tmp_path / "results.db")
+    ResultStore(path, version="v1").put({"i": 1}, 1)
+    assert ResultStore(path, version="v1").get({"i": 1}) == 1
+    assert ResultStore(path, version="v2").stats()["size"] == 0
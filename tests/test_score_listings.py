@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pricing
+from sample_listings import generate_listings
+from score_listings import score_file
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "streamlit_app", "score_listings.py")
+
+
+@pytest.fixture
+def listings(tmp_path):
+    path = tmp_path / "listings.csv"
+    generate_listings(1000, seed=11).to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize("name", ["scored.csv", "scored.parquet"])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_scores_every_row_in_order(tmp_path, listings, name, workers):
+    output = tmp_path / name
+    assert score_file(str(listings), str(output), chunk_rows=300, workers=workers) == 1000
+    scored = pd.read_parquet(output) if name.endswith(".parquet") else pd.read_csv(output)
+    expected = pricing.price_dataframe(pd.read_csv(listings))
+    assert np.allclose(scored["predicted_price"], expected)
+    assert sorted(os.listdir(tmp_path)) == sorted(["listings.csv", name])
+
+
+def with_bad_value(listings, row, column, value):
+    df = pd.read_csv(listings)
+    df[column] = df[column].astype(object)
+    df.loc[row - 1, column] = value
+    df.to_csv(listings, index=False)
+
+
+@pytest.mark.parametrize("column, value, shown", [
+    ("city", "Atlantis", "'Atlantis'"),
+    ("furnishing", None, "nan"),
+    ("parking", "4 Cars", "'4 Cars'"),
+])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_unknown_category_fails_before_any_output(tmp_path, listings, column, value, shown, workers):
+    # Row 750 sits in the third chunk, after two have been scored
+    with_bad_value(listings, 750, column, value)
+    output = tmp_path / "scored.csv"
+    seen = []
+    with pytest.raises(ValueError, match=f"row 750: unknown value {shown} in column '{column}'"):
+        score_file(str(listings), str(output), chunk_rows=300, progress=seen.append, workers=workers)
+    assert sorted(os.listdir(tmp_path)) == ["listings.csv"]
+
+
+def test_failed_run_keeps_previous_output(tmp_path, listings):
+    output = tmp_path / "scored.csv"
+    output.write_text("previous run\n")
+    with_bad_value(listings, 10, "bhk", "9 BHK")
+    with pytest.raises(ValueError, match="'bhk'"):
+        score_file(str(listings), str(output), chunk_rows=300)
+    assert output.read_text() == "previous run\n"
+    assert not os.path.exists(f"{output}.tmp")
+
+
+def test_integer_codes_are_range_checked(tmp_path, listings):
+    df = pd.read_csv(listings)
+    df["age"] = df["age"].map(pricing.PRICE_CUBE.codes["age"])
+    df.loc[5, "age"] = len(pricing.PRICE_CUBE.categories["age"])
+    df.to_csv(listings, index=False)
+    with pytest.raises(ValueError, match="row 6: unknown value .* in column 'age'"):
+        score_file(str(listings), str(tmp_path / "scored.csv"))
+
+
+def test_cli_exits_non_zero_with_the_bad_value(tmp_path, listings):
+    with_bad_value(listings, 42, "location_type", "Moon Base")
+    output = tmp_path / "scored.csv"
+    result = subprocess.run([sys.executable, SCRIPT, str(listings), str(output), "--quiet"],
+                            capture_output=True, text=True)
+    assert result.returncode != 0
+    assert "row 42: unknown value 'Moon Base' in column 'location_type'" in result.stderr
+    assert not output.exists()
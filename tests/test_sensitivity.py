@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from pricing import AMENITIES, calculate_indian_property_price
+from sensitivity import AREA_VALUES, sweep, sweep_values
+
+BASE = {
+    "city": "Pune", "property_type": "Villa", "bhk": "3 BHK", "area": 1450.0, "location_type": "Suburb",
+    "age": "1-5 Years", "floor": "Ground Floor", "furnishing": "Semi-Furnished", "parking": "1 Car",
+    "amenities": {name: i % 3 == 0 for i, name in enumerate(AMENITIES)},
+}
+
+
+def scalar(inputs):
+    return calculate_indian_property_price(
+        inputs["city"], inputs["property_type"], inputs["bhk"], inputs["area"], inputs["location_type"],
+        inputs["age"], inputs["floor"], inputs["furnishing"], inputs["parking"],
+        {name: inputs["amenities"].get(name, False) for name in AMENITIES}, None, inputs.get("locality_factor", 1.0)
+    )
+
+
+def test_one_dimensional_sweep():
+    result = sweep(BASE, "area")
+    assert result["x"] == AREA_VALUES and result["y"] is None
+    assert result["prices"].shape == (len(AREA_VALUES),)
+    assert result["prices"].tolist() == [scalar({**BASE, "area": float(area)}) for area in AREA_VALUES]
+    assert (np.diff(result["prices"]) > 0).all()
+
+
+@pytest.mark.parametrize("x, y", [("city", "bhk"), ("area", "furnishing"), ("parking", "location_type")])
+def test_two_dimensional_sweep_matches_scalar_prices(x, y):
+    result = sweep(BASE, x, y)
+    assert result["x"] == sweep_values(x) and result["y"] == sweep_values(y)
+    assert result["prices"].shape == (len(result["y"]), len(result["x"]))
+    expected = [[scalar({**BASE, x: x_value, y: y_value}) for x_value in result["x"]] for y_value in result["y"]]
+    assert result["prices"].tolist() == expected
+
+
+def test_locality_applies_only_to_its_own_city():
+    inputs = {**BASE, "locality_factor": 1.6}
+    result = sweep(inputs, "city")
+    for city, price in zip(result["x"], result["prices"].tolist()):
+        factor = 1.6 if city == BASE["city"] else 1.0
+        assert price == scalar({**BASE, "city": city, "locality_factor": factor})
+
+
+def test_explicit_values_and_same_axis_error():
+    result = sweep(BASE, "bhk", x_values=["1 BHK", "2 BHK"])
+    assert result["prices"].tolist() == [scalar({**BASE, "bhk": bhk}) for bhk in ("1 BHK", "2 BHK")]
+    with pytest.raises(ValueError):
+        sweep(BASE, "city", "city")
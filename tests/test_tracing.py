@@ -0,0 +1,42 @@
+import re
+
+from tracing import Tracer
+
+SAMPLE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[^}]*\})? (\S+)$")
+
+
+def test_prometheus_text_families():
+    tracer = Tracer()
+    tracer.start_rerun()
+    for seconds in (0.25, 0.5):
+        tracer.record_span("tab.charts", seconds)
+    tracer.count("button_presses", 3)
+    tracer.record_bytes("trend", 2048)
+    text = tracer.prometheus_text()
+
+    types = {}
+    samples = []
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, family, kind = line.split()
+            assert family not in types, f"{family} declared twice"
+            types[family] = kind
+        elif not line.startswith("#"):
+            samples.append(SAMPLE.match(line).groups())
+
+    def family_of(name):
+        for family, kind in types.items():
+            suffixes = ("_sum", "_count", "") if kind == "summary" else ("",)
+            if any(name == family + suffix for suffix in suffixes):
+                return family
+        raise AssertionError(f"sample {name} has no TYPE line")
+
+    values = {(family_of(name), name, labels): float(value) for name, labels, value in samples}
+    assert types["app_section_max_seconds"] == "gauge"
+    assert values["app_section_max_seconds", "app_section_max_seconds", '{section="tab.charts"}'] == 0.5
+    assert values["app_section_seconds", "app_section_seconds_sum", '{section="tab.charts"}'] == 0.75
+    assert values["app_section_seconds", "app_section_seconds_count", '{section="tab.charts"}'] == 2
+    assert values["app_button_presses_total", "app_button_presses_total", None] == 3
+    # No family may be a summary's name plus a suffix, or scrapers fold it into the summary
+    summaries = [family for family, kind in types.items() if kind == "summary"]
+    assert not [family for family in types for summary in summaries if family.startswith(summary + "_")]
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from pricing import AMENITIES, FACTORS, price_dataframe
+from sample_listings import generate_listings
+from uncertainty import price_bands_dataframe, property_price_bands
+
+OPTIONS = {"draws": 2000, "max_cells": 50_000}
+
+
+@pytest.fixture(scope="module")
+def listings():
+    return generate_listings(300, seed=6)
+
+
+def test_same_seed_gives_the_same_bands(listings):
+    first = price_bands_dataframe(listings, seed=3, **OPTIONS)
+    assert np.array_equal(first, price_bands_dataframe(listings, seed=3, **OPTIONS))
+    assert not np.array_equal(first, price_bands_dataframe(listings, seed=4, **OPTIONS))
+
+
+def test_bands_are_ordered_and_centred_on_the_price(listings):
+    bands = price_bands_dataframe(listings, seed=0, **OPTIONS)
+    assert bands.shape == (len(listings), 3)
+    p5, p50, p95 = bands.T
+    assert (p5 <= p50).all() and (p50 <= p95).all()
+    assert (p5 < p95).all()
+    # The noise is centred on 1, so the median stays within a few percent of the point price
+    price = price_dataframe(listings).astype(np.float64)
+    assert np.abs(p50 / price - 1).max() < 0.05
+    assert (p5 < price).all() and (price < p95).all()
+
+
+def test_fixed_distributions_collapse_to_the_price(listings):
+    fixed = {factor: ("fixed", 0.0) for factor in FACTORS}
+    bands = price_bands_dataframe(listings, distributions=fixed, **OPTIONS)
+    price = price_dataframe(listings).astype(np.float64)
+    # Untruncated price: within a rupee of the integer price, and all quantiles equal
+    assert np.allclose(bands, bands[:, :1])
+    assert np.all((bands[:, 0] - price >= 0) & (bands[:, 0] - price < 1))
+
+
+def test_unknown_distribution_raises_value_error(listings):
+    with pytest.raises(ValueError, match="unknown distribution"):
+        price_bands_dataframe(listings.head(3), distributions={"city": ("cauchy", 0.1)}, **OPTIONS)
+
+
+def test_single_property_matches_batch(listings):
+    row = listings.iloc[0]
+    inputs = {**row.to_dict(), "amenities": {name: bool(row[name]) for name in AMENITIES}}
+    bands = property_price_bands(inputs, seed=5, **OPTIONS)
+    batch = price_bands_dataframe(listings.head(1), seed=5, **OPTIONS)[0]
+    assert list(bands) == ["p5", "p50", "p95"]
+    assert list(bands.values()) == pytest.approx(batch.tolist(), rel=1e-12)